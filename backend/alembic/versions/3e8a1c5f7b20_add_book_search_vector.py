@@ -0,0 +1,40 @@
+"""add book search vector
+
+Revision ID: 3e8a1c5f7b20
+Revises: 9c41f0a6d2b8
+Create Date: 2026-10-18 12:21:07.318442
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8a1c5f7b20'
+down_revision: Union[str, None] = '9c41f0a6d2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Maintained by repositories.search; the column is not mapped on Book.
+    op.add_column('book', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute("""
+        UPDATE book
+        SET search_vector =
+            setweight(to_tsvector('english', coalesce(book.book_title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(author.author_name, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(book.book_summary, '')), 'C')
+        FROM author
+        WHERE author.id = book.author_id
+    """)
+    op.create_index('ix_book_search_vector', 'book', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_book_search_vector', table_name='book', postgresql_using='gin')
+    op.drop_column('book', 'search_vector')
@@ -0,0 +1,59 @@
+"""add book pricing projection
+
+Revision ID: 5b7d2e91c4a3
+Revises: 40e0382015fd
+Create Date: 2026-10-18 09:12:40.118263
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7d2e91c4a3'
+down_revision: Union[str, None] = '40e0382015fd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('book_pricing',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('effective_price', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('discount_amount', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.Column('active_discount_id', sa.Integer(), nullable=True),
+    sa.Column('priced_on', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['book.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['active_discount_id'], ['discount.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('book_id')
+    )
+    op.create_index(op.f('ix_book_pricing_effective_price'), 'book_pricing', ['effective_price'], unique=False)
+    op.create_index(op.f('ix_book_pricing_discount_amount'), 'book_pricing', ['discount_amount'], unique=False)
+    op.create_index(op.f('ix_book_pricing_priced_on'), 'book_pricing', ['priced_on'], unique=False)
+
+    op.execute("""
+        INSERT INTO book_pricing (book_id, effective_price, discount_amount, active_discount_id, priced_on)
+        SELECT book.id,
+               COALESCE(ranked.discount_price, book.book_price),
+               COALESCE(book.book_price - ranked.discount_price, 0),
+               ranked.id,
+               CURRENT_DATE
+        FROM book
+        LEFT OUTER JOIN (
+            SELECT discount.id, discount.book_id, discount.discount_price,
+                   row_number() OVER (PARTITION BY discount.book_id ORDER BY discount.discount_price, discount.id) AS price_rank
+            FROM discount
+            WHERE discount.discount_start_date <= CURRENT_DATE
+              AND (discount.discount_end_date IS NULL OR discount.discount_end_date >= CURRENT_DATE)
+        ) AS ranked ON ranked.book_id = book.id AND ranked.price_rank = 1
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_book_pricing_priced_on'), table_name='book_pricing')
+    op.drop_index(op.f('ix_book_pricing_discount_amount'), table_name='book_pricing')
+    op.drop_index(op.f('ix_book_pricing_effective_price'), table_name='book_pricing')
+    op.drop_table('book_pricing')
@@ -0,0 +1,35 @@
+"""add catalog versions
+
+Revision ID: 7f2c9d4e1a36
+Revises: 3e8a1c5f7b20
+Create Date: 2026-10-18 13:02:44.190256
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f2c9d4e1a36'
+down_revision: Union[str, None] = '3e8a1c5f7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('book', sa.Column('content_version', sa.Integer(), server_default='0', nullable=False))
+    catalog_version = op.create_table('catalog_version',
+    sa.Column('scope', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+    op.bulk_insert(catalog_version, [{'scope': 'catalog', 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalog_version')
+    op.drop_column('book', 'content_version')
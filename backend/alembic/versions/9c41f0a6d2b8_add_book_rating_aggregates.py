@@ -0,0 +1,63 @@
+"""add book rating aggregates
+
+Revision ID: 9c41f0a6d2b8
+Revises: 5b7d2e91c4a3
+Create Date: 2026-10-18 11:03:52.640917
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41f0a6d2b8'
+down_revision: Union[str, None] = '5b7d2e91c4a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STARS = range(1, 6)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('book', sa.Column('review_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('book', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('book', sa.Column('avg_rating', sa.Float(), server_default='0', nullable=False))
+    for star in STARS:
+        op.add_column('book', sa.Column(f'rating_{star}_count', sa.Integer(), server_default='0', nullable=False))
+
+    star_columns = ",\n".join(f"rating_{star}_count = aggregates.rating_{star}_count" for star in STARS)
+    star_aggregates = ",\n".join(
+        f"count(CASE WHEN review.rating_start = {star} THEN 1 END) AS rating_{star}_count" for star in STARS
+    )
+    op.execute(f"""
+        UPDATE book
+        SET review_count = aggregates.review_count,
+            rating_sum = aggregates.rating_sum,
+            avg_rating = CAST(aggregates.rating_sum AS FLOAT) / aggregates.review_count,
+            {star_columns}
+        FROM (
+            SELECT review.book_id,
+                   count(review.id) AS review_count,
+                   sum(review.rating_start) AS rating_sum,
+                   {star_aggregates}
+            FROM review
+            GROUP BY review.book_id
+        ) AS aggregates
+        WHERE book.id = aggregates.book_id
+    """)
+
+    op.create_index(op.f('ix_book_review_count'), 'book', ['review_count'], unique=False)
+    op.create_index(op.f('ix_book_avg_rating'), 'book', ['avg_rating'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_book_avg_rating'), table_name='book')
+    op.drop_index(op.f('ix_book_review_count'), table_name='book')
+    for star in STARS:
+        op.drop_column('book', f'rating_{star}_count')
+    op.drop_column('book', 'avg_rating')
+    op.drop_column('book', 'rating_sum')
+    op.drop_column('book', 'review_count')
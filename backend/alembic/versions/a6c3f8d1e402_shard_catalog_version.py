@@ -0,0 +1,41 @@
+"""shard catalog version
+
+Revision ID: a6c3f8d1e402
+Revises: e2a9c47b1f60
+Create Date: 2026-10-18 21:14:52.607314
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c3f8d1e402'
+down_revision: Union[str, None] = 'e2a9c47b1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same count as repositories.versions.CATALOG_VERSION_SHARDS.
+SHARDS = 16
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Shard 0 carries the old counter forward, so the summed version (and every ETag) is unchanged.
+    op.execute(
+        "INSERT INTO catalog_version (scope, version) "
+        "SELECT 'catalog:0', COALESCE(MAX(version), 0) FROM catalog_version WHERE scope = 'catalog'"
+    )
+    catalog_version = sa.table('catalog_version', sa.column('scope', sa.String), sa.column('version', sa.Integer))
+    op.bulk_insert(catalog_version, [{'scope': f'catalog:{shard}', 'version': 0} for shard in range(1, SHARDS)])
+    op.execute("DELETE FROM catalog_version WHERE scope = 'catalog'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "INSERT INTO catalog_version (scope, version) "
+        "SELECT 'catalog', COALESCE(SUM(version), 0) FROM catalog_version WHERE scope LIKE 'catalog:%'"
+    )
+    op.execute("DELETE FROM catalog_version WHERE scope LIKE 'catalog:%'")
@@ -0,0 +1,29 @@
+"""track trending id gaps
+
+Revision ID: b4d7e2c9f813
+Revises: a6c3f8d1e402
+Create Date: 2026-10-18 22:05:37.184620
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d7e2c9f813'
+down_revision: Union[str, None] = 'a6c3f8d1e402'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('trending_state', sa.Column('review_id_gaps', sa.JSON(), server_default=sa.text("'{}'"), nullable=False))
+    op.add_column('trending_state', sa.Column('order_item_id_gaps', sa.JSON(), server_default=sa.text("'{}'"), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('trending_state', 'order_item_id_gaps')
+    op.drop_column('trending_state', 'review_id_gaps')
@@ -0,0 +1,47 @@
+"""add hot path covering indexes
+
+Revision ID: b4e6a2c8d913
+Revises: 7f2c9d4e1a36
+Create Date: 2026-10-18 15:41:09.512734
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e6a2c8d913'
+down_revision: Union[str, None] = '7f2c9d4e1a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction block, so each index is
+    # built in autocommit mode without locking out writes to the table.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_discount_book_id_active_price', 'discount',
+            ['book_id', 'discount_start_date', 'discount_end_date', 'discount_price'],
+            unique=False, postgresql_include=['id'], postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_review_book_id_review_date_id', 'review',
+            ['book_id', sa.text('review_date DESC'), 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_review_book_id_rating_start_review_date', 'review',
+            ['book_id', 'rating_start', 'review_date'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_review_book_id_rating_start_review_date', table_name='review', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_review_book_id_review_date_id', table_name='review', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_discount_book_id_active_price', table_name='discount', postgresql_concurrently=True, if_exists=True)
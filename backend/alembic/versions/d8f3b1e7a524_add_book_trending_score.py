@@ -0,0 +1,40 @@
+"""add book trending score
+
+Revision ID: d8f3b1e7a524
+Revises: b4e6a2c8d913
+Create Date: 2026-10-18 17:12:36.402918
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3b1e7a524'
+down_revision: Union[str, None] = 'b4e6a2c8d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('book', sa.Column('trending_score', sa.Float(), server_default='0', nullable=False))
+    op.create_index(op.f('ix_book_trending_score'), 'book', ['trending_score'], unique=False)
+    op.create_table('trending_state',
+    sa.Column('scope', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+    sa.Column('epoch', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_review_id', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_order_item_id', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('scope')
+    )
+    # Scores start empty; run `python jobs.py rebuild-trending` to fold in existing history.
+    op.execute("INSERT INTO trending_state (scope, epoch) VALUES ('trending', CURRENT_TIMESTAMP)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('trending_state')
+    op.drop_index(op.f('ix_book_trending_score'), table_name='book')
+    op.drop_column('book', 'trending_score')
@@ -0,0 +1,34 @@
+"""add book rating score
+
+Revision ID: e2a9c47b1f60
+Revises: d8f3b1e7a524
+Create Date: 2026-10-18 18:40:27.913551
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a9c47b1f60'
+down_revision: Union[str, None] = 'd8f3b1e7a524'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('book', sa.Column('rating_score', sa.Float(), server_default='0', nullable=False))
+    # Same formula as repositories.ratings.rating_score with its default prior (5 reviews of 3 stars).
+    op.execute(
+        "UPDATE book SET rating_score = (CAST(rating_sum AS FLOAT) + 15.0) / (review_count + 5) "
+        "WHERE review_count > 0"
+    )
+    op.create_index(op.f('ix_book_rating_score'), 'book', ['rating_score'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_book_rating_score'), table_name='book')
+    op.drop_column('book', 'rating_score')
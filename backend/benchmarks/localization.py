@@ -0,0 +1,100 @@
+"""Per-page cost of localizing /books prices into the visitor's currency.
+
+Run from the backend directory:
+
+    python -m benchmarks.localization [--books 2000] [--page-size 25] [--repeat 2000]
+
+Pages of the listing (page_size 25 by default) are localized four ways:
+
+* per-price: get_localized_price on Decimal prices, validating the rate table
+             and resolving the country each time (two calls per book)
+* resolved:  resolve_currency once per page, then convert_price per Decimal price
+* cold:      PriceLocalizer with an empty memo on every page
+* memoized:  the shared PriceLocalizer the /books route uses, after warm-up
+"""
+import argparse
+import time
+import warnings
+from typing import Callable, List
+
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from benchmarks.serialization import _tuple_rows, _seed
+from core.config import settings
+from core.localization import PriceLocalizer, convert_price, get_localized_price, resolve_currency
+from models.books import BookRead
+from repositories.lookups import author_lookup
+
+COUNTRIES = ["VN", "TH", "SG", "US", "ZZ"]
+
+
+def _per_price(books: List[BookRead], country_code: str) -> List[tuple]:
+    localized = []
+    for book in books:
+        price, symbol = get_localized_price(book.book_price.to_decimal(), country_code, settings.CURRENCY_RATES_DICT)
+        discount_price, _ = get_localized_price(book.discount_price.to_decimal(), country_code, settings.CURRENCY_RATES_DICT)
+        localized.append((str(price), str(discount_price), symbol))
+    return localized
+
+
+def _resolved(books: List[BookRead], country_code: str) -> List[tuple]:
+    rate, symbol = resolve_currency(country_code, settings.CURRENCY_RATES_DICT)
+    return [
+        (str(convert_price(book.book_price.to_decimal(), rate)), str(convert_price(book.discount_price.to_decimal(), rate)), symbol)
+        for book in books
+    ]
+
+
+def _localizer_pass(localizer: PriceLocalizer, books: List[BookRead], country_code: str) -> List[tuple]:
+    entry = localizer.entry_for(country_code)
+    prices = localizer.localize(entry, [price for book in books for price in (book.book_price, book.discount_price)])
+    return [(str(price), str(discount_price), entry.symbol) for price, discount_price in zip(prices[0::2], prices[1::2])]
+
+
+def _time_per_page(step: Callable[[List[BookRead], str], List[tuple]], pages: List[List[BookRead]], repeat: int) -> float:
+    started = time.perf_counter()
+    for i in range(repeat):
+        step(pages[i % len(pages)], COUNTRIES[i % len(COUNTRIES)])
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    # The per-price baseline warns on every unknown country; keep that cost but not the output.
+    warnings.simplefilter("ignore")
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        _seed(session, args.books)
+        author_lookup.load(session)
+        pages = [_tuple_rows(session, offset, args.page_size) for offset in range(0, args.books, args.page_size)]
+
+    shared = PriceLocalizer(settings.CURRENCY_RATES_DICT, memo_size=settings.LOCALIZED_PRICE_MEMO_ENTRIES)
+    steps = {
+        "per-price": _per_price,
+        "resolved": _resolved,
+        "cold": lambda books, country: _localizer_pass(PriceLocalizer(settings.CURRENCY_RATES_DICT), books, country),
+        "memoized": lambda books, country: _localizer_pass(shared, books, country),
+    }
+    for country in COUNTRIES:
+        results = {name: step(pages[0], country) for name, step in steps.items()}
+        assert all(result == results["per-price"] for result in results.values()), f"{country}: localizers disagree"
+
+    for step in steps.values():
+        _time_per_page(step, pages, args.repeat)
+    baseline = None
+    for name, step in steps.items():
+        per_page = _time_per_page(step, pages, args.repeat)
+        baseline = baseline or per_page
+        print(f"{name:>9}: {per_page:8.1f} us/page  ({baseline / per_page:5.2f}x vs per-price)")
+    print(f"memo: {shared.memo_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Price math in Decimal/float versus integer cents (core.money.Money).
+
+Run from the backend directory:
+
+    python -m benchmarks.money [--repeat 5000]
+
+Two workloads, each timed both ways over the same data:
+
+* listing: localize a 25-book /books page into a foreign currency and encode
+           it (decimal = resolve once, then Decimal multiply + quantize per
+           price; money = integer ratio per price), once with no memo on
+           either side and once with the same bounded per-price memo on both
+* order:   parse a 50-line order payload, check every line against the book's
+           list and discounted price, and total it (decimal = the old float
+           rounding checks and a Decimal sum; money = exact cent comparisons
+           and an integer sum)
+
+Money is not faster. Uncached it is about level with Decimal on the listing
+and a little slower on the order, and with the same memo on both sides
+Decimal comes out ahead. The route's speedup comes from the memo, not from the
+type. Money is there for exactness: orders compare whole cents instead of
+rounded floats.
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlmodel import SQLModel
+
+from core.config import settings
+from core.localization import PriceLocalizer, convert_price, resolve_currency
+from core.money import Money
+from core.serialization import dumps
+from models.orders import OrderCreate
+
+PAGE_SIZE = 25
+ORDER_LINES = 50
+COUNTRY = "TH"
+
+
+# The order models as they were before prices became Money.
+class _DecimalLine(SQLModel):
+    book_id: int
+    quantity: int
+    price: Decimal
+
+
+class _DecimalOrder(SQLModel):
+    user_id: int
+    items: List[_DecimalLine]
+
+
+def _listing_rows() -> List[Dict[str, Any]]:
+    random.seed(7)
+    rows = []
+    for book_id in range(1, PAGE_SIZE + 1):
+        price = Decimal(random.randint(500, 9999)).scaleb(-2)
+        rows.append({"id": book_id, "book_price": price, "discount_price": price - Decimal(random.randint(0, 400)).scaleb(-2)})
+    return rows
+
+
+def _decimal_listing(memo_size: int) -> Callable[[List[Dict[str, Any]]], bytes]:
+    rate, symbol = resolve_currency(COUNTRY, settings.CURRENCY_RATES_DICT)
+    # Keyed like PriceLocalizer's memo: (country, base price).
+    convert = lru_cache(maxsize=memo_size)(lambda country, price: convert_price(price, rate))
+
+    def run(rows: List[Dict[str, Any]]) -> bytes:
+        page = [
+            {
+                **row,
+                "price_symbol": symbol,
+                "localize_price": convert(COUNTRY, row["book_price"]),
+                "localize_discount_price": convert(COUNTRY, row["discount_price"]),
+            }
+            for row in rows
+        ]
+        return dumps(page)
+    return run
+
+
+def _money_listing(localizer: PriceLocalizer) -> Callable[[List[Dict[str, Any]]], bytes]:
+    def run(rows: List[Dict[str, Any]]) -> bytes:
+        entry = localizer.entry_for(COUNTRY)
+        prices = localizer.localize(entry, [price for row in rows for price in (row["book_price"], row["discount_price"])])
+        page = [
+            {**row, "price_symbol": entry.symbol, "localize_price": price, "localize_discount_price": discount_price}
+            for row, price, discount_price in zip(rows, prices[0::2], prices[1::2])
+        ]
+        return dumps(page)
+    return run
+
+
+def _order_payload(price_map: Dict[int, Tuple[Decimal, Decimal]]) -> Dict[str, Any]:
+    items = []
+    for line in range(ORDER_LINES):
+        book_id = line % len(price_map) + 1
+        book_price, discount_price = price_map[book_id]
+        items.append({"book_id": book_id, "quantity": line % 8 + 1, "price": str(discount_price if line % 2 else book_price)})
+    return {"user_id": 1, "items": items}
+
+
+def _decimal_order(payload: Dict[str, Any], price_map: Dict[int, Tuple[Decimal, Decimal]]) -> Tuple[Any, int]:
+    order = _DecimalOrder.model_validate(payload)
+    floats = {book_id: (float(price), float(discount)) for book_id, (price, discount) in price_map.items()}
+    errors = 0
+    for item in order.items:
+        book_price, discount_price = (round(value, 2) for value in floats[item.book_id])
+        item_price = round(float(item.price), 2)
+        if item_price != book_price and item_price != discount_price:
+            errors += 1
+    return sum(item.quantity * item.price for item in order.items), errors
+
+
+def _money_order(payload: Dict[str, Any], price_map: Dict[int, Tuple[Money, Money]]) -> Tuple[Any, int]:
+    order = OrderCreate.model_validate(payload)
+    errors = 0
+    for item in order.items:
+        book_price, discount_price = price_map[item.book_id]
+        if item.price != book_price and item.price != discount_price:
+            errors += 1
+    return sum((item.price * item.quantity for item in order.items), Money.zero()), errors
+
+
+def _time(step: Callable[[], Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        step()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+
+    decimal_rows = _listing_rows()
+    money_rows = [
+        {**row, "book_price": Money.of(row["book_price"]), "discount_price": Money.of(row["discount_price"])}
+        for row in decimal_rows
+    ]
+    memo_size = settings.LOCALIZED_PRICE_MEMO_ENTRIES
+    decimal_listing, memoized_decimal_listing = _decimal_listing(0), _decimal_listing(memo_size)
+    money_listing = _money_listing(PriceLocalizer(settings.CURRENCY_RATES_DICT, memo_size=0))
+    memoized_money_listing = _money_listing(PriceLocalizer(settings.CURRENCY_RATES_DICT, memo_size=memo_size))
+    bodies = {
+        listing(rows)
+        for listing, rows in (
+            (decimal_listing, decimal_rows), (memoized_decimal_listing, decimal_rows),
+            (money_listing, money_rows), (memoized_money_listing, money_rows),
+        )
+    }
+    assert len(bodies) == 1, "listing bodies disagree"
+
+    decimal_prices = {row["id"]: (row["book_price"], row["discount_price"]) for row in decimal_rows}
+    money_prices = {book_id: (Money.of(price), Money.of(discount)) for book_id, (price, discount) in decimal_prices.items()}
+    payload = _order_payload(decimal_prices)
+    decimal_total, decimal_errors = _decimal_order(payload, decimal_prices)
+    money_total, money_errors = _money_order(payload, money_prices)
+    assert (str(decimal_total), decimal_errors) == (str(money_total), money_errors) == (str(money_total), 0), "orders disagree"
+
+    workloads = [
+        (f"listing ({PAGE_SIZE} books)", lambda: decimal_listing(decimal_rows), lambda: money_listing(money_rows)),
+        ("listing, both memo", lambda: memoized_decimal_listing(decimal_rows), lambda: memoized_money_listing(money_rows)),
+        (f"order ({ORDER_LINES} lines)", lambda: _decimal_order(payload, decimal_prices), lambda: _money_order(payload, money_prices)),
+    ]
+    for name, decimal_step, money_step in workloads:
+        decimal_us, money_us = _time(decimal_step, args.repeat), _time(money_step, args.repeat)
+        print(f"{name:>19}: decimal {decimal_us:7.1f} us -> money {money_us:7.1f} us  ({decimal_us / money_us:4.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
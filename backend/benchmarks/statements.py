@@ -0,0 +1,115 @@
+"""Per-request cost of building the catalog statements versus reusing prebuilt ones.
+
+Run from the backend directory:
+
+    python -m benchmarks.statements [--books 2000] [--repeat 2000]
+
+Each listing/review statement is timed three ways:
+
+* build:   construct the statement and derive its compiled-cache key, the work
+           SQLAlchemy does before it can even look up cached SQL
+           (rebuilt = a fresh statement per call with values inlined, as the
+           query builders used to do; cached = the prebuilt bind-parameter
+           statement, whose cache key is memoized)
+* compile: compile to a SQL string with no cache, what every call paid when a
+           per-call literal changed the statement's cache key
+* execute: the full session.exec round trip on an in-memory SQLite catalog
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import desc, asc
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from benchmarks.serialization import _seed
+from models import Book, Review
+from models.books import SortByOptions
+from models.reviews import ReviewSortByOptions
+from repositories.books import (
+    _SORT_FIELDS,
+    _listing_page_statement,
+    construct_book_row_query,
+    listing_filter_params,
+    listing_sort_keys,
+)
+from repositories.reviews import _review_page_statements
+
+CATEGORY_IDS = [1, 2, 3]
+
+
+def _rebuilt_listing(page: int) -> Tuple[Any, Dict[str, Any]]:
+    query = construct_book_row_query().where(Book.category_id.in_(CATEGORY_IDS)).where(Book.avg_rating >= 1)
+    sort_keys = [(_SORT_FIELDS[name][0], descending) for name, descending in listing_sort_keys(SortByOptions.default)]
+    query = query.order_by(*[desc(column) if descending else asc(column) for column, descending in sort_keys])
+    return query.offset(page * 25).limit(26), {}
+
+
+def _cached_listing(page: int) -> Tuple[Any, Dict[str, Any]]:
+    shape, params = listing_filter_params(CATEGORY_IDS, None, 1)
+    statement = _listing_page_statement(shape, SortByOptions.default, False, False)
+    return statement, {**params, "offset": page * 25, "limit": 26}
+
+
+def _rebuilt_reviews(page: int) -> Tuple[Any, Dict[str, Any]]:
+    query = select(Review).where(Review.book_id == page % 50 + 1).order_by(desc(Review.review_date))
+    return query.offset(page * 20).limit(20), {}
+
+
+def _cached_reviews(page: int) -> Tuple[Any, Dict[str, Any]]:
+    _, statement = _review_page_statements(True, False, ReviewSortByOptions.newest_to_oldest)
+    return statement, {"book_id": page % 50 + 1, "offset": page * 20, "limit": 20}
+
+
+def _execute(session: Session, built: Tuple[Any, Dict[str, Any]]) -> List[Any]:
+    statement, params = built
+    return session.exec(statement, params=params or None).all()
+
+
+def _time(step: Callable[[int], Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for i in range(repeat):
+        step(i % 40)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        _seed(session, args.books)
+        dialect = session.get_bind().dialect
+
+        builders: List[Tuple[str, Callable, Callable]] = [
+            ("listing", _rebuilt_listing, _cached_listing),
+            ("reviews", _rebuilt_reviews, _cached_reviews),
+        ]
+        for name, rebuilt, cached in builders:
+            rebuilt_rows = _execute(session, rebuilt(3))
+            cached_rows = _execute(session, cached(3))
+            assert rebuilt_rows == cached_rows, f"{name}: statements disagree"
+
+            build = {
+                label: _time(lambda page: builder(page)[0]._generate_cache_key(), args.repeat)
+                for label, builder in (("rebuilt", rebuilt), ("cached", cached))
+            }
+            compile_us = _time(lambda page: rebuilt(page)[0].compile(dialect=dialect), args.repeat)
+            execute = {
+                label: _time(lambda page: _execute(session, builder(page)), args.repeat)
+                for label, builder in (("rebuilt", rebuilt), ("cached", cached))
+            }
+            print(
+                f"{name:>8}: build {build['rebuilt']:7.1f} -> {build['cached']:5.1f} us"
+                f" | uncached compile {compile_us:7.1f} us"
+                f" | execute {execute['rebuilt']:7.1f} -> {execute['cached']:7.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
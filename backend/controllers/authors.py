@@ -2,18 +2,18 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
 
-from controllers.deps import SessionDep
+from controllers.deps import AsyncSessionDep
 from models.response import ListPayload
-from repositories.utilities import get_unique_values
+from repositories import aio
 from shared import const_var 
 from models.authors import Author
 
 router = APIRouter(prefix="/authors", tags=["Authors"])
 
 @router.get("/range", response_model = ListPayload)
-def get_categories_range(session: SessionDep) -> Any:
+async def get_categories_range(session: AsyncSessionDep) -> Any:
   if not session:
     raise HTTPException(const_var.ErrorMessages.session_invalid)
 
-  return ListPayload(data=get_unique_values(session, Author, "author_name"), type="str")
+  return ListPayload(data=await aio.get_unique_values(session, Author, "author_name"), type="str")
 
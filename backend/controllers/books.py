@@ -1,137 +1,281 @@
-import math
 from typing import List, Optional
 
-from fastapi import APIRouter, Query, Path, HTTPException, status, Depends
+from fastapi import APIRouter, Query, Path, HTTPException, status, Depends, Request, Response
+from core.conditional import catalog_etag, not_modified, with_etag
 from core.geoip import get_country_code
-from core.localization import get_localized_price
-from models.books import BookRead, BookReadWithDetails, AllowedPageSize, SortByOptions, FeaturedSortOptions
-from models.paging_info import PaginatedResponse
-from controllers.deps import SessionDep
-from repositories.books import get_books, get_book_by_id, get_top_k_discounted_books, get_top_k_featured
+from core.localization import PriceLocalizer
+from core.serialization import serialize_for_route
+from models.books import BookRead, BookReadWithDetails, BookReadWithReviews, BookFacets, BookBatch, BookBatchRequest, AllowedPageSize, SortByOptions, FeaturedSortOptions
+from models.paging_info import PaginatedResponse, CountMode
+from controllers.deps import AsyncSessionDep
+from repositories import aio
+from repositories.utilities import InvalidCursorError
+from shared.const_var import ErrorMessages
 from core.config import settings
 
 router = APIRouter(tags=["Books"])
 
+_price_localizer: Optional[PriceLocalizer] = None
+
+def get_price_localizer() -> PriceLocalizer:
+    # Rebuilt only when the rate table itself is replaced.
+    global _price_localizer
+    if _price_localizer is None or _price_localizer.currency_rates is not settings.CURRENCY_RATES_DICT:
+        _price_localizer = PriceLocalizer(settings.CURRENCY_RATES_DICT, memo_size=settings.LOCALIZED_PRICE_MEMO_ENTRIES)
+    return _price_localizer
+
 def localize_book_prices(books: List[BookRead], country_code: Optional[str]) -> List[BookRead]:
     if not books:
         return books
-    
-    for idx, book in enumerate(books):
-        localize_discount_price, symbol = get_localized_price(
-            book.discount_price, 
-            country_code=country_code, 
-            currency_rates=settings.CURRENCY_RATES_DICT
-        )
-        localized_price, symbol = get_localized_price(
-            book.book_price, 
-            country_code=country_code, 
-            currency_rates=settings.CURRENCY_RATES_DICT
-        )
+
+    localizer = get_price_localizer()
+    entry = localizer.entry_for(country_code)
+    prices = localizer.localize(entry, [price for book in books for price in (book.book_price, book.discount_price)])
+    for book, localized_price, localized_discount_price in zip(books, prices[0::2], prices[1::2]):
         book.localize_price = localized_price
-        book.price_symbol = symbol
-        book.localize_discount_price = localize_discount_price
-        books[idx] = book
+        book.price_symbol = entry.symbol
+        book.localize_discount_price = localized_discount_price
     return books
 
 @router.get(
     "/book/{book_id}",
-    response_model=BookReadWithDetails,
-    summary="Get a single book details"
+    response_model=BookReadWithReviews,
+    summary="Get a single book's details with its newest reviews and rating histogram"
 )
-def get_book(
-    session: SessionDep,
+async def get_book(
+    session: AsyncSessionDep,
+    request: Request,
+    response: Response,
     book_id: int = Path(..., title="The ID of the book to get", ge=1),
     country_code: Optional[str] = Depends(get_country_code)
 ):
     if session is None: 
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database session not available")
 
-    db_book = get_book_by_id(session=session, book_id=book_id)
+    version = await aio.book_version(session, book_id)
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
+    etag = catalog_etag(request, version, country_code)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    db_book = await aio.get_book_by_id(session, book_id=book_id)
     if db_book is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Book not found")
 
     db_book = localize_book_prices([db_book], country_code)[0]
 
-    return db_book
+    return with_etag(db_book, response, etag)
+
+async def _batch_books(session: AsyncSessionDep, book_ids: List[int], country_code: Optional[str]) -> BookBatch:
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database session not available")
+    if not book_ids or any(book_id < 1 for book_id in book_ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=ErrorMessages.invalid_book_ids)
+    if len(book_ids) > settings.BOOK_BATCH_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=ErrorMessages.too_many_book_ids)
+
+    batch = await aio.get_books_by_ids(session, book_ids=book_ids)
+    batch.data = localize_book_prices(batch.data, country_code)
+    return batch
+
+@router.get(
+    "/books/batch",
+    response_model=BookBatch,
+    summary="Get many books by id in one request"
+)
+async def get_book_batch(
+    session: AsyncSessionDep,
+    ids: str = Query(..., title="Comma-separated book ids, e.g. 1,2,3"),
+    country_code: Optional[str] = Depends(get_country_code)
+):
+    try:
+        book_ids = [int(book_id) for book_id in ids.split(",") if book_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=ErrorMessages.invalid_book_ids)
+    return serialize_for_route("/books/batch", await _batch_books(session, book_ids, country_code))
+
+@router.post(
+    "/books/batch",
+    response_model=BookBatch,
+    summary="Get many books by id in one request (for id lists too long for a query string)"
+)
+async def post_book_batch(
+    session: AsyncSessionDep,
+    batch_request: BookBatchRequest,
+    country_code: Optional[str] = Depends(get_country_code)
+):
+    return serialize_for_route("/books/batch", await _batch_books(session, batch_request.ids, country_code))
 
 @router.get(
     "/books",
     response_model=PaginatedResponse,
     summary="List books with constrain and paging"
 )
-def list_books(
-    session: SessionDep,
+async def list_books(
+    session: AsyncSessionDep,
+    request: Request,
+    response: Response,
     page: int = Query(1, title="Page number", ge=1),
     page_size: AllowedPageSize = Query(AllowedPageSize.FIFTEEN, title="Items per page"),
     sort_by: SortByOptions = Query(SortByOptions.default, title="Sorting criteria"),
     category: Optional[str] = Query(None, title="Filter by category name"),
     author: Optional[str] = Query(None, title="Filter by author name"),
+    category_id: Optional[int] = Query(None, title="Filter by category id", ge=1),
+    author_id: Optional[int] = Query(None, title="Filter by author id", ge=1),
     min_rating: Optional[int] = Query(None, title="Minimum average rating", ge=1, le=5),
+    cursor: Optional[str] = Query(None, title="Opaque cursor from paging.next_cursor; overrides page"),
+    count_mode: CountMode = Query(CountMode.exact, title="How to compute paging totals"),
     country_code: Optional[str] = Depends(get_country_code)
 ):
     if session is None: 
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database session not available")
 
-    page_content = get_books(
-        session=session,
-        page=page,
-        page_size=page_size.value,
-        sort_by=sort_by,
+    # A revalidation costs one version lookup; the listing queries only run on a miss.
+    etag = catalog_etag(request, await aio.catalog_version(session), country_code)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    try:
+        page_content = await aio.get_books(
+            session,
+            page=page,
+            page_size=page_size.value,
+            sort_by=sort_by,
+            category_name=category,
+            author_name=author,
+            min_rating=min_rating,
+            cursor=cursor,
+            count_mode=count_mode,
+            category_id=category_id,
+            author_id=author_id
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=ErrorMessages.invalid_cursor)
+    page_content.data = localize_book_prices(page_content.data, country_code)
+    return with_etag(serialize_for_route("/books", page_content), response, etag)
+
+@router.get(
+    "/books/facets",
+    response_model=BookFacets,
+    summary="Category, author and rating counts for a listing filter"
+)
+async def list_book_facets(
+    session: AsyncSessionDep,
+    category: Optional[str] = Query(None, title="Filter by category name"),
+    author: Optional[str] = Query(None, title="Filter by author name"),
+    category_id: Optional[int] = Query(None, title="Filter by category id", ge=1),
+    author_id: Optional[int] = Query(None, title="Filter by author id", ge=1),
+    min_rating: Optional[int] = Query(None, title="Minimum average rating", ge=1, le=5)
+):
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database session not available")
+
+    return await aio.get_book_facets(
+        session,
         category_name=category,
         author_name=author,
-        min_rating=min_rating
+        min_rating=min_rating,
+        category_id=category_id,
+        author_id=author_id
+    )
+
+@router.get(
+    "/books/search",
+    response_model=PaginatedResponse,
+    summary="Full-text search over title, summary and author, ranked by relevance, popularity and discount"
+)
+async def search_book_catalog(
+    session: AsyncSessionDep,
+    q: str = Query(..., title="Search text", min_length=1, max_length=200),
+    page: int = Query(1, title="Page number", ge=1),
+    page_size: AllowedPageSize = Query(AllowedPageSize.FIFTEEN, title="Items per page"),
+    count_mode: CountMode = Query(CountMode.exact, title="How to compute paging totals"),
+    country_code: Optional[str] = Depends(get_country_code)
+):
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database session not available")
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=ErrorMessages.blank_search_query)
+
+    page_content = await aio.search_books(
+        session,
+        q=q,
+        page=page,
+        page_size=page_size.value,
+        count_mode=count_mode
     )
     page_content.data = localize_book_prices(page_content.data, country_code)
-    return page_content
+    return serialize_for_route("/books/search", page_content)
 
 @router.get(
     "/books/top-discounted",
     response_model=List[BookRead],
     summary="Handles the web request to list most discounted books"
 )
-def list_most_discounted_books(
-    session: SessionDep,
-    top_k: int = Query(10, title="Top k discounted book", ge=1),
+async def list_most_discounted_books(
+    session: AsyncSessionDep,
+    top_k: int = Query(10, title="Top k discounted book (capped at LEADERBOARD_DEPTH)", ge=1),
     country_code: Optional[str] = Depends(get_country_code)
 ):
     if session is None: 
         raise HTTPException(status_code=500, detail="Database session not available")
 
-    discounted_books = get_top_k_discounted_books(session=session, k=top_k)
+    discounted_books = await aio.get_top_k_discounted_books(session, k=top_k)
     discounted_books = localize_book_prices(discounted_books, country_code)
     
-    return discounted_books
+    return serialize_for_route("/books/top-discounted", discounted_books)
 
 @router.get(
     "/books/recommended",
     response_model=List[BookRead], 
     summary="Get top K featured books (recommended)"
 )
-def list_featured_books(
-    session: SessionDep,
-    top_k: int = Query(8, title="Number of books to return", ge=1),
+async def list_featured_books(
+    session: AsyncSessionDep,
+    top_k: int = Query(8, title="Number of books to return (capped at LEADERBOARD_DEPTH)", ge=1),
     country_code: Optional[str] = Depends(get_country_code)
 ):
     if session is None:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database session not available")
 
-    books = get_top_k_featured(session=session, sort_by=FeaturedSortOptions.RECOMMENDED, k=top_k)
+    books = await aio.get_top_k_featured(session, sort_by=FeaturedSortOptions.RECOMMENDED, k=top_k)
     books = localize_book_prices(books, country_code)
-    return books
+    return serialize_for_route("/books/recommended", books)
 
 @router.get(
     "/books/popular",
     response_model=List[BookRead], 
     summary="Get top K featured books (popular)"
 )
-def list_featured_books(
-    session: SessionDep,
-    top_k: int = Query(8, title="Number of books to return", ge=1),
+async def list_featured_books(
+    session: AsyncSessionDep,
+    top_k: int = Query(8, title="Number of books to return (capped at LEADERBOARD_DEPTH)", ge=1),
+    country_code: Optional[str] = Depends(get_country_code)
+):
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database session not available")
+
+    books = await aio.get_top_k_featured(session, sort_by=FeaturedSortOptions.POPULAR, k=top_k)
+    books = localize_book_prices(books, country_code)
+    return serialize_for_route("/books/popular", books)
+
+@router.get(
+    "/books/trending",
+    response_model=List[BookRead], 
+    summary="Get top K featured books (trending)"
+)
+async def list_featured_books(
+    session: AsyncSessionDep,
+    top_k: int = Query(8, title="Number of books to return (capped at LEADERBOARD_DEPTH)", ge=1),
     country_code: Optional[str] = Depends(get_country_code)
 ):
     if session is None:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database session not available")
 
-    books = get_top_k_featured(session=session, sort_by=FeaturedSortOptions.POPULAR, k=top_k)
+    books = await aio.get_top_k_featured(session, sort_by=FeaturedSortOptions.TRENDING, k=top_k)
     books = localize_book_prices(books, country_code)
-    return books
\ No newline at end of file
+    return serialize_for_route("/books/trending", books)
\ No newline at end of file
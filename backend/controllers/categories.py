@@ -2,19 +2,19 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
 
-from controllers.deps import SessionDep
+from controllers.deps import AsyncSessionDep
 from models.response import ListPayload
-from repositories.utilities import get_unique_values
+from repositories import aio
 from shared import const_var 
 from models.categories import Category
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 @router.get("/range", response_model = ListPayload)
-def get_categories_range(session: SessionDep) -> Any:
+async def get_categories_range(session: AsyncSessionDep) -> Any:
   if not session:
     raise HTTPException(const_var.ErrorMessages.session_invalid)
 
-  return ListPayload(data=get_unique_values(session, Category, "category_name"), type="str")
+  return ListPayload(data=await aio.get_unique_values(session, Category, "category_name"), type="str")
 
 
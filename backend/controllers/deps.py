@@ -1,22 +1,29 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session
-from sqlmodel import Session
-from models.books import Book
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models.orders import OrderCreate
-from repositories.books import construct_base_book_query
+from repositories import aio
 
 from core import security
 from core.config import settings
+from core.pool import pool_options
+from core.replicas import PRIMARY_BIND, READ_METHODS, ReplicaSet, is_pinned_to_primary
 from sqlmodel import create_engine
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, **pool_options(settings))
+async_engine = create_async_engine(settings.SQLALCHEMY_ASYNC_DATABASE_URI, **pool_options(settings, async_driver=True))
+replica_set = ReplicaSet(
+    [create_async_engine(uri, **pool_options(settings, async_driver=True)) for uri in settings.REPLICA_ASYNC_DATABASE_URIS],
+    check_timeout=settings.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS
+)
 
 from core.security import verify_token
 
@@ -34,7 +41,24 @@ def get_db() -> Generator[Session, None, None]:
         yield db_session
 
 
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    # Reads go to a healthy replica unless the client wrote within the pin window;
+    # everything else, and every read when no replica is healthy, uses the primary.
+    replica = None
+    if request.method in READ_METHODS and not is_pinned_to_primary(request):
+        replica = replica_set.choose()
+
+    # Keep loaded attributes after commit; touching an expired one outside run_sync would need IO.
+    if replica is None:
+        session = AsyncSession(async_engine, expire_on_commit=False)
+    else:
+        session = AsyncSession(replica, expire_on_commit=False, info={PRIMARY_BIND: async_engine.sync_engine})
+    async with session as db_session:
+        yield db_session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 def get_current_user_through_header(db_session: SessionDep, token: TokenDep) -> User:
@@ -56,55 +80,22 @@ def get_current_user_through_header(db_session: SessionDep, token: TokenDep) ->
 
 CurrentUser = Annotated[User, Depends(get_current_user_through_header)]
 
+def get_current_admin(current_user: CurrentUser) -> User:
+    if not current_user.admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
+
+CurrentAdmin = Annotated[User, Depends(get_current_admin)]
+
 from fastapi import HTTPException, status
 from shared.const_var import ErrorMessages 
 from typing import List
 
 async def validate_order_items(
-    db_session: SessionDep,
+    db_session: AsyncSessionDep,
     order_create: OrderCreate,
 ) -> OrderCreate:
-    book_ids = [item.book_id for item in order_create.items]
-
-    query, effective_price_label, _ = construct_base_book_query()
-    query = query.where(Book.id.in_(book_ids))
-
-    result = db_session.exec(query).all()
-
-    price_map = {
-        row.Book.id: {
-            "book_price": float(row.Book.book_price),
-            "discount_price": getattr(row, effective_price_label)
-        }
-        for row in result
-    }
-
-    errors: List[dict] = []
-
-    for item in order_create.items:
-        if item.book_id not in price_map:
-            errors.append({
-                "book_id": item.book_id,
-                "error": "Book does not exist"
-            })
-            continue
-
-        price_info = price_map[item.book_id]
-        book_price = round(price_info["book_price"], 2)
-        discount_price = round(price_info["discount_price"], 2)
-        item_price = round(float(item.price), 2)
-
-        if item_price != book_price and item_price != discount_price:
-            errors.append({
-                "book_id": item.book_id,
-                "error": f"Invalid price: expected {book_price} or {discount_price}, got {item_price}"
-            })
-
-        if item.quantity < 1 or item.quantity > 8:
-            errors.append({
-                "book_id": item.book_id,
-                "error": "Invalid quantity (must be 1-8)"
-            })
+    errors: List[dict] = await aio.find_order_item_errors(db_session, order_create)
 
     if errors:
         raise HTTPException(
@@ -0,0 +1,19 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from controllers.deps import CurrentAdmin, async_engine, engine, replica_set
+from core.pool import pool_status
+
+router = APIRouter(prefix="/internal", tags=["Internal"], include_in_schema=False)
+
+@router.get("/pool-stats", summary="Connection pool occupancy, checkout wait times and replica health")
+def read_pool_stats(current_admin: CurrentAdmin) -> Dict[str, Any]:
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+        "replicas": [
+            {**status, **pool_status(replica.engine.sync_engine)}
+            for replica, status in zip(replica_set.replicas, replica_set.status())
+        ],
+    }
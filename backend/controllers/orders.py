@@ -1,18 +1,18 @@
 from fastapi import APIRouter, status, HTTPException
 from typing import Any
 from fastapi.responses import JSONResponse
-from controllers.deps import SessionDep, ValidOrderDep
-from repositories.orders import create_order
+from controllers.deps import AsyncSessionDep, ValidOrderDep
+from repositories import aio
 from shared.const_var import SuccessMessages, ErrorMessages
 
 router = APIRouter(prefix="/order", tags=["Orders"])
 
 @router.post("")
-def add_order(
-    db_session: SessionDep,
+async def add_order(
+    db_session: AsyncSessionDep,
     order_create: ValidOrderDep,
 ) -> Any:
-    messages, status_code = create_order(db_session, order_create)
+    messages, status_code = await aio.create_order(db_session, order_create)
 
     if status_code >= 400:
       raise HTTPException(status_code=status_code, detail=messages)
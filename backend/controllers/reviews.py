@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Query, HTTPException, status
+from fastapi import APIRouter, Query, HTTPException, status, Request, Response
+from core.conditional import catalog_etag, not_modified, with_etag
 from typing import Any, Optional
 from models.books import AllowedPageSize
 from models.reviews import ReviewSortByOptions, ReviewMetadataResponse, ReviewCreate
-from controllers.deps import SessionDep
+from controllers.deps import AsyncSessionDep
 from models.response import ListPayload
-from repositories.reviews import get_reviews, get_review_metadata, create_review
-from repositories.utilities import get_unique_values
+from repositories import aio
 from shared import const_var 
 from models.paging_info import PaginatedResponse
 from models.reviews import Review
@@ -13,9 +13,17 @@ from models.reviews import Review
 router = APIRouter(prefix="", tags=["Reviews"])
 
 
+async def _book_reviews_etag(session: AsyncSessionDep, request: Request, book_id: int) -> Optional[str]:
+  # Every review write bumps its book's content version.
+  version = await aio.book_version(session, book_id)
+  return catalog_etag(request, version) if version is not None else None
+
+
 @router.get("/reviews", response_model=PaginatedResponse)
-def get_reviews_by_book_id(
-  session: SessionDep,
+async def get_reviews_by_book_id(
+  session: AsyncSessionDep,
+  request: Request,
+  response: Response,
   book_id: int,
   page: int = Query(1, title="Page number", ge=1),
   page_size: AllowedPageSize = Query(AllowedPageSize.FIFTEEN, title="Items per page"),
@@ -28,8 +36,13 @@ def get_reviews_by_book_id(
   if not book_id:
     raise HTTPException(const_var.ErrorMessages.invalid_request)
 
-  page_content = get_reviews(
-    session=session, 
+  etag = await _book_reviews_etag(session, request, book_id)
+  unchanged = etag and not_modified(request, etag)
+  if unchanged:
+    return unchanged
+
+  page_content = await aio.get_reviews(
+    session,
     page=page,
     page_size=page_size,
     sort_by=sort_by,
@@ -37,38 +50,46 @@ def get_reviews_by_book_id(
     book_id=book_id
   )
 
-  return page_content
+  return with_etag(page_content, response, etag) if etag else page_content
 
 
 @router.get("/reviews/metadata", response_model=ReviewMetadataResponse)
-def get_review_metadata_route(
-  session: SessionDep,
+async def get_review_metadata_route(
+  session: AsyncSessionDep,
+  request: Request,
+  response: Response,
   book_id: int = Query(..., description="Book ID to get review metadata for")
 ) -> Any:
   if not session:
     raise HTTPException(const_var.ErrorMessages.session_invalid)
 
-  return get_review_metadata(session, book_id=book_id)
+  etag = await _book_reviews_etag(session, request, book_id)
+  unchanged = etag and not_modified(request, etag)
+  if unchanged:
+    return unchanged
+
+  metadata = await aio.get_review_metadata(session, book_id=book_id)
+  return with_etag(metadata, response, etag) if etag else metadata
 
 
 @router.get("/reviews/range", response_model=ListPayload)
-def get_star_range(session: SessionDep) -> Any:
+async def get_star_range(session: AsyncSessionDep) -> Any:
   if not session:
     raise HTTPException(const_var.ErrorMessages.session_invalid)
 
-  return ListPayload(data=get_unique_values(session, Review, "rating_start"), type="int")
+  return ListPayload(data=await aio.get_unique_values(session, Review, "rating_start"), type="int")
 
 
 @router.post("/review", status_code=status.HTTP_201_CREATED)
-def create_single_review(
-  session: SessionDep,
+async def create_single_review(
+  session: AsyncSessionDep,
   review: ReviewCreate 
 ) -> Any:
   if not session:
     raise HTTPException(const_var.ErrorMessages.session_invalid)
 
   try:
-    create_review(db_session=session, review_create=review)
+    await aio.create_review(session, review_create=review)
     return {"message": const_var.SuccessMessages.success_create_order}
   
   except Exception as e:
@@ -8,6 +8,8 @@ from controllers import reviews
 from controllers import authors
 from controllers import users
 from controllers import orders
+from controllers import suggestions
+from controllers import internal
 
 api_router = APIRouter()
 api_router.include_router(authentication.router)
@@ -17,3 +19,5 @@ api_router.include_router(authors.router)
 api_router.include_router(reviews.router)
 api_router.include_router(users.router)
 api_router.include_router(orders.router)
+api_router.include_router(suggestions.router)
+api_router.include_router(internal.router)
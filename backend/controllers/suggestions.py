@@ -0,0 +1,25 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Query, HTTPException, status
+
+from controllers.deps import SessionDep
+from models.suggestions import Suggestion, SuggestionKind
+from repositories.suggestions import suggestion_index
+
+router = APIRouter(tags=["Suggestions"])
+
+@router.get(
+    "/suggest",
+    response_model=List[Suggestion],
+    summary="Type-ahead suggestions for book titles, author names and category names"
+)
+def suggest(
+    session: SessionDep,
+    prefix: str = Query(..., title="Text typed so far", min_length=1, max_length=120),
+    kind: Optional[SuggestionKind] = Query(None, title="Only suggest this kind of name"),
+    limit: int = Query(10, title="Maximum number of suggestions", ge=1, le=50)
+):
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database session not available")
+
+    return suggestion_index.suggest(session, prefix, kind=kind, limit=limit)
@@ -0,0 +1,40 @@
+import hashlib
+from datetime import date
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+# Localized prices differ per visitor, so only the browser may cache, and it must revalidate.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the inputs that fully determine a response body."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def catalog_etag(request: Request, version: int, country_code: Optional[str] = None) -> str:
+    # Today's date is part of the key because discounts start and end without a write.
+    query = sorted(request.query_params.multi_items())
+    return make_etag(request.url.path, version, date.today().isoformat(), country_code, query)
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response when If-None-Match already names `etag`."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    # If-None-Match uses the weak comparison, so W/"x" matches "x".
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+
+def with_etag(content: Any, response: Response, etag: str) -> Any:
+    """Attach the ETag to whichever response FastAPI will send."""
+    target = content if isinstance(content, Response) else response
+    target.headers["ETag"] = etag
+    target.headers["Cache-Control"] = CACHE_CONTROL
+    return content
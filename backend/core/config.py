@@ -126,6 +126,34 @@ class Settings:
     POSTGRES_USER: str
     BACKEND_CORS_ORIGINS: List[str]
     CURRENCY_RATES_DICT = {}
+    LOCALIZED_PRICE_MEMO_ENTRIES: int = 4096
+    COUNT_CACHE_MAX_ENTRIES: int = 2048
+    COUNT_CACHE_TTL_SECONDS: int = 60
+    SEARCH_COUNT_CACHE_MAX_ENTRIES: int = 1024
+    CATALOG_ENGINE: Literal["sql", "snapshot"] = "sql"
+    CATALOG_SNAPSHOT_CHECK_SECONDS: int = 30
+    LEADERBOARD_DEPTH: int = 100
+    LEADERBOARD_TTL_SECONDS: int = 300
+    LOOKUP_CACHE_TTL_SECONDS: int = 300
+    SUGGESTION_INDEX_CHECK_SECONDS: int = 30
+    BOOK_BATCH_MAX_IDS: int = 500
+    BOOK_DETAIL_RECENT_REVIEWS: int = 3
+    LISTING_TOTALS: Literal["query", "window"] = "window"
+    ALLOWED_LISTING_TOTALS = ("query", "window")
+    FAST_SERIALIZATION_ROUTES: List[str] = [
+        "/books", "/books/top-discounted", "/books/recommended", "/books/popular", "/books/trending", "/books/search", "/books/batch"
+    ]
+    ALLOWED_CATALOG_ENGINES = ("sql", "snapshot")
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    REQUEST_TIMING_HEADER: bool = True
+    REPLICA_DATABASE_URIS: List[str] = []
+    REPLICA_HEALTH_CHECK_SECONDS: int = 10
+    REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS: int = 2
+    READ_AFTER_WRITE_PIN_SECONDS: int = 5
     def __init__(self, env_file: str = ".env"):
         if not os.path.exists(env_file):
             warnings.warn(f".env file not found at {os.path.abspath(env_file)}", stacklevel=1)
@@ -196,6 +224,49 @@ class Settings:
         self.POSTGRES_PASSWORD = _get_str("POSTGRES_PASSWORD", self.POSTGRES_PASSWORD)
         self.POSTGRES_DB = _get_str("POSTGRES_DB", self.POSTGRES_DB)
 
+        self.LOCALIZED_PRICE_MEMO_ENTRIES = _get_int("LOCALIZED_PRICE_MEMO_ENTRIES", self.LOCALIZED_PRICE_MEMO_ENTRIES)
+
+        self.COUNT_CACHE_MAX_ENTRIES = _get_int("COUNT_CACHE_MAX_ENTRIES", self.COUNT_CACHE_MAX_ENTRIES)
+        self.COUNT_CACHE_TTL_SECONDS = _get_int("COUNT_CACHE_TTL_SECONDS", self.COUNT_CACHE_TTL_SECONDS)
+        self.SEARCH_COUNT_CACHE_MAX_ENTRIES = _get_int("SEARCH_COUNT_CACHE_MAX_ENTRIES", self.SEARCH_COUNT_CACHE_MAX_ENTRIES)
+
+        raw_catalog_engine = _get_str("CATALOG_ENGINE", self.CATALOG_ENGINE)
+        if raw_catalog_engine not in self.ALLOWED_CATALOG_ENGINES:
+            raise ValueError(f"Invalid CATALOG_ENGINE: '{raw_catalog_engine}'. Must be one of {self.ALLOWED_CATALOG_ENGINES}")
+        self.CATALOG_ENGINE = raw_catalog_engine
+        self.CATALOG_SNAPSHOT_CHECK_SECONDS = _get_int("CATALOG_SNAPSHOT_CHECK_SECONDS", self.CATALOG_SNAPSHOT_CHECK_SECONDS)
+
+        self.LEADERBOARD_DEPTH = _get_int("LEADERBOARD_DEPTH", self.LEADERBOARD_DEPTH)
+        self.LEADERBOARD_TTL_SECONDS = _get_int("LEADERBOARD_TTL_SECONDS", self.LEADERBOARD_TTL_SECONDS)
+        self.LOOKUP_CACHE_TTL_SECONDS = _get_int("LOOKUP_CACHE_TTL_SECONDS", self.LOOKUP_CACHE_TTL_SECONDS)
+        self.SUGGESTION_INDEX_CHECK_SECONDS = _get_int("SUGGESTION_INDEX_CHECK_SECONDS", self.SUGGESTION_INDEX_CHECK_SECONDS)
+        self.BOOK_BATCH_MAX_IDS = _get_int("BOOK_BATCH_MAX_IDS", self.BOOK_BATCH_MAX_IDS)
+        self.BOOK_DETAIL_RECENT_REVIEWS = _get_int("BOOK_DETAIL_RECENT_REVIEWS", self.BOOK_DETAIL_RECENT_REVIEWS)
+
+        raw_listing_totals = _get_str("LISTING_TOTALS", self.LISTING_TOTALS)
+        if raw_listing_totals not in self.ALLOWED_LISTING_TOTALS:
+            raise ValueError(f"Invalid LISTING_TOTALS: '{raw_listing_totals}'. Must be one of {self.ALLOWED_LISTING_TOTALS}")
+        self.LISTING_TOTALS = raw_listing_totals
+
+        raw_fast_routes = os.getenv("FAST_SERIALIZATION_ROUTES")
+        if raw_fast_routes is not None:
+            self.FAST_SERIALIZATION_ROUTES = parse_cors_value(raw_fast_routes)
+
+        self.DB_POOL_SIZE = _get_int("DB_POOL_SIZE", self.DB_POOL_SIZE)
+        self.DB_MAX_OVERFLOW = _get_int("DB_MAX_OVERFLOW", self.DB_MAX_OVERFLOW)
+        self.DB_POOL_TIMEOUT = _get_int("DB_POOL_TIMEOUT", self.DB_POOL_TIMEOUT)
+        self.DB_POOL_RECYCLE = _get_int("DB_POOL_RECYCLE", self.DB_POOL_RECYCLE)
+        self.DB_POOL_PRE_PING = _get_bool("DB_POOL_PRE_PING", self.DB_POOL_PRE_PING)
+        self.REQUEST_TIMING_HEADER = _get_bool("REQUEST_TIMING_HEADER", self.REQUEST_TIMING_HEADER)
+
+        raw_replica_uris = os.getenv("REPLICA_DATABASE_URIS")
+        self.REPLICA_DATABASE_URIS = parse_cors_value(raw_replica_uris) if raw_replica_uris is not None else []
+        self.REPLICA_HEALTH_CHECK_SECONDS = _get_int("REPLICA_HEALTH_CHECK_SECONDS", self.REPLICA_HEALTH_CHECK_SECONDS)
+        self.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS = _get_int(
+            "REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS", self.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS
+        )
+        self.READ_AFTER_WRITE_PIN_SECONDS = _get_int("READ_AFTER_WRITE_PIN_SECONDS", self.READ_AFTER_WRITE_PIN_SECONDS)
+
     @property
     def all_cors_origins(self) -> list[str]:
         backend_origins = self.BACKEND_CORS_ORIGINS if isinstance(self.BACKEND_CORS_ORIGINS, list) else []
@@ -216,6 +287,14 @@ class Settings:
             raise ValueError("Cannot build SQLALCHEMY_DATABASE_URI: Missing POSTGRES_USER or POSTGRES_SERVER")
         return f"{scheme}://{user}{password}@{host}{port}{db}"
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return self.SQLALCHEMY_DATABASE_URI.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    @property
+    def REPLICA_ASYNC_DATABASE_URIS(self) -> List[str]:
+        return [uri.replace("postgresql://", "postgresql+asyncpg://", 1) for uri in self.REPLICA_DATABASE_URIS]
+
     def _check_default_secret(self, var_name: str, value: str | None) -> None:
         if value == "changethis":
             message = f'The value of {var_name} is "changethis", for security, please change it.'
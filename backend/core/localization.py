@@ -1,21 +1,18 @@
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
 import warnings
 
-def get_localized_price(
-    base_price: Decimal,
+from core.money import CENT, ExchangeRate, Money
+
+def resolve_currency(
     country_code: Optional[str],
     currency_rates: Dict[str, Dict[str, str]],
     default_currency: str = "USD",
     default_symbol: str = "$",
     default_rate: Decimal = Decimal("1.0")
 ) -> Tuple[Decimal, str]:
-    if not isinstance(base_price, Decimal):
-      try:
-        base_price = Decimal(str(base_price))
-      except Exception as e:
-        raise ValueError(f"base_price must be convertible to Decimal: {e}")
-
+    """Return the (rate, symbol) pair used to localize prices for `country_code`."""
     if not isinstance(currency_rates, dict):
       raise ValueError("currency_rates must be a dictionary")
 
@@ -41,6 +38,87 @@ def get_localized_price(
       warnings.warn(f"No symbol for '{country_code}'. Using default.")
       symbol = default_symbol
 
-    localized_price = (base_price * rate).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return rate, symbol
+
+def convert_price(base_price: Decimal, rate: Decimal, quantizer: Decimal = CENT) -> Decimal:
+    if not isinstance(base_price, Decimal):
+      try:
+        base_price = Decimal(str(base_price))
+      except Exception as e:
+        raise ValueError(f"base_price must be convertible to Decimal: {e}")
+
+    return (base_price * rate).quantize(quantizer, rounding=ROUND_HALF_UP)
+
+def get_localized_price(
+    base_price: Decimal,
+    country_code: Optional[str],
+    currency_rates: Dict[str, Dict[str, str]],
+    default_currency: str = "USD",
+    default_symbol: str = "$",
+    default_rate: Decimal = Decimal("1.0")
+) -> Tuple[Decimal, str]:
+    if not isinstance(base_price, Decimal):
+      try:
+        base_price = Decimal(str(base_price))
+      except Exception as e:
+        raise ValueError(f"base_price must be convertible to Decimal: {e}")
+
+    rate, symbol = resolve_currency(country_code, currency_rates, default_currency, default_symbol, default_rate)
+    return convert_price(base_price, rate), symbol
+
+
+class CurrencyEntry(NamedTuple):
+    key: str
+    rate: Decimal
+    symbol: str
+    quantizer: Decimal
+    exchange: ExchangeRate
+
+    @classmethod
+    def build(cls, key: str, rate: Decimal, symbol: str, quantizer: Decimal = CENT) -> "CurrencyEntry":
+        return cls(key, rate, symbol, quantizer, ExchangeRate.of(rate, quantizer))
+
+
+DEFAULT_ENTRY_KEY = ""
+
+
+class PriceLocalizer:
+    """A currency table resolved once per country, and a bounded memo of converted prices.
+
+    `resolve_currency` validates and warns on every call, which is too slow for
+    a request loop; here each country is resolved when the table is built, an
+    unknown or malformed code falls back to the default entry with one dict
+    lookup, and `localize` converts a whole page of Money in one pass with
+    integer arithmetic, memoized per (country, base price) with
+    least-recently-used eviction.
+    """
+
+    def __init__(self, currency_rates: Dict[str, Dict[str, str]], memo_size: int = 4096):
+        self.currency_rates = currency_rates
+        with warnings.catch_warnings():
+            # The default is what resolve_currency falls back to; its warnings are expected here.
+            warnings.simplefilter("ignore")
+            self.default = CurrencyEntry.build(DEFAULT_ENTRY_KEY, *resolve_currency(None, currency_rates))
+        self.entries: Dict[str, CurrencyEntry] = {
+            code: CurrencyEntry.build(code, *resolve_currency(code, currency_rates))
+            for code in currency_rates
+            if isinstance(code, str) and len(code) == 2
+        }
+        self._convert = lru_cache(maxsize=memo_size)(self._convert_uncached)
+
+    def entry_for(self, country_code: Optional[str]) -> CurrencyEntry:
+        if isinstance(country_code, str) and len(country_code) == 2:
+            return self.entries.get(country_code.lower(), self.default)
+        return self.default
+
+    def _convert_uncached(self, key: str, base_cents: int) -> Money:
+        return Money(base_cents).convert(self.entries.get(key, self.default).exchange)
+
+    def localize(self, entry: CurrencyEntry, base_prices: Sequence[Optional[Money]]) -> List[Optional[Money]]:
+        """Convert `base_prices` into `entry`'s currency, in order; None stays None."""
+        # Keyed on plain ints so memo lookups hash and compare in C.
+        convert, key = self._convert, entry.key
+        return [None if price is None else convert(key, price.cents) for price in base_prices]
 
-    return localized_price, symbol
\ No newline at end of file
+    def memo_info(self):
+        return self._convert.cache_info()
@@ -0,0 +1,185 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional, Union
+
+from pydantic_core import core_schema
+from sqlalchemy.types import Numeric, TypeDecorator
+
+CENTS_PER_UNIT = 100
+CENT = Decimal("0.01")
+MAX_FLOAT_EXACT_CENTS = 2 ** 50
+
+
+@lru_cache(maxsize=8192)
+def format_cents(cents: int) -> str:
+    """The decimal string for `cents` ("12.50"); memoized since a catalog repeats the same prices."""
+    if -MAX_FLOAT_EXACT_CENTS < cents < MAX_FLOAT_EXACT_CENTS:
+        # cents / 100 is the closest double to the amount, so two-place formatting is exact.
+        return f"{cents / CENTS_PER_UNIT:.2f}"
+    units, remainder = divmod(abs(cents), CENTS_PER_UNIT)
+    return f"{'-' if cents < 0 else ''}{units}.{remainder:02d}"
+
+
+class ExchangeRate(NamedTuple):
+    """A currency rate as an exact integer ratio, rounding results to multiples of `step` cents."""
+    numerator: int
+    denominator: int
+    step: int
+
+    @classmethod
+    def of(cls, rate: Decimal, quantizer: Decimal = CENT) -> "ExchangeRate":
+        step = quantizer / CENT
+        if step < 1 or step != step.to_integral_value():
+            raise ValueError(f"quantizer must be a whole number of cents, got {quantizer}")
+        return cls(*Decimal(rate).as_integer_ratio(), int(step))
+
+
+class Money:
+    """An amount in integer minor units (cents).
+
+    Prices are stored as Numeric(p, 2) columns; MoneyType turns them into
+    Money on the way out of the database so that sums, comparisons and
+    currency conversion are integer arithmetic. They become decimal strings
+    ("12.50") only when a response is serialized.
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents: int):
+        self.cents = cents
+
+    @classmethod
+    def of(cls, value: Any) -> "Money":
+        """Parse a major-unit amount (Decimal, str, int or float), rounding half up to the cent."""
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, bool):
+            raise ValueError("amount must be a number, not a boolean")
+        if isinstance(value, int):
+            return cls(value * CENTS_PER_UNIT)
+        if isinstance(value, str):
+            # Fast path for the "12.5" / "-12.50" strings request payloads carry.
+            negative = value.startswith("-")
+            units, _, fraction = (value[1:] if negative else value).partition(".")
+            if units.isdecimal() and fraction.isdecimal() and len(fraction) <= 2:
+                cents = int(units) * CENTS_PER_UNIT + int(fraction) * (10 if len(fraction) == 1 else 1)
+                return cls(-cents if negative else cents)
+        try:
+            scaled = (value if isinstance(value, Decimal) else Decimal(str(value))).scaleb(2)
+            cents = int(scaled)
+            if cents != scaled:
+                cents = int(scaled.to_integral_value(rounding=ROUND_HALF_UP))
+            return cls(cents)
+        except (InvalidOperation, ValueError, TypeError, OverflowError) as e:
+            raise ValueError(f"invalid amount {value!r}: {e}") from e
+
+    @classmethod
+    def zero(cls) -> "Money":
+        return cls(0)
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+    def convert(self, rate: ExchangeRate) -> "Money":
+        """Multiply by `rate`, rounding half away from zero to a multiple of `rate.step` cents."""
+        numerator, denominator, step = rate
+        cents = self.cents
+        divisor = denominator * step
+        steps = (2 * abs(cents) * numerator + divisor) // (2 * divisor)
+        return Money((steps if cents >= 0 else -steps) * step)
+
+    def __add__(self, other: "Money") -> "Money":
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        return NotImplemented
+
+    def __sub__(self, other: "Money") -> "Money":
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        return NotImplemented
+
+    def __mul__(self, quantity: int) -> "Money":
+        if isinstance(quantity, int) and not isinstance(quantity, bool):
+            return Money(self.cents * quantity)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self) -> "Money":
+        return Money(-self.cents)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Money) and self.cents == other.cents
+
+    def __lt__(self, other: "Money") -> bool:
+        if isinstance(other, Money):
+            return self.cents < other.cents
+        return NotImplemented
+
+    def __le__(self, other: "Money") -> bool:
+        if isinstance(other, Money):
+            return self.cents <= other.cents
+        return NotImplemented
+
+    def __gt__(self, other: "Money") -> bool:
+        if isinstance(other, Money):
+            return self.cents > other.cents
+        return NotImplemented
+
+    def __ge__(self, other: "Money") -> bool:
+        if isinstance(other, Money):
+            return self.cents >= other.cents
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.cents)
+
+    def __str__(self) -> str:
+        return format_cents(self.cents)
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.of,
+            serialization=core_schema.plain_serializer_function_ser_schema(str, when_used="json")
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any) -> dict:
+        return {"type": "string", "format": "decimal", "examples": ["12.50"]}
+
+
+class MoneyType(TypeDecorator):
+    """A Numeric(precision, 2) column read and written as Money.
+
+    Values are read as floats rather than Decimals: a column with two decimal
+    places and at most 15 digits is always within 0.5 cents of the nearest
+    double, so rounding value * 100 recovers the exact cents without building
+    a Decimal per row.
+    """
+
+    impl = Numeric
+    cache_ok = True
+
+    def __init__(self, precision: int = 5):
+        if precision > 15:
+            raise ValueError("MoneyType supports at most 15 digits")
+        super().__init__(precision, 2, asdecimal=False)
+
+    def process_bind_param(self, value: Optional[Union[Money, Decimal, str]], dialect: Any) -> Optional[Decimal]:
+        if value is None:
+            return None
+        return Money.of(value).to_decimal()
+
+    def process_result_value(self, value: Optional[float], dialect: Any) -> Optional[Money]:
+        if value is None:
+            return None
+        if isinstance(value, (int, float)):
+            return Money(round(value * CENTS_PER_UNIT))
+        return Money.of(value)
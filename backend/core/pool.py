@@ -0,0 +1,137 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class RequestTiming:
+    """Per-request accumulator for wall time and time spent waiting on the pool."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.pool_wait = 0.0
+        self.checkouts = 0
+
+    def header(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return f'app;dur={total_ms:.1f}, pool;dur={self.pool_wait * 1000:.1f};desc="{self.checkouts} checkouts"'
+
+
+_request_timing: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+@contextmanager
+def request_timing() -> Iterator[RequestTiming]:
+    timing = RequestTiming()
+    token = _request_timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _request_timing.reset(token)
+
+
+class PoolStats:
+    """Thread-safe checkout counters shared by a pool and the pools it is recreated into."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, overflowed: bool = False, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.overflow_checkouts += overflowed
+            self.timeouts += timed_out
+
+        timing = _request_timing.get()
+        if timing is not None:
+            timing.pool_wait += wait
+            timing.checkouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "total_wait_ms": round(self.total_wait * 1000, 3),
+                "avg_wait_ms": round(self.total_wait * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+            }
+
+
+class _InstrumentedPool:
+    """Times every checkout from the underlying queue, including overflow connects and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record(
+            time.perf_counter() - started,
+            overflowed=self._overflow > overflow_before and self._overflow > 0
+        )
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(settings, async_driver: bool = False) -> Dict[str, Any]:
+    """Engine keyword arguments for an instrumented pool sized from `settings`."""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_driver else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """Current occupancy of `engine`'s pool plus its lifetime checkout stats, if instrumented."""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "idle": pool.checkedin(),
+            "in_use": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+from starlette.responses import Response
+
+PIN_COOKIE = "primary-pin"
+READ_METHODS = ("GET", "HEAD")
+# Session.info key holding the primary's sync engine on replica sessions, for
+# cache refreshes that must not see a lagging replica (see primary_session).
+PRIMARY_BIND = "primary_bind"
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        # Unhealthy until the first check passes, so a dead replica never serves a request.
+        self.healthy = False
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class ReplicaSet:
+    """Round-robin over the replicas that passed their last health check."""
+
+    def __init__(self, engines: List[AsyncEngine], check_timeout: float = 2.0):
+        self.replicas = [Replica(engine) for engine in engines]
+        self.check_timeout = check_timeout
+        self._next = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Optional[AsyncEngine]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        self._next = (self._next + 1) % len(healthy)
+        return healthy[self._next].engine
+
+    async def _check_one(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as connection:
+                await asyncio.wait_for(connection.execute(text("SELECT 1")), self.check_timeout)
+        except Exception as e:
+            if replica.healthy or replica.checked_at is None:
+                logging.warning(f"Read replica {replica.engine.url.host} failed its health check: {e}")
+            replica.healthy, replica.last_error = False, str(e)
+        else:
+            replica.healthy, replica.last_error = True, None
+        replica.checked_at = time.time()
+
+    async def check(self) -> None:
+        await asyncio.gather(*(self._check_one(replica) for replica in self.replicas))
+
+    async def monitor(self, interval_seconds: float) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(interval_seconds)
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "host": replica.engine.url.host,
+                "healthy": replica.healthy,
+                "checked_at": replica.checked_at,
+                "last_error": replica.last_error,
+            }
+            for replica in self.replicas
+        ]
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """True while the client is inside the read-your-writes window of its last write."""
+    try:
+        return float(request.cookies.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def pin_to_primary(response: Response, seconds: int) -> None:
+    response.set_cookie(PIN_COOKIE, f"{time.time() + seconds:.3f}", max_age=seconds, httponly=True, samesite="lax")
+
+
+class WriteTracker:
+    def __init__(self):
+        self.committed = False
+
+
+_write_tracker: ContextVar[Optional[WriteTracker]] = ContextVar("write_tracker", default=None)
+
+
+@contextmanager
+def track_writes() -> Iterator[WriteTracker]:
+    tracker = WriteTracker()
+    token = _write_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _write_tracker.reset(token)
+
+
+@event.listens_for(Session, "after_commit")
+def _note_commit(session: Session) -> None:
+    tracker = _write_tracker.get()
+    if tracker is not None and PRIMARY_BIND not in session.info:
+        tracker.committed = True
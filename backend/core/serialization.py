@@ -0,0 +1,49 @@
+import datetime
+import json
+from decimal import Decimal
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from core.config import settings
+from core.money import Money, format_cents
+
+
+def _encode_default(obj: Any) -> Any:
+    # Amounts are emitted as decimal strings, matching FastAPI's default response encoding.
+    if isinstance(obj, Money):
+        return format_cents(obj.cents)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        # model_dump applies excluded fields, aliases and field serializers the way FastAPI's encoding does;
+        # python mode leaves Money and Decimal for this hook, so amounts still go through format_cents.
+        return obj.model_dump(mode="python", by_alias=True)
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_encode_default)
+    return json.dumps(content, default=_encode_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Encodes response models with their own serializers, skipping response_model re-validation."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def serialize_for_route(route_key: str, content: Any) -> Any:
+    """Return `content` as a FastJSONResponse when `route_key` is listed in FAST_SERIALIZATION_ROUTES."""
+    if route_key in settings.FAST_SERIALIZATION_ROUTES:
+        return FastJSONResponse(content)
+    return content
@@ -0,0 +1,68 @@
+import argparse
+
+from sqlmodel import Session, create_engine
+from core.config import settings
+from repositories.ratings import rebuild_rating_aggregates, rescore_ratings
+from repositories.search import refresh_search_vectors
+from repositories.trending import rebuild_trending_scores, score_trending
+
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+
+
+def reconcile_ratings(session: Session) -> None:
+    """Rebuild every book's review aggregates from the review table"""
+    print("Rebuilding book rating aggregates...")
+    rebuild_rating_aggregates(session)
+    session.commit()
+    print("Rating aggregates rebuilt successfully!")
+
+
+def rescore_book_ratings(session: Session) -> None:
+    """Recompute every book's Bayesian rating score from its review aggregates"""
+    print("Rescoring book ratings...")
+    scored = rescore_ratings(session)
+    print(f"Rating scores recomputed for {scored} books!")
+
+
+def reindex_search(session: Session) -> None:
+    """Rebuild every book's full-text search vector (PostgreSQL only)"""
+    print("Rebuilding book search vectors...")
+    refresh_search_vectors(session)
+    session.commit()
+    print("Search vectors rebuilt successfully!")
+
+
+def update_trending(session: Session) -> None:
+    """Fold reviews and orders placed since the last run into trending scores"""
+    print("Updating trending scores...")
+    folded = score_trending(session)
+    print(f"Trending scores updated from {folded} new events!")
+
+
+def rebuild_trending(session: Session) -> None:
+    """Recompute every book's trending score from recent reviews and orders"""
+    print("Rebuilding trending scores...")
+    folded = rebuild_trending_scores(session)
+    print(f"Trending scores rebuilt from {folded} events!")
+
+
+JOBS = {
+    "reconcile-ratings": reconcile_ratings,
+    "rescore-ratings": rescore_book_ratings,
+    "reindex-search": reindex_search,
+    "score-trending": update_trending,
+    "rebuild-trending": rebuild_trending,
+}
+
+
+def main():
+    """Run one of the maintenance jobs against the configured database."""
+    parser = argparse.ArgumentParser(description="Bookworm maintenance jobs")
+    parser.add_argument("job", choices=sorted(JOBS))
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        JOBS[args.job](session)
+
+if __name__ == "__main__":
+    main()
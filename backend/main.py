@@ -7,7 +7,69 @@ import logging
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
-from core.geoip import lifespan
+from contextlib import asynccontextmanager
+from sqlmodel import Session
+from core.geoip import lifespan as geoip_lifespan
+import asyncio
+from controllers.deps import engine, replica_set
+from core.pool import request_timing
+from core.replicas import pin_to_primary, track_writes
+from repositories.lookups import warm_lookups
+from repositories.pricing import ensure_pricing_current, seconds_until_midnight
+from repositories.suggestions import warm_suggestions
+
+
+PRICING_RETRY_SECONDS = 60
+
+
+def _apply_discount_transitions() -> None:
+    with Session(engine) as session:
+        ensure_pricing_current(session)
+
+
+async def roll_pricing_over_at_midnight(first_delay: float) -> None:
+    """Apply the discount windows that open or close each day.
+
+    Read paths never write, so this is the only place the day's prices roll
+    over; a failed attempt is retried until it lands.
+    """
+    delay = first_delay
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            await asyncio.to_thread(_apply_discount_transitions)
+        except Exception as e:
+            logging.warning(f"Could not apply discount transitions, retrying in {PRICING_RETRY_SECONDS}s: {e}")
+            delay = PRICING_RETRY_SECONDS
+        else:
+            delay = seconds_until_midnight()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with geoip_lifespan(app):
+        try:
+            with Session(engine) as session:
+                warm_lookups(session)
+                warm_suggestions(session)
+        except Exception as e:
+            logging.warning(f"Could not warm lookups and suggestions, loading lazily: {e}")
+        try:
+            _apply_discount_transitions()
+            first_rollover = seconds_until_midnight()
+        except Exception as e:
+            logging.warning(f"Could not apply discount transitions, retrying in {PRICING_RETRY_SECONDS}s: {e}")
+            first_rollover = PRICING_RETRY_SECONDS
+        pricing_rollover = asyncio.create_task(roll_pricing_over_at_midnight(first_rollover))
+
+        replica_monitor = None
+        if replica_set:
+            await replica_set.check()
+            replica_monitor = asyncio.create_task(replica_set.monitor(settings.REPLICA_HEALTH_CHECK_SECONDS))
+        yield
+        pricing_rollover.cancel()
+        if replica_monitor is not None:
+            replica_monitor.cancel()
 
 def custom_generate_unique_id(route: APIRoute) -> str:
     return f"{route.tags[0]}-{route.name}"
@@ -29,6 +91,23 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+@app.middleware("http")
+async def add_request_timing(request: Request, call_next):
+    if not settings.REQUEST_TIMING_HEADER:
+        return await call_next(request)
+    with request_timing() as timing:
+        response = await call_next(request)
+        response.headers["Server-Timing"] = timing.header()
+    return response
+
+@app.middleware("http")
+async def pin_writers_to_primary(request: Request, call_next):
+    with track_writes() as writes:
+        response = await call_next(request)
+    if writes.committed:
+        pin_to_primary(response, settings.READ_AFTER_WRITE_PIN_SECONDS)
+    return response
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     exc_str = f'{exc}'.replace('\n', ' ').replace('   ', ' ')
@@ -7,6 +7,9 @@ from .books import Book
 from .reviews import Review 
 from .discounts import Discount 
 from .orders import Order, OrderItem 
+from .pricing import BookPricing 
+from .versions import CatalogVersion 
+from .trending import TrendingState
 
 __all__ = [
     "User",
@@ -17,4 +20,7 @@ __all__ = [
     "Discount",
     "Order",
     "OrderItem",
+    "BookPricing",
+    "CatalogVersion",
+    "TrendingState",
 ]
\ No newline at end of file
@@ -1,11 +1,11 @@
-from decimal import Decimal
 from typing import List, Optional
 
-from sqlmodel import Column, Numeric
+from sqlmodel import Column
+from core.money import Money, MoneyType
 from sqlmodel import Field, Relationship, SQLModel
 from models.categories import Category, CategoryRead
 from models.authors import Author, AuthorRead 
-from models.reviews import Review, ReviewRead
+from models.reviews import Review, ReviewRead, ReviewMetadataResponse
 from models.discounts import Discount
 from models.orders import OrderItem
 from enum import Enum
@@ -21,21 +21,35 @@ class SortByOptions(str, Enum):
   popularity = "popularity"
   price_asc = "price_asc"
   price_desc = "price_desc"
+  trending = "trending"
+  top_rated = "top_rated"
 
 class FeaturedSortOptions(str, Enum):
   RECOMMENDED = "recommended" 
   POPULAR = "popular"       
+  TRENDING = "trending"
   
 class BookBase(SQLModel):
   book_title: str = Field(index=True, max_length=255)
   book_summary: Optional[str] = Field(default=None) 
-  book_price: Decimal = Field(sa_column=Column(Numeric(5, 2)))
+  book_price: Money = Field(sa_column=Column(MoneyType(5)))
   book_cover_photo: Optional[str] = Field(default=None, max_length=200)
   category_id: int = Field(foreign_key="category.id", index=True)
   author_id: int = Field(foreign_key="author.id", index=True)
 
 class Book(BookBase, table=True):
   id: Optional[int] = Field(default=None, primary_key=True)
+  review_count: int = Field(default=0, index=True, sa_column_kwargs={"server_default": "0"})
+  rating_sum: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  avg_rating: float = Field(default=0.0, index=True, sa_column_kwargs={"server_default": "0"})
+  rating_score: float = Field(default=0.0, index=True, sa_column_kwargs={"server_default": "0"})
+  rating_1_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  rating_2_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  rating_3_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  rating_4_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  rating_5_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  content_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  trending_score: float = Field(default=0.0, index=True, sa_column_kwargs={"server_default": "0"})
   category: "Category" = Relationship(back_populates="books")
   author: "Author" = Relationship(back_populates="books")
   reviews: List["Review"] = Relationship(back_populates="book")
@@ -48,11 +62,37 @@ class BookCreate(BookBase):
 class BookRead(BookBase):
   id: int
   price_symbol: Optional[str] = "$"
-  localize_price: Optional[Decimal] = None
-  localize_discount_price: Optional[Decimal] = None
+  localize_price: Optional[Money] = None
+  localize_discount_price: Optional[Money] = None
   author_name: Optional[str]
-  discount_price: Optional[Decimal]
+  discount_price: Optional[Money]
   
 class BookReadWithDetails(BookRead):
   category_name: Optional[str]
 
+class BookReadWithReviews(BookReadWithDetails):
+  recent_reviews: List[ReviewRead] = []
+  review_metadata: ReviewMetadataResponse
+
+class BookBatchRequest(SQLModel):
+  ids: List[int]
+
+class BookBatch(SQLModel):
+  data: List[BookReadWithDetails]
+  missing_ids: List[int]
+
+
+class FacetCount(SQLModel):
+  id: int
+  name: Optional[str]
+  count: int
+
+class RatingFacetCount(SQLModel):
+  min_rating: int
+  count: int
+
+class BookFacets(SQLModel):
+  total_items: int
+  categories: List[FacetCount]
+  authors: List[FacetCount]
+  ratings: List[RatingFacetCount]
@@ -1,9 +1,9 @@
 
 import datetime
-from decimal import Decimal
 from typing import Optional
 
-from sqlmodel import Column, Numeric
+from sqlmodel import Column, Index
+from core.money import Money, MoneyType
 from sqlmodel import Field, Relationship, SQLModel
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -13,8 +13,8 @@ class DiscountBase(SQLModel):
   book_id: int = Field(foreign_key="book.id", index=True)
   discount_start_date: datetime.date
   discount_end_date: Optional[datetime.date]
-  discount_price: Decimal = Field(
-    sa_column=Column(Numeric(5, 2))
+  discount_price: Money = Field(
+    sa_column=Column(MoneyType(5))
   )
 
 class Discount(DiscountBase, table=True):
@@ -22,6 +22,13 @@ class Discount(DiscountBase, table=True):
 
   book: "Book" = Relationship(back_populates="discounts")
 
+# Active-discount lookup per book; with id included the pricing subquery is index-only on PostgreSQL.
+Index(
+  "ix_discount_book_id_active_price",
+  Discount.book_id, Discount.discount_start_date, Discount.discount_end_date, Discount.discount_price,
+  postgresql_include=["id"]
+)
+
 class DiscountCreate(DiscountBase):
   pass
 
@@ -1,10 +1,10 @@
 import datetime
-from decimal import Decimal
 from typing import List, Optional
 
-from sqlalchemy import Column, DateTime, Numeric
+from sqlalchemy import Column, DateTime
 from sqlalchemy.sql import func
 from sqlmodel import Field, Relationship, SQLModel
+from core.money import Money, MoneyType
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -20,8 +20,8 @@ class OrderBase(SQLModel):
 
 class Order(OrderBase, table=True):
   id: Optional[int] = Field(default=None, primary_key=True)
-  order_amount: Decimal = Field(
-    sa_column=Column(Numeric(8, 2))
+  order_amount: Money = Field(
+    sa_column=Column(MoneyType(8))
   )
 
   user: "User" = Relationship(back_populates="orders")
@@ -42,7 +42,7 @@ class OrderReadWithDetails(OrderRead):
 class OrderItemBase(SQLModel):
   book_id: int = Field(foreign_key="book.id", index=True)
   quantity: int
-  price: Decimal = Field(sa_column=Column(Numeric(5, 2)))
+  price: Money = Field(sa_column=Column(MoneyType(5)))
 
 class OrderItem(OrderItemBase, table=True):
   __tablename__ = "order_item"
@@ -1,15 +1,23 @@
 from typing import Generic, TypeVar, List, Optional, Dict
+from enum import Enum
 from pydantic import BaseModel
 
 T = TypeVar('T')
 
+class CountMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
 class PagingInfo(BaseModel):
     page: int
     page_size: int
-    total_items: int
-    total_pages: int
+    total_items: Optional[int]
+    total_pages: Optional[int]
+    total_is_estimate: bool = False
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
 
 class PaginatedResponse(BaseModel, Generic[T]):
     data: List[T]
@@ -0,0 +1,24 @@
+import datetime
+from typing import Optional
+
+from sqlmodel import Column, Integer, ForeignKey
+from core.money import Money, MoneyType
+from sqlmodel import Field, SQLModel
+
+class BookPricing(SQLModel, table=True):
+  __tablename__ = "book_pricing"
+
+  book_id: int = Field(
+    sa_column=Column(Integer, ForeignKey("book.id", ondelete="CASCADE"), primary_key=True)
+  )
+  effective_price: Money = Field(
+    sa_column=Column(MoneyType(5), nullable=False, index=True)
+  )
+  discount_amount: Money = Field(
+    sa_column=Column(MoneyType(5), nullable=False, index=True)
+  )
+  active_discount_id: Optional[int] = Field(
+    default=None,
+    sa_column=Column(Integer, ForeignKey("discount.id", ondelete="SET NULL"), nullable=True)
+  )
+  priced_on: datetime.date = Field(index=True)
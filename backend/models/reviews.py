@@ -2,7 +2,7 @@
 from typing import List, Optional, Dict
 from enum import Enum
 import datetime
-from sqlmodel import Column, DateTime
+from sqlmodel import Column, DateTime, Index
 from sqlmodel import Field, Relationship, SQLModel, func
 from models.paging_info import PagingInfo
 from typing import TYPE_CHECKING
@@ -45,6 +45,10 @@ class Review(ReviewBase, table=True):
 
   book: "Book" = Relationship(back_populates="reviews")
 
+# Review paging (newest/oldest per book) and the per-book star histogram / rating filter.
+Index("ix_review_book_id_review_date_id", Review.book_id, Review.review_date.desc(), Review.id)
+Index("ix_review_book_id_rating_start_review_date", Review.book_id, Review.rating_start, Review.review_date)
+
 class ReviewCreate(ReviewBase):
   review_date: Optional[datetime.datetime] = None
 
@@ -0,0 +1,14 @@
+from enum import Enum
+from pydantic import BaseModel
+
+
+class SuggestionKind(str, Enum):
+  title = "title"
+  author = "author"
+  category = "category"
+
+class Suggestion(BaseModel):
+  kind: SuggestionKind
+  id: int
+  label: str
+  weight: int
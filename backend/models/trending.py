@@ -0,0 +1,23 @@
+import datetime
+from typing import Dict
+
+from sqlalchemy import JSON, text
+from sqlmodel import Column, DateTime
+from sqlmodel import Field, SQLModel
+
+class TrendingState(SQLModel, table=True):
+  __tablename__ = "trending_state"
+
+  scope: str = Field(primary_key=True, max_length=32)
+  # Scores are stored forward-decayed relative to this instant; see repositories.trending.
+  epoch: datetime.datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+  last_review_id: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  last_order_item_id: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+  # Ids a watermark passed while they were missing (str(id) -> unix time first noticed),
+  # rechecked until their transaction commits or the grace period runs out.
+  review_id_gaps: Dict[str, float] = Field(
+    default_factory=dict, sa_column=Column(JSON, nullable=False, server_default=text("'{}'"))
+  )
+  order_item_id_gaps: Dict[str, float] = Field(
+    default_factory=dict, sa_column=Column(JSON, nullable=False, server_default=text("'{}'"))
+  )
@@ -0,0 +1,7 @@
+from sqlmodel import Field, SQLModel
+
+class CatalogVersion(SQLModel, table=True):
+  __tablename__ = "catalog_version"
+
+  scope: str = Field(primary_key=True, max_length=32)
+  version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
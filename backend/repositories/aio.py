@@ -0,0 +1,47 @@
+"""Async entry points for the repository layer.
+
+Each function runs its sync counterpart on the AsyncSession's sync facade
+with `run_sync`. Query builders, in-memory caches and flush hooks are
+therefore shared with the sync path (seeding, jobs, tests), while every
+driver round trip is awaited on the event loop instead of blocking it.
+"""
+import functools
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+from repositories import books, orders, reviews, search, utilities, versions
+
+T = TypeVar("T")
+
+
+def awaitable(sync_function: Callable[..., T], session_keyword: Optional[str] = None) -> Callable[..., Awaitable[T]]:
+    """Wrap a repository function whose session is its first argument (or the keyword `session_keyword`)."""
+    @functools.wraps(sync_function)
+    async def run(session: AsyncSession, *args: Any, **kwargs: Any) -> T:
+        if session_keyword is None:
+            return await session.run_sync(sync_function, *args, **kwargs)
+        return await session.run_sync(
+            lambda sync_session: sync_function(*args, **{session_keyword: sync_session}, **kwargs)
+        )
+    return run
+
+
+get_books = awaitable(books.get_books)
+get_book_by_id = awaitable(books.get_book_by_id)
+get_books_by_ids = awaitable(books.get_books_by_ids)
+get_book_facets = awaitable(books.get_book_facets)
+get_top_k_discounted_books = awaitable(books.get_top_k_discounted_books)
+get_top_k_featured = awaitable(books.get_top_k_featured)
+search_books = awaitable(search.search_books)
+
+get_reviews = awaitable(reviews.get_reviews)
+get_review_metadata = awaitable(reviews.get_review_metadata)
+create_review = awaitable(reviews.create_review, session_keyword="db_session")
+
+find_order_item_errors = awaitable(orders.find_order_item_errors)
+create_order = awaitable(orders.create_order)
+
+get_unique_values = awaitable(utilities.get_unique_values)
+
+book_version = awaitable(versions.book_version)
+catalog_version = awaitable(versions.catalog_version)
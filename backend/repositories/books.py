@@ -1,63 +1,313 @@
-from typing import List, Optional, Tuple, Dict, Any
-from datetime import date
-from sqlmodel import Session, select, func, and_, or_, case, desc, asc, Float, SQLModel
-from sqlalchemy.orm import selectinload
+import functools
+import json
+from collections import Counter
+from typing import Callable, List, Optional, Tuple, Dict, Any, Set
+from sqlmodel import Session, select, func, desc, asc
+from sqlalchemy import Integer, bindparam, case
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql.expression import label
-from models import Book, Discount, Category, Author, Review
-from models.paging_info import PaginatedResponse, PagingInfo
-from models.books import SortByOptions, AllowedPageSize, BookRead, FeaturedSortOptions, BookReadWithDetails
-from models.reviews import ReviewRead
-
-def construct_base_book_query() -> Tuple[Any, str, str, str, str]:
-    current_date = date.today()
+from models import Book, Category, Author, Review, BookPricing
+from models.paging_info import PaginatedResponse, PagingInfo, CountMode
+from models.books import (
+    SortByOptions, AllowedPageSize, BookRead, FeaturedSortOptions, BookReadWithDetails,
+    BookFacets, FacetCount, RatingFacetCount, BookBatch, BookReadWithReviews
+)
+from models.reviews import ReviewRead, ReviewMetadataResponse
+from repositories.ratings import STARS, star_column
+from repositories.utilities import encode_cursor, decode_cursor, keyset_predicate
+from repositories.events import on_commit
+from repositories import catalog_snapshot
+from repositories.leaderboards import leaderboards
+from repositories.lookups import author_lookup, category_lookup, resolve_filter_ids
+from core.cache import BoundedCache
+from core.money import Money
+from core.config import settings
+
+def construct_base_book_query() -> Tuple[Any, str, str]:
     effective_price_label = "discount_price"
     dicount_amount_label = "discount_amount"
 
-    discount_subquery = (
+    query = (
         select(
-            Discount.book_id,
-            func.min(Discount.discount_price).label("min_discount_price")
-        )
-        .where(
-            and_(
-                Discount.discount_start_date <= current_date,
-                or_(
-                    Discount.discount_end_date is None,
-                    Discount.discount_end_date >= current_date
-                )
-            )
+            Book,
+            label(effective_price_label, BookPricing.effective_price),
+            label(dicount_amount_label, BookPricing.discount_amount)
         )
-        .group_by(Discount.book_id)
-        .subquery()
+        .join(BookPricing, BookPricing.book_id == Book.id)
     )
+    return query, effective_price_label, dicount_amount_label
 
-    query = (
+
+_count_cache = BoundedCache(settings.COUNT_CACHE_MAX_ENTRIES, settings.COUNT_CACHE_TTL_SECONDS)
+_facet_cache = BoundedCache(settings.COUNT_CACHE_MAX_ENTRIES, settings.COUNT_CACHE_TTL_SECONDS)
+
+
+@on_commit(Book, Review, Category, Author)
+def _invalidate_book_counts(writes: Dict[type, Optional[Set[int]]]) -> None:
+    _count_cache.clear()
+    _facet_cache.clear()
+
+
+def _estimate_row_count(session: Session, query: Any, params: Dict[str, Any]) -> Optional[int]:
+    connection = session.connection()
+    compiled = query.params(params).compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def build_count_statements(filtered_query: Any) -> Tuple[Any, Any]:
+    """(distinct ids, count) statements for a filtered query; callers cache only fixed filter shapes."""
+    ids_query = filtered_query.with_only_columns(Book.id).distinct()
+    return ids_query, select(func.count()).select_from(ids_query.subquery())
+
+
+def count_filtered_books(
+    session: Session,
+    count_statements: Tuple[Any, Any],
+    filter_key: Tuple[Any, ...],
+    count_mode: CountMode = CountMode.exact,
+    params: Optional[Dict[str, Any]] = None,
+    cache: BoundedCache = _count_cache
+) -> Tuple[Optional[int], bool]:
+    """Return (total, is_estimate) for a listing filter, serving repeated filters from `cache`."""
+    if count_mode == CountMode.none:
+        return None, False
+
+    cached_total = cache.get(filter_key)
+    if cached_total is not None:
+        return cached_total, False
+
+    ids_query, count_query = count_statements
+    if count_mode == CountMode.estimate and session.get_bind().dialect.name == "postgresql":
+        estimated_total = _estimate_row_count(session, ids_query, params or {})
+        if estimated_total is not None:
+            return estimated_total, True
+
+    total_items = session.exec(count_query, params=params).one()
+    cache.set(filter_key, total_items)
+    return total_items, False
+
+
+REVIEW_COUNT_LABEL = "review_count"
+AVERAGE_RATING_LABEL = "average_rating"
+TRENDING_SCORE_LABEL = "trending_score"
+RATING_SCORE_LABEL = "rating_score"
+
+# Listing sort keys by name, most significant first; Book.id always breaks ties.
+LISTING_SORT_KEYS: Dict[SortByOptions, List[Tuple[str, bool]]] = {
+    SortByOptions.default: [("discount_amount", True), ("effective_price", False)],
+    SortByOptions.popularity: [("review_count", True), ("effective_price", False)],
+    SortByOptions.price_asc: [("effective_price", False)],
+    SortByOptions.price_desc: [("effective_price", True)],
+    SortByOptions.trending: [("trending_score", True), ("effective_price", False)],
+    SortByOptions.top_rated: [("rating_score", True), ("effective_price", False)],
+}
+
+# name -> (column, parser of cursor value, result label)
+_SORT_FIELDS: Dict[str, Tuple[Any, Callable[[Any], Any], Optional[str]]] = {
+    "discount_amount": (BookPricing.discount_amount, Money.of, "discount_amount"),
+    "effective_price": (BookPricing.effective_price, Money.of, "discount_price"),
+    "review_count": (Book.review_count, int, REVIEW_COUNT_LABEL),
+    "trending_score": (Book.trending_score, float, TRENDING_SCORE_LABEL),
+    "rating_score": (Book.rating_score, float, RATING_SCORE_LABEL),
+    "id": (Book.id, int, "id"),
+}
+
+
+def listing_sort_keys(sort_by: SortByOptions) -> List[Tuple[str, bool]]:
+    return LISTING_SORT_KEYS[sort_by] + [("id", False)]
+
+
+def decode_listing_cursor(cursor: str, sort_by: SortByOptions) -> List[Any]:
+    return decode_cursor(cursor, sort_by.value, [_SORT_FIELDS[name][1] for name, _ in listing_sort_keys(sort_by)])
+
+
+def _encode_listing_cursor(sort_by: SortByOptions, data: Any) -> str:
+    return encode_cursor(sort_by.value, [data[_SORT_FIELDS[name][2]] for name, _ in listing_sort_keys(sort_by)])
+
+
+# Columns of a listing row that map one-to-one onto BookRead fields.
+BOOK_ROW_FIELDS = (
+    "id", "book_title", "book_summary", "book_price", "book_cover_photo", "category_id", "author_id", "discount_price"
+)
+
+
+def construct_book_row_query() -> Any:
+    """Select exactly the columns a listing needs, so rows come back as tuples instead of ORM Books."""
+    return (
         select(
-            Book,
-            label(
-                effective_price_label,
-                case(
-                    (
-                        discount_subquery.c.min_discount_price != None,
-                        discount_subquery.c.min_discount_price
-                    ),
-                    else_= Book.book_price
-                ).cast(Float)
-            ),
-            label(
-                dicount_amount_label,
-                case(
-                    (
-                        discount_subquery.c.min_discount_price != None,
-                        (Book.book_price - discount_subquery.c.min_discount_price)
-                    ),
-                    else_=0.0
-                ).cast(Float)
-            )
+            Book.id,
+            Book.book_title,
+            Book.book_summary,
+            Book.book_price,
+            Book.book_cover_photo,
+            Book.category_id,
+            Book.author_id,
+            BookPricing.effective_price.label("discount_price"),
+            BookPricing.discount_amount.label("discount_amount"),
+            Book.review_count.label(REVIEW_COUNT_LABEL),
+            Book.avg_rating.label(AVERAGE_RATING_LABEL),
+            Book.trending_score.label(TRENDING_SCORE_LABEL),
+            Book.rating_score.label(RATING_SCORE_LABEL)
         )
-        .join(discount_subquery, discount_subquery.c.book_id == Book.id, isouter=True)
+        .join(BookPricing, BookPricing.book_id == Book.id)
     )
-    return query, effective_price_label, dicount_amount_label
+
+
+def _book_reads_from_rows(session: Session, rows: List[Any], read_model: type[BookRead] = BookRead) -> List[BookRead]:
+    with_category = "category_name" in read_model.model_fields
+    items = []
+    for row in rows:
+        data = row._mapping
+        book_data = {field: data[field] for field in BOOK_ROW_FIELDS}
+        book_data["author_name"] = author_lookup.name_for(session, book_data["author_id"])
+        if with_category:
+            book_data["category_name"] = category_lookup.name_for(session, book_data["category_id"])
+        # Values come straight from typed columns, so the model is built without re-validating them.
+        items.append(read_model.model_construct(**book_data))
+    return items
+
+
+def _build_paging_info(
+    page: int,
+    page_size: int,
+    total_items: Optional[int],
+    total_is_estimate: bool,
+    next_cursor: Optional[str],
+    cursor: Optional[str]
+) -> PagingInfo:
+    total_pages = None
+    if total_items is not None:
+        total_pages = (total_items + page_size - 1) // page_size if page_size > 0 else 0
+    return PagingInfo(
+        page=page,
+        page_size=page_size,
+        total_items=total_items,
+        total_pages=total_pages,
+        total_is_estimate=total_is_estimate,
+        has_next=next_cursor is not None,
+        has_prev=page > 1 or cursor is not None,
+        next_cursor=next_cursor
+    )
+
+
+# Statements below are built once per shape. Everything that varies per request
+# (filter ids, cursor values, offset, limit) is a bind parameter, so repeated
+# executions reuse the statement's memoized cache key and SQLAlchemy's compiled
+# SQL, and the driver sees identical SQL text it can keep prepared.
+
+@functools.lru_cache(maxsize=None)
+def _hydrate_statement() -> Any:
+    return construct_book_row_query().where(Book.id.in_(bindparam("book_ids", expanding=True)))
+
+
+def hydrate_books(session: Session, book_ids: List[int]) -> List[Any]:
+    """Load listing rows for `book_ids` in one IN query, returned in the order given."""
+    if not book_ids:
+        return []
+    rows_by_id = {row.id: row for row in session.exec(_hydrate_statement(), params={"book_ids": book_ids}).all()}
+    return [rows_by_id[book_id] for book_id in book_ids if book_id in rows_by_id]
+
+
+def filter_listing_query(query: Any, by_category: bool, by_author: bool, by_rating: bool) -> Any:
+    """Add the listing filters named by the flags, as bind parameters filled in by `listing_filter_params`."""
+    if by_category:
+        query = query.where(Book.category_id.in_(bindparam("category_ids", expanding=True)))
+    if by_author:
+        query = query.where(Book.author_id.in_(bindparam("author_ids", expanding=True)))
+    if by_rating:
+        query = query.where(Book.avg_rating >= bindparam("min_rating"))
+    return query
+
+
+def listing_filter_params(
+    category_ids: Optional[List[int]],
+    author_ids: Optional[List[int]],
+    min_rating: Optional[int]
+) -> Tuple[Tuple[bool, bool, bool], Dict[str, Any]]:
+    """Return the (by_category, by_author, by_rating) shape of a filter and its bind parameter values."""
+    shape = (category_ids is not None, author_ids is not None, bool(min_rating))
+    params: Dict[str, Any] = {}
+    if category_ids is not None:
+        params["category_ids"] = category_ids
+    if author_ids is not None:
+        params["author_ids"] = author_ids
+    if min_rating:
+        params["min_rating"] = min_rating
+    return shape, params
+
+
+def listing_filter_key(
+    category_ids: Optional[List[int]],
+    author_ids: Optional[List[int]],
+    min_rating: Optional[int]
+) -> Tuple[Any, ...]:
+    return (
+        tuple(category_ids) if category_ids is not None else None,
+        tuple(author_ids) if author_ids is not None else None,
+        min_rating
+    )
+
+
+WINDOW_TOTAL_LABEL = "window_total"
+
+
+@functools.lru_cache(maxsize=None)
+def _filtered_listing_statement(filter_shape: Tuple[bool, bool, bool]) -> Any:
+    return filter_listing_query(construct_book_row_query(), *filter_shape)
+
+
+@functools.lru_cache(maxsize=None)
+def _listing_count_statements(filter_shape: Tuple[bool, bool, bool]) -> Tuple[Any, Any]:
+    return build_count_statements(_filtered_listing_statement(filter_shape))
+
+
+def _keyset_param(name: str) -> str:
+    return f"after_{name}"
+
+
+@functools.lru_cache(maxsize=None)
+def _listing_page_statement(
+    filter_shape: Tuple[bool, bool, bool],
+    sort_by: SortByOptions,
+    keyset: bool,
+    window_total: bool
+) -> Any:
+    query = _filtered_listing_statement(filter_shape)
+    if window_total:
+        query = query.add_columns(func.count().over().label(WINDOW_TOTAL_LABEL))
+    sort_names = listing_sort_keys(sort_by)
+    sort_keys = [(_SORT_FIELDS[name][0], descending) for name, descending in sort_names]
+    query = query.order_by(*[desc(column) if descending else asc(column) for column, descending in sort_keys])
+    if keyset:
+        query = query.where(keyset_predicate(sort_keys, [bindparam(_keyset_param(name)) for name, _ in sort_names]))
+    else:
+        query = query.offset(bindparam("offset", type_=Integer))
+    return query.limit(bindparam("limit", type_=Integer))
+
+
+def _window_total(
+    session: Session,
+    rows: List[Any],
+    filter_shape: Tuple[bool, bool, bool],
+    filter_key: Tuple[Any, ...],
+    page: int,
+    params: Dict[str, Any]
+) -> int:
+    """Read the count(*) OVER () total off a page, counting separately only for pages past the end."""
+    if rows:
+        total_items = rows[0]._mapping[WINDOW_TOTAL_LABEL]
+    elif page == 1:
+        total_items = 0
+    else:
+        total_items, _ = count_filtered_books(session, _listing_count_statements(filter_shape), filter_key, params=params)
+    _count_cache.set(filter_key, total_items)
+    return total_items
 
 
 def get_books(
@@ -67,162 +317,170 @@ def get_books(
     sort_by: SortByOptions = SortByOptions.default,
     category_name: Optional[str] = None,
     author_name: Optional[str] = None,
-    min_rating: Optional[int] = None
+    min_rating: Optional[int] = None,
+    cursor: Optional[str] = None,
+    count_mode: CountMode = CountMode.exact,
+    category_id: Optional[int] = None,
+    author_id: Optional[int] = None
 ) -> PaginatedResponse:
-    base_query, effective_price_label, dicount_amount_label = construct_base_book_query()
-    review_count_label = "review_count"
-    average_rating_label = "average_rating"
-
-    filtered_query = base_query
-    if category_name:
-        filtered_query = filtered_query.join(Category).where(Category.category_name == category_name)
-    if author_name:
-        filtered_query = filtered_query.join(Author).where(Author.author_name == author_name)
-    if min_rating:
-        rating_subquery = (
-            select(
-                Review.book_id,
-                func.avg(Review.rating_start).cast(Float).label("avg_rating")
-            )
-            .group_by(Review.book_id)
-            .having(func.avg(Review.rating_start) >= min_rating)
-            .subquery()
+    cursor_values = decode_listing_cursor(cursor, sort_by) if cursor else None
+    category_ids = resolve_filter_ids(session, category_lookup, category_name, category_id)
+    author_ids = resolve_filter_ids(session, author_lookup, author_name, author_id)
+
+    if settings.CATALOG_ENGINE == "snapshot" and catalog_snapshot.available():
+        return _get_books_from_snapshot(
+            session, page, page_size, sort_by, category_ids, author_ids, min_rating, cursor, cursor_values, count_mode
         )
-        filtered_query = filtered_query.join(rating_subquery, rating_subquery.c.book_id == Book.id)
 
-    count_subquery = filtered_query.with_only_columns(Book.id).distinct().subquery()
-    count_query = select(func.count()).select_from(count_subquery)
-    try:
-        total_items = session.exec(count_query).one()
-    except Exception as e:
-        print(f"Count query failed: {e}")
-        total_items = 0
+    filter_shape, filter_params = listing_filter_params(category_ids, author_ids, min_rating)
+    filter_key = listing_filter_key(category_ids, author_ids, min_rating)
 
-    result_query = filtered_query
-    if sort_by == SortByOptions.popularity:
-        review_count_label = "review_count"
-        avg_rating_label = "average_rating"
-        
-        popularity_subquery = (
-            select(
-                Book.id,
-                func.count(Review.id).label(review_count_label),
-                func.coalesce(func.avg(Review.rating_start), 0.0).cast(Float).label(avg_rating_label)
-            )
-            .join(Review, Review.book_id == Book.id, isouter=True)
-            .group_by(Book.id)
-            .subquery()
-        )
-        
-        result_query = (
-            result_query
-            .join(popularity_subquery, popularity_subquery.c.id == Book.id)
-            .add_columns(
-                popularity_subquery.c[review_count_label],
-                popularity_subquery.c[avg_rating_label]
+    # With offset paging and no cached total, the page query carries the total itself.
+    window_total = (
+        settings.LISTING_TOTALS == "window"
+        and count_mode == CountMode.exact
+        and cursor_values is None
+        and _count_cache.get(filter_key) is None
+    )
+    total_items, total_is_estimate = None, False
+    if not window_total:
+        try:
+            total_items, total_is_estimate = count_filtered_books(
+                session, _listing_count_statements(filter_shape), filter_key, count_mode, params=filter_params
             )
-            .order_by(desc(review_count_label), asc(effective_price_label))
-        )
-    elif sort_by == SortByOptions.default:
-        result_query = result_query.order_by(desc(dicount_amount_label), asc(effective_price_label))
-    elif sort_by == SortByOptions.price_asc:
-        result_query = result_query.order_by(asc(effective_price_label))
-    elif sort_by == SortByOptions.price_desc:
-        result_query = result_query.order_by(desc(effective_price_label))
-
-    result_query = result_query.offset((page - 1) * page_size).limit(page_size)
-    labels = [effective_price_label, dicount_amount_label, review_count_label, average_rating_label]
+        except Exception as e:
+            print(f"Count query failed: {e}")
+            total_items, total_is_estimate = 0, False
+
+    result_query = _listing_page_statement(filter_shape, sort_by, cursor_values is not None, window_total)
+    # One extra row tells us whether another page follows without a second query.
+    params = {**filter_params, "limit": page_size + 1}
+    if cursor_values is not None:
+        params.update({
+            _keyset_param(name): value for (name, _), value in zip(listing_sort_keys(sort_by), cursor_values)
+        })
+    else:
+        params["offset"] = (page - 1) * page_size
+
     items = []
+    next_cursor = None
     try:
-        results = session.exec(result_query.options(selectinload(Book.author))).all()
-        for row in results:
-            data = row._mapping
-            book: Book = data["Book"]
-            book_data = book.model_dump()
-            for label in labels:
-                if label in data:
-                    book_data[label] = data[label]
-            book_data["author_name"] = book.author.author_name if book.author else None
-            items.append(BookRead(**book_data))
+        results = session.exec(result_query, params=params).all()
+        if window_total:
+            total_items = _window_total(session, results, filter_shape, filter_key, page, filter_params)
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        items = _book_reads_from_rows(session, results)
+        if has_more:
+            next_cursor = _encode_listing_cursor(sort_by, results[-1]._mapping)
 
     except Exception as e:
         print(f"Data query failed: {e}")
         items = []
         total_items = 0
 
-    total_pages = (total_items + page_size - 1) // page_size if page_size > 0 else 0
-    paging_info = PagingInfo(
-        page=page,
-        page_size=page_size,
-        total_items=total_items,
-        total_pages=total_pages,
-        has_next=page < total_pages,
-        has_prev=page > 1
-    )
-
+    paging_info = _build_paging_info(page, page_size, total_items, total_is_estimate, next_cursor, cursor)
     return PaginatedResponse(data=items, paging=paging_info)
 
 
-def get_book_by_id(session: Session, book_id: int) -> Optional[BookReadWithDetails]:
-    try:
-        base_query, effective_price_label, dicount_amount_label = construct_base_book_query()
+def _get_books_from_snapshot(
+    session: Session,
+    page: int,
+    page_size: int,
+    sort_by: SortByOptions,
+    category_ids: Optional[List[int]],
+    author_ids: Optional[List[int]],
+    min_rating: Optional[int],
+    cursor: Optional[str],
+    cursor_values: Optional[List[Any]],
+    count_mode: CountMode
+) -> PaginatedResponse:
+    page_ids, total_items, has_more = catalog_snapshot.snapshot.select_page(
+        session,
+        sort_keys=listing_sort_keys(sort_by),
+        category_ids=category_ids,
+        author_ids=author_ids,
+        min_rating=min_rating,
+        offset=(page - 1) * page_size,
+        limit=page_size,
+        cursor_values=cursor_values
+    )
 
-        query = base_query.where(Book.id == book_id).options(selectinload(Book.author),selectinload(Book.category))
-        
+    items = []
+    next_cursor = None
+    rows = hydrate_books(session, page_ids)
+    if rows:
+        items = _book_reads_from_rows(session, rows)
+        if has_more:
+            next_cursor = _encode_listing_cursor(sort_by, rows[-1]._mapping)
+
+    if count_mode == CountMode.none:
+        total_items = None
+    paging_info = _build_paging_info(page, page_size, total_items, False, next_cursor, cursor)
+    return PaginatedResponse(data=items, paging=paging_info)
 
-        result = session.exec(query).first()
-        if not result:
-            return None        
-        book: Book = result[0]
-
-        book_data = book.model_dump()
-                
-        book_data.update({
-            effective_price_label: getattr(result, effective_price_label),
-            "category_name": getattr(book.category, "category_name", None),
-            "author_name": getattr(book.author, "author_name", None),
-        })
 
-        book_data["reviews"] = [ReviewRead(**review.model_dump()) for review in book.reviews]
+@functools.lru_cache(maxsize=None)
+def _book_detail_statement() -> Any:
+    newest_reviews = (
+        select(Review)
+        .where(Review.book_id == bindparam("book_id"))
+        .order_by(desc(Review.review_date), desc(Review.id))
+        .limit(bindparam("recent_reviews", type_=Integer))
+        .subquery("newest_reviews")
+    )
+    recent_review = aliased(Review, newest_reviews, name="recent_review")
+    return (
+        construct_book_row_query()
+        .add_columns(*[star_column(star) for star in STARS], recent_review)
+        .join(recent_review, recent_review.book_id == Book.id, isouter=True)
+        .where(Book.id == bindparam("book_id"))
+        .order_by(desc(recent_review.review_date), desc(recent_review.id))
+    )
+
 
-        return BookReadWithDetails(**book_data)
+def get_book_by_id(session: Session, book_id: int) -> Optional[BookReadWithReviews]:
+    """Load a book with its newest reviews and rating histogram in a single query."""
+    try:
+        # One row per embedded review (or a single row with no review), each repeating the book columns.
+        rows = session.exec(
+            _book_detail_statement(),
+            params={"book_id": book_id, "recent_reviews": settings.BOOK_DETAIL_RECENT_REVIEWS}
+        ).all()
+        if not rows:
+            return None
+        book = _book_reads_from_rows(session, rows[:1], read_model=BookReadWithReviews)[0]
+        data = rows[0]._mapping
+
+        star_counts = {star: data[star_column(star).key] for star in STARS}
+        book.review_metadata = ReviewMetadataResponse(
+            star_counts=star_counts,
+            total_reviews=data[REVIEW_COUNT_LABEL],
+            average_rating=round(data[AVERAGE_RATING_LABEL], 2)
+        )
+        book.recent_reviews = [
+            ReviewRead.model_validate(row._mapping["recent_review"])
+            for row in rows if row._mapping["recent_review"] is not None
+        ]
+        return book
 
     except Exception as e:
         print(f"Failed to get book by ID {book_id}: {e}")
         return None
     
-def get_top_k_discounted_books(session: Session, k: int = 10) -> List[BookRead]:
-    base_query, effective_price_label, discount_amount_label = construct_base_book_query()
-
-    calculations_subq = base_query.subquery("book_calculations")
+def get_books_by_ids(session: Session, book_ids: List[int]) -> BookBatch:
+    """Load many books in one IN query, in request order, reporting ids that do not exist."""
+    book_ids = list(dict.fromkeys(book_ids))
+    items = _book_reads_from_rows(session, hydrate_books(session, book_ids), read_model=BookReadWithDetails)
+    found_ids = {item.id for item in items}
+    return BookBatch(data=items, missing_ids=[book_id for book_id in book_ids if book_id not in found_ids])
 
-    result_query = (
-        select(
-            Book,
-            calculations_subq.c[effective_price_label],
-            calculations_subq.c[discount_amount_label]
-        )
-        .join(calculations_subq, Book.id == calculations_subq.c.id)
-        .where(calculations_subq.c[discount_amount_label] > 0)
-        .order_by(desc(calculations_subq.c[discount_amount_label]))
-        .limit(k)
-        .options(selectinload(Book.author))
-    )
 
+def get_top_k_discounted_books(session: Session, k: int = 10) -> List[BookRead]:
     items = []
     try:
-        results = session.exec(result_query).all()
-        for row in results:
-            data = row._mapping
-            book: Book = data["Book"]
-            book_data = book.model_dump()
-
-            for label in [effective_price_label, discount_amount_label]:
-                if label in data:
-                    book_data[label] = data[label]
-
-            book_data["author_name"] = book.author.author_name if book.author else None
-            items.append(BookRead(**book_data))
+        book_ids = leaderboards.top_ids(session, "discounted", k)
+        items = _book_reads_from_rows(session, hydrate_books(session, book_ids))
     except Exception as e:
         print(f"Data query failed: {e}")
         items = []
@@ -231,64 +489,100 @@ def get_top_k_discounted_books(session: Session, k: int = 10) -> List[BookRead]:
 
 
 def get_top_k_featured(session: Session, sort_by: FeaturedSortOptions, k: int) -> List[BookRead]:
-    base_query, effective_price_label, dicount_amount_label = construct_base_book_query()
-
-    avg_rating_label = "average_rating"
-    review_count_label = "review_count"
-
-    rating_agg_subquery = (
-        select(
-            Book.id,
-            func.count(Review.id).label(review_count_label),
-            func.coalesce(func.avg(Review.rating_start), 0.0).cast(Float).label(avg_rating_label)
-        )
-        .join(Review, Review.book_id == Book.id, isouter=True)
-        .group_by(Book.id)
-        .subquery()
-    )
-
-    query_with_aggregates = (
-        base_query
-        .join(rating_agg_subquery, rating_agg_subquery.c.id == Book.id)
-        .add_columns(
-            rating_agg_subquery.c[review_count_label],
-            rating_agg_subquery.c[avg_rating_label]
-        )
-    )
-
     if sort_by == FeaturedSortOptions.RECOMMENDED:
-        result_query = query_with_aggregates.order_by(
-            desc(avg_rating_label),
-            asc(effective_price_label) 
-        )
+        shelf = "recommended"
     elif sort_by == FeaturedSortOptions.POPULAR:
-        result_query = query_with_aggregates.order_by(
-            desc(review_count_label),
-            asc(effective_price_label) 
-        )
+        shelf = "popular"
+    elif sort_by == FeaturedSortOptions.TRENDING:
+        shelf = "trending"
     else:
          raise ValueError(f"Unsupported sort_by value for featured books: {sort_by}")
 
-    result_query = result_query.limit(k)
-
-    all_calculated_labels = [effective_price_label, dicount_amount_label, review_count_label, avg_rating_label]
     items = []
     try:
-        results = session.exec(result_query).all()
-        for row in results:
-            data = row._mapping 
-            book: Book = data["Book"]
-            book_data = book.model_dump() 
-            
-            for label in all_calculated_labels:
-                if label in data:
-                    book_data[label] = data[label]
-                    
-            book_data["author_name"] = book.author.author_name if book.author else None
-            items.append(BookRead(**book_data))
-
+        book_ids = leaderboards.top_ids(session, shelf, k)
+        items = _book_reads_from_rows(session, hydrate_books(session, book_ids))
     except Exception as e:
         print(f"Data query failed for featured books (sort_by={sort_by}): {e}")
         items = [] 
         
-    return items
\ No newline at end of file
+    return items
+
+
+FACET_STARS = range(1, 6)
+
+
+@functools.lru_cache(maxsize=None)
+def _facet_statement(grouping_sets: bool, filter_shape: Tuple[bool, bool, bool]) -> Any:
+    # The highest n with avg_rating >= n; a CAST would round on PostgreSQL.
+    rating_bucket = case(
+        *[(Book.avg_rating >= star, star) for star in reversed(FACET_STARS)],
+        else_=0
+    ).label("rating_bucket")
+    # Joined like construct_base_book_query, so counts cover the same rows as the listing.
+    query = (
+        select(Book.category_id, Book.author_id, rating_bucket, func.count(Book.id))
+        .join(BookPricing, BookPricing.book_id == Book.id)
+    )
+    if grouping_sets:
+        query = query.group_by(func.grouping_sets(Book.category_id, Book.author_id, rating_bucket))
+    else:
+        query = query.group_by(Book.category_id, Book.author_id, rating_bucket)
+    return filter_listing_query(query, *filter_shape)
+
+
+def _facet_counts(session: Session, counts: Counter, lookup: Any) -> List[FacetCount]:
+    facets = [FacetCount(id=row_id, name=lookup.name_for(session, row_id), count=count) for row_id, count in counts.items()]
+    facets.sort(key=lambda facet: (-facet.count, facet.name or "", facet.id))
+    return facets
+
+
+def get_book_facets(
+    session: Session,
+    category_name: Optional[str] = None,
+    author_name: Optional[str] = None,
+    min_rating: Optional[int] = None,
+    category_id: Optional[int] = None,
+    author_id: Optional[int] = None
+) -> BookFacets:
+    """Per-category, per-author and per-minimum-rating book counts for a listing filter in one query."""
+    category_ids = resolve_filter_ids(session, category_lookup, category_name, category_id)
+    author_ids = resolve_filter_ids(session, author_lookup, author_name, author_id)
+    filter_key = listing_filter_key(category_ids, author_ids, min_rating)
+
+    cached_facets = _facet_cache.get(filter_key)
+    if cached_facets is not None:
+        return cached_facets
+
+    filter_shape, filter_params = listing_filter_params(category_ids, author_ids, min_rating)
+    query = _facet_statement(session.get_bind().dialect.name == "postgresql", filter_shape)
+
+    # A grouping-sets row carries exactly one non-NULL key; a plain GROUP BY row
+    # carries all three. Either way each key column adds to its own facet.
+    category_counts: Counter = Counter()
+    author_counts: Counter = Counter()
+    bucket_counts: Counter = Counter()
+    for row_category_id, row_author_id, bucket, count in session.exec(query, params=filter_params).all():
+        if row_category_id is not None:
+            category_counts[row_category_id] += count
+        if row_author_id is not None:
+            author_counts[row_author_id] += count
+        if bucket is not None:
+            bucket_counts[bucket] += count
+
+    total_items = sum(category_counts.values())
+    facets = BookFacets(
+        total_items=total_items,
+        categories=_facet_counts(session, category_counts, category_lookup),
+        authors=_facet_counts(session, author_counts, author_lookup),
+        ratings=[
+            RatingFacetCount(
+                min_rating=star,
+                count=sum(count for bucket, count in bucket_counts.items() if bucket >= star)
+            )
+            for star in FACET_STARS
+        ]
+    )
+    _facet_cache.set(filter_key, facets)
+    _count_cache.set(filter_key, total_items)
+    return facets
@@ -0,0 +1,211 @@
+import threading
+import time
+import warnings
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from sqlmodel import Session, select
+from core.config import settings
+from core.money import Money
+from models import Book, BookPricing, Discount, Review
+from repositories.events import on_commit
+from repositories.refresh import PendingRefresh, primary_session
+from repositories.versions import catalog_version
+
+SNAPSHOT_COLUMNS: Dict[str, str] = {
+    "id": "int64",
+    "category_id": "int64",
+    "author_id": "int64",
+    # Prices are held as integer cents.
+    "effective_price": "int64",
+    "discount_amount": "int64",
+    "review_count": "int64",
+    "avg_rating": "float64",
+    "trending_score": "float64",
+    "rating_score": "float64",
+}
+
+
+def _plain_value(value: Any) -> Any:
+    return value.cents if isinstance(value, Money) else float(value)
+
+
+def _plain_values(values: Sequence[Any]) -> Sequence[Any]:
+    if values and isinstance(values[0], Money):
+        return [money.cents for money in values]
+    return values
+
+
+def available() -> bool:
+    if np is None:
+        warnings.warn("CATALOG_ENGINE=snapshot needs numpy (pip install numpy); falling back to SQL.", stacklevel=2)
+        return False
+    return True
+
+
+class CatalogSnapshot:
+    """Listing columns of every book held as id-ordered NumPy arrays.
+
+    Writes only mark book ids dirty; the next reader re-selects those rows and
+    merges them in, or reloads everything after a bulk write or price rollover.
+    Writes made elsewhere (other workers, jobs.py) never reach those hooks, so
+    every `check_seconds` a reader compares the catalog version with the one
+    the arrays were loaded at and reloads everything when it moved.
+    """
+
+    def __init__(self, check_seconds: Optional[float] = None) -> None:
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._arrays: Optional[Dict[str, Any]] = None
+        self._pending = PendingRefresh()
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def mark_dirty(self, book_ids: Optional[Set[int]]) -> None:
+        with self._lock:
+            self._pending.mark(book_ids)
+
+    @staticmethod
+    def _select_rows(book_ids: Optional[Sequence[int]] = None):
+        query = (
+            select(
+                Book.id,
+                Book.category_id,
+                Book.author_id,
+                BookPricing.effective_price,
+                BookPricing.discount_amount,
+                Book.review_count,
+                Book.avg_rating,
+                Book.trending_score,
+                Book.rating_score
+            )
+            .join(BookPricing, BookPricing.book_id == Book.id)
+            .order_by(Book.id)
+        )
+        if book_ids is not None:
+            query = query.where(Book.id.in_(book_ids))
+        return query
+
+    @staticmethod
+    def _to_arrays(rows: Sequence[Any]) -> Dict[str, Any]:
+        columns = list(zip(*rows)) if rows else [()] * len(SNAPSHOT_COLUMNS)
+        return {
+            name: np.asarray(_plain_values(values), dtype=dtype)
+            for (name, dtype), values in zip(SNAPSHOT_COLUMNS.items(), columns)
+        }
+
+    def _merge(self, arrays: Dict[str, Any], book_ids: List[int], rows: Sequence[Any]) -> Dict[str, Any]:
+        keep = ~np.isin(arrays["id"], book_ids)
+        fresh = self._to_arrays(rows)
+        merged = {name: np.concatenate((arrays[name][keep], fresh[name])) for name in SNAPSHOT_COLUMNS}
+        order = np.argsort(merged["id"], kind="stable")
+        return {name: values[order] for name, values in merged.items()}
+
+    def _check_version(self, session: Session) -> None:
+        with self._lock:
+            if self._version is None or self.check_seconds is None:
+                return
+            if time.monotonic() - self._checked_at < self.check_seconds:
+                return
+            self._checked_at = time.monotonic()
+            loaded_version = self._version
+
+        with primary_session(session) as reader:
+            version = catalog_version(reader)
+        with self._lock:
+            # Local writes move the version too, so this also folds them in wholesale.
+            if version != loaded_version and self._version == loaded_version:
+                self._pending.mark(None)
+
+    def arrays(self, session: Session) -> Dict[str, Any]:
+        self._check_version(session)
+        with self._lock:
+            if not self._pending and self._arrays is not None:
+                return self._arrays
+            ticket = self._pending.claim(reload=self._pending.stale or self._arrays is None)
+
+        # Queried without the lock; see PendingRefresh.
+        book_ids = sorted(ticket.book_ids) if ticket.book_ids is not None else None
+        try:
+            with primary_session(session) as reader:
+                # Read before the rows, so a write landing in between shows up as a newer version.
+                version = catalog_version(reader) if book_ids is None else None
+                rows = reader.exec(self._select_rows(book_ids)).all()
+        except BaseException:
+            with self._lock:
+                self._pending.settle(ticket, loaded=False)
+            raise
+
+        with self._lock:
+            if self._pending.settle(ticket, loaded=True):
+                if book_ids is None:
+                    self._arrays = self._to_arrays(rows)
+                    self._version, self._checked_at = version, time.monotonic()
+                else:
+                    self._arrays = self._merge(self._arrays, book_ids, rows)
+                return self._arrays
+            # A bulk write landed mid-query: serve what was read and leave the reload to the next reader.
+            return self._to_arrays(rows) if book_ids is None else self._arrays
+
+    def select_page(
+        self,
+        session: Session,
+        sort_keys: List[Tuple[str, bool]],
+        category_ids: Optional[Sequence[int]] = None,
+        author_ids: Optional[Sequence[int]] = None,
+        min_rating: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 20,
+        cursor_values: Optional[Sequence[Any]] = None
+    ) -> Tuple[List[int], int, bool]:
+        """Return (page ids in order, total matching rows, whether more rows follow)."""
+        arrays = self.arrays(session)
+
+        mask = np.ones(len(arrays["id"]), dtype=bool)
+        if category_ids is not None:
+            mask &= np.isin(arrays["category_id"], category_ids)
+        if author_ids is not None:
+            mask &= np.isin(arrays["author_id"], author_ids)
+        if min_rating:
+            mask &= arrays["avg_rating"] >= min_rating
+        total_items = int(mask.sum())
+
+        # Normalise every key to ascending so "smaller sorts first" holds for all of them.
+        keys = [-arrays[name] if descending else arrays[name] for name, descending in sort_keys]
+        if cursor_values is not None:
+            after = np.zeros_like(mask)
+            equal = np.ones_like(mask)
+            for key, (_, descending), value in zip(keys, sort_keys, cursor_values):
+                value = _plain_value(value)
+                value = -value if descending else value
+                after |= equal & (key > value)
+                equal &= key == value
+            mask &= after
+            offset = 0
+
+        candidates = np.flatnonzero(mask)
+        needed = offset + limit + 1
+        if needed < len(candidates):
+            primary = keys[0][candidates]
+            threshold = np.partition(primary, needed - 1)[needed - 1]
+            candidates = candidates[primary <= threshold]
+
+        order = np.lexsort([key[candidates] for key in reversed(keys)])
+        window = candidates[order][offset:offset + limit + 1]
+        page_ids = arrays["id"][window[:limit]].tolist()
+        return page_ids, total_items, len(window) > limit
+
+
+snapshot = CatalogSnapshot(settings.CATALOG_SNAPSHOT_CHECK_SECONDS)
+
+
+@on_commit(Book, Discount, Review, BookPricing)
+def _refresh_snapshot_rows(writes: Dict[type, Optional[Set[int]]]) -> None:
+    if any(book_ids is None for book_ids in writes.values()):
+        snapshot.mark_dirty(None)
+    else:
+        snapshot.mark_dirty(set().union(*writes.values()))
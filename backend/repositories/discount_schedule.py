@@ -0,0 +1,147 @@
+import heapq
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+from core.money import Money
+from models import Discount
+from repositories.events import on_commit
+from repositories.refresh import PendingRefresh, primary_session
+
+
+class DiscountWindow(NamedTuple):
+    start: date
+    end: Optional[date]
+    price: Money
+    discount_id: int
+
+    def active_on(self, day: date) -> bool:
+        return self.start <= day and (self.end is None or self.end >= day)
+
+
+class DiscountSchedule:
+    """Discount windows per book, the discount each book has active today, and
+    the next day on which each book's active discount changes.
+
+    A book's active discount only changes on the start date of one of its
+    windows or the day after an end date, so between those days nothing needs
+    re-evaluating. `advance` pops exactly the books whose transition day has
+    come; discount writes only mark their books dirty and are replanned from
+    the next session that looks at the schedule.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.windows: Dict[int, List[DiscountWindow]] = {}
+        self.active: Dict[int, DiscountWindow] = {}
+        self.as_of: Optional[date] = None
+        self._next_change: Dict[int, date] = {}
+        self._transitions: List[Tuple[date, int]] = []
+        self._pending = PendingRefresh()
+
+    def _load_windows(self, session: Session, book_ids: Optional[Iterable[int]] = None) -> Dict[int, List[DiscountWindow]]:
+        query = select(
+            Discount.book_id, Discount.discount_start_date, Discount.discount_end_date,
+            Discount.discount_price, Discount.id
+        )
+        if book_ids is not None:
+            query = query.where(Discount.book_id.in_(sorted(book_ids)))
+        windows: Dict[int, List[DiscountWindow]] = {}
+        for book_id, start, end, price, discount_id in session.exec(query).all():
+            windows.setdefault(book_id, []).append(DiscountWindow(start, end, price, discount_id))
+        for book_windows in windows.values():
+            book_windows.sort()
+        return windows
+
+    def _plan(self, book_id: int, today: date) -> None:
+        windows = self.windows.get(book_id, [])
+        active = [window for window in windows if window.active_on(today)]
+        if active:
+            # Same tie-break as the pricing projection: lowest price, then lowest id.
+            self.active[book_id] = min(active, key=lambda window: (window.price, window.discount_id))
+        else:
+            self.active.pop(book_id, None)
+
+        upcoming = [window.start for window in windows if window.start > today]
+        upcoming += [window.end + timedelta(days=1) for window in active if window.end is not None]
+        if upcoming:
+            next_change = min(upcoming)
+            self._next_change[book_id] = next_change
+            heapq.heappush(self._transitions, (next_change, book_id))
+        else:
+            self._next_change.pop(book_id, None)
+
+    def sync(self, session: Session, today: date) -> bool:
+        """Reload windows that writes invalidated. Returns True when everything was reloaded."""
+        with self._lock:
+            if not self._pending:
+                return False
+            ticket = self._pending.claim(reload=self._pending.stale)
+
+        # Queried without the lock; see PendingRefresh.
+        try:
+            with primary_session(session) as reader:
+                windows = self._load_windows(reader, ticket.book_ids)
+        except BaseException:
+            with self._lock:
+                self._pending.settle(ticket, loaded=False)
+            raise
+
+        with self._lock:
+            if not self._pending.settle(ticket, loaded=True):
+                # A bulk discount write landed mid-query; the next sync reloads everything.
+                return ticket.book_ids is None
+            if ticket.book_ids is None:
+                self.windows = windows
+                self.active, self._next_change, self._transitions = {}, {}, []
+                for book_id in self.windows:
+                    self._plan(book_id, today)
+                self.as_of = today
+                return True
+
+            for book_id in ticket.book_ids:
+                if book_id in windows:
+                    self.windows[book_id] = windows[book_id]
+                else:
+                    self.windows.pop(book_id, None)
+                self._plan(book_id, self.as_of or today)
+            return False
+
+    def next_transition(self) -> Optional[date]:
+        with self._lock:
+            while self._transitions and self._next_change.get(self._transitions[0][1]) != self._transitions[0][0]:
+                heapq.heappop(self._transitions)
+            return self._transitions[0][0] if self._transitions else None
+
+    def is_current(self, today: date) -> bool:
+        """True when nothing has been written and no transition is due, so prices need no work."""
+        if self._pending or self.as_of != today:
+            return False
+        next_change = self.next_transition()
+        return next_change is None or next_change > today
+
+    def advance(self, today: date) -> Set[int]:
+        """Move the schedule to `today`, returning the books whose active discount may have changed."""
+        due: Set[int] = set()
+        with self._lock:
+            while self._transitions and self._transitions[0][0] <= today:
+                change_day, book_id = heapq.heappop(self._transitions)
+                if self._next_change.get(book_id) == change_day:
+                    due.add(book_id)
+            for book_id in due:
+                self._plan(book_id, today)
+            self.as_of = today
+        return due
+
+    def mark_dirty(self, book_ids: Optional[Set[int]]) -> None:
+        with self._lock:
+            self._pending.mark(book_ids)
+
+
+discount_schedule = DiscountSchedule()
+
+
+@on_commit(Discount)
+def _replan_written_discounts(writes) -> None:
+    discount_schedule.mark_dirty(writes[Discount])
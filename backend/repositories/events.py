@@ -0,0 +1,118 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState
+from sqlmodel import Session
+
+
+class RowChanges(NamedTuple):
+    new: List[Any]
+    dirty: List[Any]
+    deleted: List[Any]
+
+    def all(self) -> List[Any]:
+        return [*self.new, *self.dirty, *self.deleted]
+
+
+# A flush handler receives the session and the changed rows grouped by model,
+# or None when a bulk UPDATE/DELETE touched an unknown set of rows.
+FlushHandler = Callable[[Session, Optional[Dict[type, RowChanges]]], None]
+
+# A commit handler receives, per changed model, the ids of the books the rows
+# belong to (`book_id` for reviews, discounts and order items, the row's own
+# id otherwise), or None for a model touched by a bulk statement.
+CommitHandler = Callable[[Dict[type, Optional[Set[int]]]], None]
+
+_flush_handlers: List[tuple[tuple[type, ...], FlushHandler]] = []
+_commit_handlers: List[tuple[tuple[type, ...], CommitHandler]] = []
+
+_PENDING_WRITES_KEY = "pending_writes"
+
+
+def on_flush(*models: type) -> Callable[[FlushHandler], FlushHandler]:
+    """Run the decorated handler inside the writing transaction whenever rows of `models` change."""
+    def decorator(handler: FlushHandler) -> FlushHandler:
+        _flush_handlers.append((models, handler))
+        return handler
+    return decorator
+
+
+def on_commit(*models: type) -> Callable[[CommitHandler], CommitHandler]:
+    """Run the decorated handler after a transaction that changed rows of `models` commits."""
+    def decorator(handler: CommitHandler) -> CommitHandler:
+        _commit_handlers.append((models, handler))
+        return handler
+    return decorator
+
+
+def publish_writes(writes: Dict[type, Optional[Set[int]]]) -> None:
+    for models, handler in _commit_handlers:
+        relevant = {model: writes[model] for model in models if model in writes}
+        if relevant:
+            handler(relevant)
+
+
+def _row_keys(obj: Any) -> Set[int]:
+    if not hasattr(obj, "book_id"):
+        return {inspect(obj).identity[0]} if inspect(obj).identity else set()
+    history = inspect(obj).attrs.book_id.history
+    keys = {obj.book_id, *(history.deleted or ())}
+    keys.discard(None)
+    return keys
+
+
+def _record_writes(session: Session, model: type, keys: Optional[Set[int]]) -> None:
+    pending: Dict[type, Optional[Set[int]]] = session.info.setdefault(_PENDING_WRITES_KEY, {})
+    if keys is None or pending.get(model, set()) is None:
+        pending[model] = None
+    else:
+        pending.setdefault(model, set()).update(keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _dispatch_flush(session: Session, flush_context: Any) -> None:
+    grouped: Dict[type, RowChanges] = {}
+    for bucket, objects in (("new", session.new), ("dirty", session.dirty), ("deleted", session.deleted)):
+        for obj in objects:
+            changes = grouped.setdefault(type(obj), RowChanges([], [], []))
+            getattr(changes, bucket).append(obj)
+
+    for model, changes in grouped.items():
+        keys: Set[int] = set()
+        for obj in changes.all():
+            keys.update(_row_keys(obj))
+        _record_writes(session, model, keys)
+
+    for models, handler in _flush_handlers:
+        relevant = {model: grouped[model] for model in models if model in grouped}
+        if relevant:
+            handler(session, relevant)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _dispatch_bulk(orm_execute_state: ORMExecuteState) -> Any:
+    if orm_execute_state.is_select or orm_execute_state.bind_mapper is None:
+        return None
+
+    model = orm_execute_state.bind_mapper.class_
+    _record_writes(orm_execute_state.session, model, None)
+    handlers = [handler for models, handler in _flush_handlers if model in models]
+    if not handlers:
+        return None
+
+    result = orm_execute_state.invoke_statement()
+    for handler in handlers:
+        handler(orm_execute_state.session, None)
+    return result
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_commit(session: Session) -> None:
+    writes = session.info.pop(_PENDING_WRITES_KEY, None)
+    if writes:
+        publish_writes(writes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_writes(session: Session) -> None:
+    session.info.pop(_PENDING_WRITES_KEY, None)
@@ -0,0 +1,178 @@
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlmodel import Session, select, desc, asc
+from models import Book, BookPricing, Discount, Review
+from core.config import settings
+from core.money import Money
+from repositories.events import on_commit
+from repositories.refresh import PendingRefresh, primary_session
+
+
+class Leaderboard:
+    """The best `depth` books for one shelf, kept as a sorted list of rank keys.
+
+    Invariant: every book outside `entries` ranks after the last entry, so the
+    entries are always an exact prefix of the shelf. Removing the worst entry
+    keeps that true; when a request needs more entries than survive, the
+    board is rebuilt from one indexed ORDER BY ... LIMIT query.
+    """
+
+    def __init__(self, sort_keys: Sequence[Tuple[Any, bool]], positive_column: Any = None, depth: int = 100):
+        self.sort_keys = list(sort_keys)
+        self.positive_column = positive_column
+        self.depth = depth
+        self.entries: List[Tuple[Any, ...]] = []
+        self.positions: Dict[int, Tuple[Any, ...]] = {}
+        self.exhaustive = False
+        self.built_at: Optional[float] = None
+
+    def _rank_query(self):
+        query = select(Book.id, *[column for column, _ in self.sort_keys]).join(BookPricing, BookPricing.book_id == Book.id)
+        if self.positive_column is not None:
+            query = query.where(self.positive_column > 0)
+        return query
+
+    def _rank_key(self, row: Sequence[Any]) -> Tuple[Any, ...]:
+        book_id, *values = row
+        return (*[-value if descending else value for value, (_, descending) in zip(values, self.sort_keys)], book_id)
+
+    def _qualifies(self, row: Sequence[Any]) -> bool:
+        if self.positive_column is None:
+            return True
+        column_index = [column for column, _ in self.sort_keys].index(self.positive_column)
+        value = row[1 + column_index]
+        return (value.cents if isinstance(value, Money) else value) > 0
+
+    def load(self, session: Session) -> List[Any]:
+        order_by = [desc(column) if descending else asc(column) for column, descending in self.sort_keys]
+        return session.exec(self._rank_query().order_by(*order_by, asc(Book.id)).limit(self.depth)).all()
+
+    def install(self, rows: Sequence[Sequence[Any]]) -> None:
+        self.entries = [self._rank_key(row) for row in rows]
+        self.positions = {entry[-1]: entry for entry in self.entries}
+        self.exhaustive = len(self.entries) < self.depth
+        self.built_at = time.monotonic()
+
+    def _discard(self, book_id: int) -> None:
+        entry = self.positions.pop(book_id, None)
+        if entry is not None:
+            del self.entries[bisect.bisect_left(self.entries, entry)]
+
+    def apply(self, rows: Sequence[Sequence[Any]], book_ids: Set[int]) -> None:
+        """Re-rank `book_ids` using their freshly selected `rows` (missing ids were deleted or no longer qualify)."""
+        for book_id in book_ids:
+            self._discard(book_id)
+
+        for row in rows:
+            if not self._qualifies(row):
+                continue
+            entry = self._rank_key(row)
+            if not self.exhaustive and (not self.entries or entry > self.entries[-1]):
+                continue
+            bisect.insort(self.entries, entry)
+            self.positions[entry[-1]] = entry
+
+        while len(self.entries) > self.depth:
+            dropped = self.entries.pop()
+            del self.positions[dropped[-1]]
+            self.exhaustive = False
+
+    def select(self, session: Session, book_ids: Set[int]) -> List[Any]:
+        return session.exec(
+            select(Book.id, *[column for column, _ in self.sort_keys])
+            .join(BookPricing, BookPricing.book_id == Book.id)
+            .where(Book.id.in_(sorted(book_ids)))
+        ).all()
+
+    def top_ids(self, k: int) -> List[int]:
+        return [entry[-1] for entry in self.entries[:k]]
+
+
+class LeaderboardRegistry:
+    def __init__(self, depth: int, ttl_seconds: Optional[float]):
+        self.depth = depth
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._pending = PendingRefresh()
+        self.boards: Dict[str, Leaderboard] = {
+            "discounted": Leaderboard(
+                [(BookPricing.discount_amount, True), (BookPricing.effective_price, False)],
+                positive_column=BookPricing.discount_amount,
+                depth=depth
+            ),
+            "recommended": Leaderboard(
+                [(Book.rating_score, True), (BookPricing.effective_price, False)],
+                depth=depth
+            ),
+            "popular": Leaderboard(
+                [(Book.review_count, True), (BookPricing.effective_price, False)],
+                depth=depth
+            ),
+            "trending": Leaderboard(
+                [(Book.trending_score, True), (BookPricing.effective_price, False)],
+                depth=depth
+            ),
+        }
+
+    def mark_dirty(self, book_ids: Optional[Set[int]]) -> None:
+        with self._lock:
+            self._pending.mark(book_ids)
+
+    def top_ids(self, session: Session, shelf: str, k: int) -> List[int]:
+        k = min(k, self.depth)
+        with self._lock:
+            board = self.boards[shelf]
+            if self._pending.stale:
+                for stale_board in self.boards.values():
+                    stale_board.built_at = None
+                self._pending.stale = False
+                self._pending.dirty_ids.clear()
+
+            expired = (
+                self.ttl_seconds is not None
+                and board.built_at is not None
+                and time.monotonic() - board.built_at > self.ttl_seconds
+            )
+            rebuild = board.built_at is None or expired or (len(board.entries) < k and not board.exhaustive)
+            if not rebuild and not self._pending.dirty_ids:
+                return board.top_ids(k)
+            ticket = self._pending.claim()
+            updated = [
+                dirty_board for dirty_board in self.boards.values()
+                if dirty_board.built_at is not None and not (rebuild and dirty_board is board)
+            ] if ticket.book_ids else []
+
+        # Queried without the lock; see PendingRefresh.
+        try:
+            with primary_session(session) as reader:
+                updates = [(dirty_board, dirty_board.select(reader, ticket.book_ids)) for dirty_board in updated]
+                rows = board.load(reader) if rebuild else None
+        except BaseException:
+            with self._lock:
+                self._pending.settle(ticket, loaded=False)
+            raise
+
+        with self._lock:
+            if self._pending.settle(ticket, loaded=True):
+                for dirty_board, dirty_rows in updates:
+                    if dirty_board.built_at is not None:
+                        dirty_board.apply(dirty_rows, ticket.book_ids)
+                if rows is not None:
+                    board.install(rows)
+                return board.top_ids(k)
+            # A bulk write landed mid-query: serve what was read and leave the rebuild to the next reader.
+            return [row[0] for row in rows[:k]] if rows is not None else board.top_ids(k)
+
+
+leaderboards = LeaderboardRegistry(settings.LEADERBOARD_DEPTH, settings.LEADERBOARD_TTL_SECONDS)
+
+
+@on_commit(Book, Discount, Review, BookPricing)
+def _rerank_written_books(writes: Dict[type, Optional[Set[int]]]) -> None:
+    if any(book_ids is None for book_ids in writes.values()):
+        leaderboards.mark_dirty(None)
+    else:
+        leaderboards.mark_dirty(set().union(*writes.values()))
@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from sqlmodel import Session, SQLModel, select
+from models import Author, Category
+from core.config import settings
+from repositories.events import on_commit
+from repositories.refresh import primary_session
+
+
+class NameLookup:
+    """Bidirectional name <-> id map for a small dimension table such as category or author.
+
+    Names are not unique, so a name resolves to every id that carries it.
+    """
+
+    def __init__(self, model: type[SQLModel], name_field: str, ttl_seconds: Optional[float] = None):
+        self.model = model
+        self.name_field = name_field
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._ids_by_name: Dict[str, List[int]] = {}
+        self._name_by_id: Dict[int, str] = {}
+        self._loaded_at: Optional[float] = None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def load(self, session: Session) -> None:
+        name_column = getattr(self.model, self.name_field)
+        rows = session.exec(select(self.model.id, name_column).order_by(self.model.id)).all()
+        ids_by_name: Dict[str, List[int]] = {}
+        for row_id, name in rows:
+            ids_by_name.setdefault(name, []).append(row_id)
+        with self._lock:
+            self._ids_by_name = ids_by_name
+            self._name_by_id = {row_id: name for row_id, name in rows}
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self, session: Session) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is None or (self.ttl_seconds is not None and time.monotonic() - loaded_at > self.ttl_seconds):
+            with primary_session(session) as reader:
+                self.load(reader)
+
+    def ids_for(self, session: Session, name: str) -> List[int]:
+        self._ensure_loaded(session)
+        return self._ids_by_name.get(name, [])
+
+    def name_for(self, session: Session, row_id: Optional[int]) -> Optional[str]:
+        self._ensure_loaded(session)
+        return self._name_by_id.get(row_id)
+
+
+category_lookup = NameLookup(Category, "category_name", settings.LOOKUP_CACHE_TTL_SECONDS)
+author_lookup = NameLookup(Author, "author_name", settings.LOOKUP_CACHE_TTL_SECONDS)
+
+
+def resolve_filter_ids(
+    session: Session,
+    lookup: NameLookup,
+    name: Optional[str] = None,
+    row_id: Optional[int] = None
+) -> Optional[List[int]]:
+    """Combine a name filter and an id filter into one id list; None means unfiltered."""
+    if not name and row_id is None:
+        return None
+    ids: Optional[Set[int]] = {row_id} if row_id is not None else None
+    if name:
+        named_ids = set(lookup.ids_for(session, name))
+        ids = named_ids if ids is None else ids & named_ids
+    return sorted(ids)
+
+
+def warm_lookups(session: Session) -> None:
+    category_lookup.load(session)
+    author_lookup.load(session)
+
+
+@on_commit(Category)
+def _invalidate_categories(writes: Dict[type, Optional[Set[int]]]) -> None:
+    category_lookup.invalidate()
+
+
+@on_commit(Author)
+def _invalidate_authors(writes: Dict[type, Optional[Set[int]]]) -> None:
+    author_lookup.invalidate()
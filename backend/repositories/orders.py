@@ -1,15 +1,62 @@
+import functools
+from typing import Any, List, Tuple
+
+from sqlalchemy import bindparam
 from sqlmodel import Session
-from models import Order, OrderItem
+from core.money import Money
+from models import Book, Order, OrderItem
 from models.orders import OrderCreate, OrderItemCreate
+from repositories.books import construct_base_book_query
+from repositories.pricing import ensure_pricing_current
 from shared.const_var import SuccessMessages, ErrorMessages
 
 
+@functools.lru_cache(maxsize=None)
+def _order_price_statement() -> Tuple[Any, str]:
+    query, effective_price_label, _ = construct_base_book_query()
+    return query.where(Book.id.in_(bindparam("book_ids", expanding=True))), effective_price_label
+
+
+def find_order_item_errors(session: Session, order_create: OrderCreate) -> List[dict]:
+    """Check every order line against the book's current list and discount price."""
+    book_ids = [item.book_id for item in order_create.items]
+
+    ensure_pricing_current(session)
+    query, effective_price_label = _order_price_statement()
+    result = session.exec(query, params={"book_ids": book_ids}).all()
+
+    price_map = {row.Book.id: (row.Book.book_price, getattr(row, effective_price_label)) for row in result}
+
+    errors: List[dict] = []
+
+    for item in order_create.items:
+        if item.book_id not in price_map:
+            errors.append({
+                "book_id": item.book_id,
+                "error": "Book does not exist"
+            })
+            continue
+
+        book_price, discount_price = price_map[item.book_id]
+        if item.price != book_price and item.price != discount_price:
+            errors.append({
+                "book_id": item.book_id,
+                "error": f"Invalid price: expected {book_price} or {discount_price}, got {item.price}"
+            })
+
+        if item.quantity < 1 or item.quantity > 8:
+            errors.append({
+                "book_id": item.book_id,
+                "error": "Invalid quantity (must be 1-8)"
+            })
+
+    return errors
+
+
 def create_order(db_session: Session, order_create: OrderCreate) -> tuple[dict, int]:
     try:
-        order_amount = sum(
-            item.quantity * item.price for item in order_create.items
-        )
-        
+        order_amount = sum((item.price * item.quantity for item in order_create.items), Money.zero())
+
         order_data = order_create.model_dump(exclude={"items"})
         order = Order(**order_data)
         order.order_amount=order_amount
@@ -22,7 +69,8 @@ def create_order(db_session: Session, order_create: OrderCreate) -> tuple[dict,
                 msg, status = create_order_item(db_session, item, order.id)
                 if status >= 400:
                     raise Exception(f"{item.book_id}:{msg}")
-        
+        db_session.commit()
+
         return {"message": SuccessMessages.order_success}, 200
 
     except Exception as e:
@@ -0,0 +1,163 @@
+from typing import Dict, Iterable, Optional, Set
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import Date, inspect, insert, delete, literal
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func, and_, or_
+from models import Book, Discount, BookPricing
+from repositories.discount_schedule import discount_schedule
+from repositories.events import RowChanges, on_flush, publish_writes
+
+
+def build_pricing_select(as_of: date, book_ids: Optional[Iterable[int]] = None):
+    ranked_discounts = (
+        select(
+            Discount.id,
+            Discount.book_id,
+            Discount.discount_price,
+            func.row_number().over(
+                partition_by=Discount.book_id,
+                order_by=(Discount.discount_price, Discount.id)
+            ).label("price_rank")
+        )
+        .where(
+            and_(
+                Discount.discount_start_date <= as_of,
+                or_(
+                    Discount.discount_end_date.is_(None),
+                    Discount.discount_end_date >= as_of
+                )
+            )
+        )
+    )
+    if book_ids is not None:
+        ranked_discounts = ranked_discounts.where(Discount.book_id.in_(book_ids))
+    ranked_discounts = ranked_discounts.subquery("ranked_discounts")
+
+    query = (
+        select(
+            Book.id,
+            func.coalesce(ranked_discounts.c.discount_price, Book.book_price),
+            func.coalesce(Book.book_price - ranked_discounts.c.discount_price, 0),
+            ranked_discounts.c.id,
+            literal(as_of, Date)
+        )
+        .join(
+            ranked_discounts,
+            and_(ranked_discounts.c.book_id == Book.id, ranked_discounts.c.price_rank == 1),
+            isouter=True
+        )
+    )
+    if book_ids is not None:
+        query = query.where(Book.id.in_(book_ids))
+    return query
+
+
+def refresh_book_pricing(session: Session, book_ids: Optional[Iterable[int]] = None, as_of: Optional[date] = None) -> None:
+    """Recompute `book_pricing` rows for `book_ids` (every book when None) inside the current transaction."""
+    as_of = as_of or date.today()
+    if book_ids is not None:
+        book_ids = sorted(set(book_ids))
+        if not book_ids:
+            return
+
+    clear_statement = delete(BookPricing)
+    if book_ids is not None:
+        clear_statement = clear_statement.where(BookPricing.book_id.in_(book_ids))
+
+    fill_statement = insert(BookPricing).from_select(
+        ["book_id", "effective_price", "discount_amount", "active_discount_id", "priced_on"],
+        build_pricing_select(as_of, book_ids)
+    )
+
+    connection = session.connection()
+    connection.execute(clear_statement)
+    connection.execute(fill_statement)
+
+
+def ensure_pricing_current(session: Session, today: Optional[date] = None) -> None:
+    """Bring the projection to today's discounts, re-pricing only books whose discount window opened or closed.
+
+    This writes and commits, so it runs at startup, from the midnight task in
+    main.py and before an order is priced, never on a read path: a read that
+    committed would pin its client to the primary. The discount schedule
+    answers "is anything due?" from memory, so when nothing is this is a
+    couple of comparisons.
+    """
+    today = today or date.today()
+    if discount_schedule.is_current(today):
+        return
+
+    if discount_schedule.sync(session, today):
+        # First look in this process (or after a bulk discount write): rows may predate today.
+        oldest_priced_on = session.exec(select(func.min(BookPricing.priced_on))).one()
+        has_books = session.exec(select(Book.id).limit(1)).first() is not None
+        if has_books and (oldest_priced_on is None or oldest_priced_on < today):
+            _roll_pricing_over(session, today, None)
+        return
+
+    previous_day = discount_schedule.as_of
+    due_ids = discount_schedule.advance(today)
+    if previous_day != today:
+        _roll_pricing_over(session, today, due_ids, previous_day)
+
+
+def seconds_until_midnight(now: Optional[datetime] = None) -> float:
+    now = now or datetime.now()
+    return (datetime.combine(now.date() + timedelta(days=1), time.min) - now).total_seconds()
+
+
+def _transitioning_book_ids(session: Session, since: date, today: date) -> Set[int]:
+    """Books with a discount window that opened or closed after `since`, up to `today`.
+
+    Read from the table rather than the in-process schedule, which never sees
+    discounts written by other workers, processes or jobs.
+    """
+    query = select(Discount.book_id).where(
+        or_(
+            and_(Discount.discount_start_date > since, Discount.discount_start_date <= today),
+            and_(Discount.discount_end_date >= since, Discount.discount_end_date < today)
+        )
+    ).distinct()
+    return set(session.exec(query).all())
+
+
+def _roll_pricing_over(session: Session, today: date, book_ids: Optional[Set[int]], since: Optional[date] = None) -> None:
+    """Re-price `book_ids` (every book when None) plus every book whose discounts changed after `since`.
+
+    Only re-priced rows are stamped `priced_on = today`, so rows left older
+    still send the next first look (see ensure_pricing_current) to a full rebuild.
+    """
+    try:
+        if book_ids is None:
+            refresh_book_pricing(session, as_of=today)
+        else:
+            if since is not None:
+                book_ids = book_ids | _transitioning_book_ids(session, since, today)
+            refresh_book_pricing(session, book_ids, as_of=today)
+        session.commit()
+        if book_ids is None or book_ids:
+            publish_writes({BookPricing: book_ids})
+    except IntegrityError:
+        # Another worker rolled the projection over concurrently.
+        session.rollback()
+
+
+def _touched_book_ids(changes: Dict[type, RowChanges]) -> Set[int]:
+    book_ids: Set[int] = set()
+    for book in changes.get(Book, RowChanges([], [], [])).all():
+        book_ids.add(book.id)
+    for discount in changes.get(Discount, RowChanges([], [], [])).all():
+        history = inspect(discount).attrs.book_id.history
+        book_ids.update(history.added or ())
+        book_ids.update(history.deleted or ())
+        book_ids.add(discount.book_id)
+    book_ids.discard(None)
+    return book_ids
+
+
+@on_flush(Book, Discount)
+def _sync_book_pricing(session: Session, changes: Optional[Dict[type, RowChanges]]) -> None:
+    if changes is None:
+        refresh_book_pricing(session)
+    else:
+        refresh_book_pricing(session, _touched_book_ids(changes))
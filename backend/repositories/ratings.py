@@ -0,0 +1,162 @@
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import Float, bindparam, cast, case, inspect, update
+from sqlmodel import Session, select, func
+from models import Book, Review
+from models.reviews import AllowedReviewStar
+from repositories.events import RowChanges, on_flush, publish_writes
+from repositories.versions import bump_catalog_version
+
+STARS = [int(star.value) for star in AllowedReviewStar]
+
+# Bayesian average: every book starts with PRIOR_WEIGHT phantom reviews of
+# PRIOR_MEAN stars, so a single 5-star review cannot outrank a long record of
+# 4- and 5-star ones. Books without reviews score 0 and rank last.
+PRIOR_MEAN = 3.0
+PRIOR_WEIGHT = 5
+RESCORE_BATCH_SIZE = 1000
+
+
+def star_column(star: int):
+    return getattr(Book, f"rating_{star}_count")
+
+
+def rating_score(rating_sum, review_count):
+    """SQL expression for the Bayesian rating score of the given aggregate columns."""
+    return case(
+        (review_count > 0, (cast(rating_sum, Float) + PRIOR_WEIGHT * PRIOR_MEAN) / (review_count + PRIOR_WEIGHT)),
+        else_=0.0
+    )
+
+
+def _apply_deltas(session: Session, deltas: Dict[int, Dict[str, int]]) -> None:
+    connection = session.connection()
+    for book_id, delta in deltas.items():
+        count_delta = delta["count"]
+        sum_delta = delta["sum"]
+        if not count_delta and not sum_delta and not any(delta.get(star) for star in STARS):
+            continue
+
+        new_count = Book.review_count + count_delta
+        values = {
+            "review_count": new_count,
+            "rating_sum": Book.rating_sum + sum_delta,
+            "avg_rating": case(
+                (new_count > 0, cast(Book.rating_sum + sum_delta, Float) / new_count),
+                else_=0.0
+            ),
+            "rating_score": rating_score(Book.rating_sum + sum_delta, new_count),
+        }
+        for star in STARS:
+            if delta.get(star):
+                values[f"rating_{star}_count"] = star_column(star) + delta[star]
+
+        connection.execute(update(Book).where(Book.id == book_id).values(**values))
+
+
+def rebuild_rating_aggregates(session: Session, book_ids: Optional[Iterable[int]] = None) -> None:
+    """Recompute review aggregates from the review table for `book_ids` (every book when None)."""
+    if book_ids is not None:
+        book_ids = sorted(set(book_ids))
+        if not book_ids:
+            return
+
+    reset_statement = update(Book).values(
+        review_count=0,
+        rating_sum=0,
+        avg_rating=0.0,
+        rating_score=0.0,
+        **{f"rating_{star}_count": 0 for star in STARS}
+    )
+
+    aggregates = select(
+        Review.book_id,
+        func.count(Review.id).label("review_count"),
+        func.sum(Review.rating_start).label("rating_sum"),
+        *[func.count(case((Review.rating_start == star, 1))).label(f"rating_{star}_count") for star in STARS]
+    )
+    if book_ids is not None:
+        reset_statement = reset_statement.where(Book.id.in_(book_ids))
+        aggregates = aggregates.where(Review.book_id.in_(book_ids))
+    aggregates = aggregates.group_by(Review.book_id).subquery("review_aggregates")
+
+    fill_statement = (
+        update(Book)
+        .where(Book.id == aggregates.c.book_id)
+        .values(
+            review_count=aggregates.c.review_count,
+            rating_sum=aggregates.c.rating_sum,
+            avg_rating=cast(aggregates.c.rating_sum, Float) / aggregates.c.review_count,
+            rating_score=rating_score(aggregates.c.rating_sum, aggregates.c.review_count),
+            **{f"rating_{star}_count": aggregates.c[f"rating_{star}_count"] for star in STARS}
+        )
+    )
+
+    connection = session.connection()
+    connection.execute(reset_statement)
+    connection.execute(fill_statement)
+
+
+_rescore_batch = (
+    update(Book)
+    .where(Book.id >= bindparam("first_id"), Book.id <= bindparam("last_id"))
+    .values(rating_score=rating_score(Book.rating_sum, Book.review_count))
+)
+
+
+def rescore_ratings(session: Session, batch_size: int = RESCORE_BATCH_SIZE) -> int:
+    """Recompute every book's rating score from its stored aggregates, one id range per committed batch.
+
+    Run after changing PRIOR_MEAN or PRIOR_WEIGHT; reviews keep scores current on their own. Returns the books scored.
+    """
+    scored, last_id = 0, 0
+    while True:
+        batch_ids = session.exec(select(Book.id).where(Book.id > last_id).order_by(Book.id).limit(batch_size)).all()
+        if not batch_ids:
+            break
+        session.connection().execute(_rescore_batch, {"first_id": batch_ids[0], "last_id": batch_ids[-1]})
+        bump_catalog_version(session)
+        session.commit()
+        publish_writes({Book: set(batch_ids)})
+        scored += len(batch_ids)
+        last_id = batch_ids[-1]
+    return scored
+
+
+def _collect_review_deltas(changes: RowChanges) -> Dict[int, Dict[str, int]]:
+    deltas: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def apply(book_id: Optional[int], rating: Optional[int], sign: int) -> None:
+        if book_id is None or rating is None:
+            return
+        deltas[book_id]["count"] += sign
+        deltas[book_id]["sum"] += sign * rating
+        deltas[book_id][rating] += sign
+
+    for review in changes.new:
+        apply(review.book_id, review.rating_start, 1)
+
+    for review in changes.deleted:
+        apply(review.book_id, review.rating_start, -1)
+
+    for review in changes.dirty:
+        state = inspect(review)
+        book_history = state.attrs.book_id.history
+        rating_history = state.attrs.rating_start.history
+        if not book_history.has_changes() and not rating_history.has_changes():
+            continue
+        previous_book_id = book_history.deleted[0] if book_history.deleted else review.book_id
+        previous_rating = rating_history.deleted[0] if rating_history.deleted else review.rating_start
+        apply(previous_book_id, previous_rating, -1)
+        apply(review.book_id, review.rating_start, 1)
+
+    return deltas
+
+
+@on_flush(Review)
+def _sync_rating_aggregates(session: Session, changes: Optional[Dict[type, RowChanges]]) -> None:
+    if changes is None:
+        rebuild_rating_aggregates(session)
+    else:
+        _apply_deltas(session, _collect_review_deltas(changes[Review]))
@@ -0,0 +1,95 @@
+from contextlib import contextmanager
+from typing import Counter, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from sqlmodel import Session
+from core.replicas import PRIMARY_BIND
+
+
+@contextmanager
+def primary_session(session: Session) -> Iterator[Session]:
+    """`session`, or a short-lived session on the primary when `session` reads from a replica.
+
+    Caches re-read rows because a write just committed; a lagging replica
+    would hand back the old values and they would stay cached until the
+    row's next write.
+    """
+    primary_bind = session.info.get(PRIMARY_BIND)
+    if primary_bind is None:
+        yield session
+    else:
+        with Session(primary_bind) as primary:
+            yield primary
+
+
+class RefreshTicket(NamedTuple):
+    generation: int
+    sequence: int
+    book_ids: Optional[Set[int]]
+
+
+class PendingRefresh:
+    """The book ids an in-memory cache must re-read, for caches that query outside their lock.
+
+    Async routes run repositories inside `run_sync`, i.e. in a greenlet on the
+    event loop thread, and every query yields back to the loop. A cache that
+    held its threading.Lock across a query would let a second request block
+    the loop thread on that lock while the first request's query can never
+    complete. So a reader `claim`s the pending work under the cache's lock,
+    queries unlocked, and `settle`s under the lock again before installing
+    what it read. Every method expects the caller to hold the cache's lock.
+
+    Rows read after a claim may predate writes that commit while the query is
+    in flight, and a concurrent reader may install its own (newer) rows first;
+    settling re-marks every book written since the claim so the next reader
+    re-selects it. A bulk write bumps `generation`, and tickets claimed before
+    it must not be installed.
+    """
+
+    def __init__(self) -> None:
+        self.stale = True
+        self.generation = 0
+        self.dirty_ids: Set[int] = set()
+        self._sequence = 0
+        self._in_flight: Counter[int] = Counter()
+        self._writes_in_flight: List[Tuple[int, Set[int]]] = []
+
+    def __bool__(self) -> bool:
+        return self.stale or bool(self.dirty_ids)
+
+    def mark(self, book_ids: Optional[Set[int]]) -> None:
+        if book_ids is None:
+            self.stale = True
+            self.generation += 1
+            self.dirty_ids.clear()
+            self._writes_in_flight.clear()
+            return
+        self.dirty_ids.update(book_ids)
+        if self._in_flight:
+            self._sequence += 1
+            self._writes_in_flight.append((self._sequence, set(book_ids)))
+
+    def claim(self, reload: bool = False) -> RefreshTicket:
+        """Take the pending work: every row when `reload`, otherwise the dirty ids."""
+        book_ids, self.dirty_ids = (None, set()) if reload else (self.dirty_ids, set())
+        self._in_flight[self._sequence] += 1
+        return RefreshTicket(self.generation, self._sequence, book_ids)
+
+    def settle(self, ticket: RefreshTicket, loaded: bool) -> bool:
+        """Finish a claim; True when what it read may be installed."""
+        self._in_flight[ticket.sequence] -= 1
+        if not self._in_flight[ticket.sequence]:
+            del self._in_flight[ticket.sequence]
+
+        current = ticket.generation == self.generation
+        if current:
+            if not loaded and ticket.book_ids:
+                self.dirty_ids.update(ticket.book_ids)
+            for sequence, book_ids in self._writes_in_flight:
+                if sequence > ticket.sequence:
+                    self.dirty_ids.update(book_ids)
+            if loaded and ticket.book_ids is None:
+                self.stale = False
+
+        oldest = min(self._in_flight, default=self._sequence)
+        self._writes_in_flight = [(sequence, book_ids) for sequence, book_ids in self._writes_in_flight if sequence > oldest]
+        return current and loaded
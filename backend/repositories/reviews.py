@@ -1,8 +1,29 @@
+import functools
+from sqlalchemy import Integer, bindparam
 from sqlmodel import Session, select, func, desc, asc
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from models import Review
 from models.reviews import ReviewRead, ReviewSortByOptions, AllowedReviewStar, ReviewMetadataResponse, ReviewCreate
 from models.paging_info import PaginatedResponse, PagingInfo
+from repositories import ratings  # noqa: F401  registers the review aggregate flush hook
+
+
+@functools.lru_cache(maxsize=None)
+def _review_page_statements(by_book: bool, by_rating: bool, sort_by: ReviewSortByOptions) -> Tuple[Any, Any]:
+    """(count, page) statements for one filter/sort shape; values are bound at execution time."""
+    base_query = select(Review)
+    if by_book:
+        base_query = base_query.where(Review.book_id == bindparam("book_id"))
+    if by_rating:
+        base_query = base_query.where(Review.rating_start == bindparam("filter_rating"))
+
+    count_query = select(func.count()).select_from(base_query.subquery())
+
+    if sort_by == ReviewSortByOptions.newest_to_oldest:
+        base_query = base_query.order_by(desc(Review.review_date))
+    elif sort_by == ReviewSortByOptions.oldest_to_newest:
+        base_query = base_query.order_by(asc(Review.review_date))
+    return count_query, base_query.offset(bindparam("offset", type_=Integer)).limit(bindparam("limit", type_=Integer))
 
 
 def get_reviews(
@@ -13,31 +34,17 @@ def get_reviews(
     book_id: Optional[int] = None,
     filter_rating: Optional[int] = None
 ) -> PaginatedResponse:
-    base_query = select(Review)
-    
-    if book_id is not None:
-        base_query = base_query.where(Review.book_id == book_id)
-    
-    if filter_rating is not None:
-        base_query = base_query.where(Review.rating_start == filter_rating)
-    
-    count_query = select(func.count()).select_from(base_query.subquery())
-    
+    count_query, paginated_query = _review_page_statements(book_id is not None, filter_rating is not None, sort_by)
+    params: Dict[str, Any] = {"book_id": book_id, "filter_rating": filter_rating}
+
     try:
-        total_items = session.exec(count_query).one()
+        total_items = session.exec(count_query, params=params).one()
     except Exception as e:
         print(f"Count query failed: {e}")
         total_items = 0
     
-    if sort_by == ReviewSortByOptions.newest_to_oldest:
-        base_query = base_query.order_by(desc(Review.review_date))
-    elif sort_by == ReviewSortByOptions.oldest_to_newest:
-        base_query = base_query.order_by(asc(Review.review_date))
-    
-    paginated_query = base_query.offset((page - 1) * page_size).limit(page_size)
-    
     try:
-        reviews = session.exec(paginated_query).all()
+        reviews = session.exec(paginated_query, params={**params, "offset": (page - 1) * page_size, "limit": page_size}).all()
         items = [ReviewRead.model_validate(review) for review in reviews]
     except Exception as e:
         print(f"Data query failed: {e}")
@@ -57,35 +64,37 @@ def get_reviews(
     return PaginatedResponse(data=items, paging=paging_info)
 
 
+_rating_counts_query = (
+    select(
+        Review.rating_start,
+        func.count(Review.id).label("count")
+    )
+    .where(Review.book_id == bindparam("book_id"))
+    .group_by(Review.rating_start)
+)
+
+_avg_rating_query = (
+    select(
+        func.count(Review.id).label("total"),
+        func.coalesce(func.avg(Review.rating_start), 0).label("avg")
+    )
+    .where(Review.book_id == bindparam("book_id"))
+)
+
+
 def get_review_metadata(session: Session, book_id: int) -> ReviewMetadataResponse:
     min_star = min([int(s.value) for s in AllowedReviewStar])
     max_star = max([int(s.value) for s in AllowedReviewStar])
-    
-    rating_counts_query = (
-        select(
-            Review.rating_start,
-            func.count(Review.id).label("count")
-        )
-        .where(Review.book_id == book_id)
-        .group_by(Review.rating_start)
-    )
-    
-    avg_rating_query = (
-        select(
-            func.count(Review.id).label("total"),
-            func.coalesce(func.avg(Review.rating_start), 0).label("avg")
-        )
-        .where(Review.book_id == book_id)
-    )
-    
+    params = {"book_id": book_id}
+
     try:
-        rating_counts_results = session.exec(rating_counts_query).all()
+        rating_counts_results = session.exec(_rating_counts_query, params=params).all()
         rating_counts = {r[0]: r[1] for r in rating_counts_results}
         
         for star in range(min_star, max_star + 1):
             rating_counts.setdefault(star, 0)
         
-        total_and_avg = session.exec(avg_rating_query).one()
+        total_and_avg = session.exec(_avg_rating_query, params=params).one()
         total_reviews = total_and_avg[0]
         avg_rating = round(total_and_avg[1], 2) if total_reviews > 0 else 0
         
@@ -103,6 +112,8 @@ def get_review_metadata(session: Session, book_id: int) -> ReviewMetadataRespons
 
 
 def create_review(*, db_session: Session, review_create: ReviewCreate) -> Review:
+    # The book's review_count, rating_sum and star histogram are bumped by the
+    # ratings flush hook in the same transaction as this insert.
     db_obj = Review.model_validate(review_create)
     db_session.add(db_obj)
     db_session.commit()
@@ -0,0 +1,178 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import bindparam, case, inspect, literal_column, text, Float, cast
+from sqlmodel import Session, select, func, desc, asc, and_, or_
+from models import Author, Book, BookPricing
+from models.books import AllowedPageSize
+from models.paging_info import CountMode, PaginatedResponse
+from core.cache import BoundedCache
+from core.config import settings
+from repositories.books import (
+    _book_reads_from_rows,
+    _build_paging_info,
+    build_count_statements,
+    count_filtered_books,
+    hydrate_books,
+)
+from repositories.events import RowChanges, on_commit, on_flush
+
+SEARCH_CONFIG = "english"
+MAX_SEARCH_TERMS = 8
+
+# Final score = relevance + popularity boost + discount boost. Relevance is in
+# [0, 1]; the boosts only reorder results of comparable relevance.
+POPULARITY_WEIGHT = 0.2
+DISCOUNT_WEIGHT = 0.1
+POPULARITY_HALF_POINT = 10
+
+# Apart from the listing count cache: arbitrary query strings must not evict hot listing totals.
+_search_count_cache = BoundedCache(settings.SEARCH_COUNT_CACHE_MAX_ENTRIES, settings.COUNT_CACHE_TTL_SECONDS)
+
+
+@on_commit(Book, Author)
+def _invalidate_search_counts(writes: Dict[type, Optional[Set[int]]]) -> None:
+    _search_count_cache.clear()
+
+_SEARCH_VECTOR_SQL = f"""
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(book.book_title, '')), 'A') ||
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(author.author_name, '')), 'B') ||
+    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(book.book_summary, '')), 'C')
+"""
+
+
+def supports_full_text(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def refresh_search_vectors(
+    session: Session,
+    book_ids: Optional[Iterable[int]] = None,
+    author_ids: Optional[Iterable[int]] = None
+) -> None:
+    """Rebuild `book.search_vector` for the given books/authors (every book when both are None)."""
+    if not supports_full_text(session):
+        return
+
+    statement = f"UPDATE book SET search_vector = {_SEARCH_VECTOR_SQL} FROM author WHERE author.id = book.author_id"
+    params = {}
+    if book_ids is not None or author_ids is not None:
+        statement += " AND (book.id IN :book_ids OR book.author_id IN :author_ids)"
+        params = {"book_ids": sorted(set(book_ids or ())) or [-1], "author_ids": sorted(set(author_ids or ())) or [-1]}
+        query = text(statement).bindparams(
+            bindparam("book_ids", expanding=True),
+            bindparam("author_ids", expanding=True)
+        )
+    else:
+        query = text(statement)
+    session.connection().execute(query, params)
+
+
+def _has_changes(obj, *fields: str) -> bool:
+    state = inspect(obj)
+    return state.pending or any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@on_flush(Book, Author)
+def _sync_search_vectors(session: Session, changes: Optional[Dict[type, RowChanges]]) -> None:
+    if not supports_full_text(session):
+        return
+    if changes is None:
+        refresh_search_vectors(session)
+        return
+
+    book_changes = changes.get(Book, RowChanges([], [], []))
+    book_ids: Set[int] = {
+        book.id for book in [*book_changes.new, *book_changes.dirty]
+        if _has_changes(book, "book_title", "book_summary", "author_id")
+    }
+    author_ids: Set[int] = {
+        author.id for author in changes.get(Author, RowChanges([], [], [])).dirty
+        if _has_changes(author, "author_name")
+    }
+    if book_ids or author_ids:
+        refresh_search_vectors(session, book_ids, author_ids)
+
+
+def _full_text_relevance(q: str):
+    search_vector = literal_column("book.search_vector")
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # Normalisation flag 32 maps the rank into [0, 1).
+    return search_vector.op("@@")(ts_query), func.ts_rank_cd(search_vector, ts_query, 32)
+
+
+def _like_relevance(q: str):
+    terms = [term.lower() for term in q.split()[:MAX_SEARCH_TERMS]]
+    title = func.lower(Book.book_title)
+    summary = func.lower(func.coalesce(Book.book_summary, ""))
+    author = func.lower(Author.author_name)
+
+    matches = []
+    weighted_hits = []
+    for term in terms:
+        in_title = title.contains(term, autoescape=True)
+        in_summary = summary.contains(term, autoescape=True)
+        in_author = author.contains(term, autoescape=True)
+        matches.append(or_(in_title, in_summary, in_author))
+        weighted_hits.append(
+            case((in_title, 3.0), else_=0.0) + case((in_author, 2.0), else_=0.0) + case((in_summary, 1.0), else_=0.0)
+        )
+    relevance = sum(weighted_hits) / (6.0 * len(terms))
+    return and_(*matches), relevance
+
+
+def search_books(
+    session: Session,
+    q: str,
+    page: int = 1,
+    page_size: int = AllowedPageSize.TWENTY,
+    count_mode: CountMode = CountMode.exact
+) -> PaginatedResponse:
+    if supports_full_text(session):
+        matches, relevance = _full_text_relevance(q)
+    else:
+        matches, relevance = _like_relevance(q)
+
+    popularity_boost = cast(Book.review_count, Float) / (Book.review_count + POPULARITY_HALF_POINT)
+    discount_boost = case(
+        (Book.book_price > 0, cast(BookPricing.discount_amount, Float) / cast(Book.book_price, Float)),
+        else_=0.0
+    )
+    score = (relevance + POPULARITY_WEIGHT * popularity_boost + DISCOUNT_WEIGHT * discount_boost).label("score")
+
+    filtered_query = (
+        select(Book.id, score)
+        .join(BookPricing, BookPricing.book_id == Book.id)
+        .join(Author, Author.id == Book.author_id)
+        .where(matches)
+    )
+
+    try:
+        total_items, total_is_estimate = count_filtered_books(
+            session, build_count_statements(filtered_query), filter_key=(q,), count_mode=count_mode,
+            cache=_search_count_cache
+        )
+    except Exception as e:
+        print(f"Search count query failed: {e}")
+        total_items, total_is_estimate = 0, False
+
+    page_query = (
+        filtered_query
+        .order_by(desc(score), asc(Book.id))
+        .offset((page - 1) * page_size)
+        .limit(page_size + 1)
+    )
+
+    items = []
+    has_more = False
+    try:
+        book_ids: List[int] = [row[0] for row in session.exec(page_query).all()]
+        has_more = len(book_ids) > page_size
+        items = _book_reads_from_rows(session, hydrate_books(session, book_ids[:page_size]))
+    except Exception as e:
+        print(f"Search query failed: {e}")
+        items = []
+        total_items = 0
+
+    paging_info = _build_paging_info(page, page_size, total_items, total_is_estimate, None, None)
+    paging_info.has_next = has_more
+    return PaginatedResponse(data=items, paging=paging_info)
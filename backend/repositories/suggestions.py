@@ -0,0 +1,255 @@
+import bisect
+import heapq
+import threading
+import time
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlmodel import Session, select, func
+from core.config import settings
+from models import Author, Book, Category, Review
+from models.suggestions import Suggestion, SuggestionKind
+from repositories.events import on_commit
+from repositories.refresh import primary_session
+from repositories.versions import catalog_version
+
+# Results for prefixes this short span a large slice of the index, so they are memoised
+# until a label is added, renamed or removed, or the index reloads.
+MEMO_PREFIX_LENGTH = 2
+
+
+def normalize(text: str) -> str:
+    """Casefold, strip accents and collapse whitespace."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def _prefix_keys(label: str) -> Set[str]:
+    """Index a label from every word start, so "alice test" is found by "ali" and "tes"."""
+    words = normalize(label).split(" ")
+    return {" ".join(words[start:]) for start in range(len(words)) if words[start]}
+
+
+class _Entry(NamedTuple):
+    label: str
+    weight: int
+    keys: Set[str]
+
+
+class PrefixIndex:
+    """Sorted (key, id) array for one kind of name, searched by bisecting the prefix range."""
+
+    def __init__(self) -> None:
+        self._keys: List[Tuple[str, int]] = []
+        self._entries: Dict[int, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, rows: Sequence[Tuple[int, str, int]]) -> None:
+        self._entries = {row_id: _Entry(label, weight, _prefix_keys(label)) for row_id, label, weight in rows}
+        self._keys = sorted((key, row_id) for row_id, entry in self._entries.items() for key in entry.keys)
+
+    def remove(self, row_id: int) -> bool:
+        """Drop `row_id`; True when it was indexed."""
+        entry = self._entries.pop(row_id, None)
+        if entry is None:
+            return False
+        for key in entry.keys:
+            del self._keys[bisect.bisect_left(self._keys, (key, row_id))]
+        return True
+
+    def upsert(self, row_id: int, label: str, weight: int) -> bool:
+        """Index `row_id` under `label`; True unless only its weight changed."""
+        current = self._entries.get(row_id)
+        if current is not None and current.label == label:
+            self._entries[row_id] = current._replace(weight=weight)
+            return False
+        self.remove(row_id)
+        entry = _Entry(label, weight, _prefix_keys(label))
+        for key in entry.keys:
+            bisect.insort(self._keys, (key, row_id))
+        self._entries[row_id] = entry
+        return True
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[int, _Entry]]:
+        low = bisect.bisect_left(self._keys, (prefix,))
+        high = bisect.bisect_left(self._keys, (prefix + "\uffff",))
+        row_ids = {row_id for _, row_id in self._keys[low:high]}
+        best = heapq.nsmallest(
+            limit, row_ids, key=lambda row_id: (-self._entries[row_id].weight, self._entries[row_id].label, row_id)
+        )
+        return [(row_id, self._entries[row_id]) for row_id in best]
+
+
+class SuggestionIndex:
+    """Type-ahead over book titles, author names and category names, weighted by review count.
+
+    Titles weigh their book's reviews; authors and categories weigh the reviews
+    of all their books. Writes mark rows dirty and the next reader re-selects
+    only those rows and the authors/categories they roll up into. Writes made
+    elsewhere (other workers, jobs.py) never reach those hooks, so every
+    `check_seconds` a reader compares the catalog version with the one the
+    index was loaded at and reloads everything when it moved.
+    """
+
+    def __init__(self, check_seconds: Optional[float] = None) -> None:
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self.indexes: Dict[SuggestionKind, PrefixIndex] = {kind: PrefixIndex() for kind in SuggestionKind}
+        self._book_parents: Dict[int, Tuple[int, int]] = {}
+        self._dirty: Dict[SuggestionKind, Set[int]] = {kind: set() for kind in SuggestionKind}
+        self._stale = True
+        self._memo: Dict[Tuple[str, Optional[SuggestionKind], int], List[Suggestion]] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def mark_dirty(self, kind: SuggestionKind, row_ids: Optional[Set[int]]) -> None:
+        with self._lock:
+            if row_ids is None:
+                self._stale = True
+            elif not self._stale:
+                self._dirty[kind].update(row_ids)
+
+    @staticmethod
+    def _title_rows(book_ids: Optional[Sequence[int]] = None):
+        query = select(Book.id, Book.book_title, Book.review_count, Book.author_id, Book.category_id)
+        if book_ids is not None:
+            query = query.where(Book.id.in_(book_ids))
+        return query
+
+    @staticmethod
+    def _rollup_rows(model, name_column, foreign_key, row_ids: Optional[Sequence[int]] = None):
+        query = (
+            select(model.id, name_column, func.coalesce(func.sum(Book.review_count), 0))
+            .join(Book, foreign_key == model.id, isouter=True)
+            .group_by(model.id, name_column)
+        )
+        if row_ids is not None:
+            query = query.where(model.id.in_(row_ids))
+        return query
+
+    def _rollups(self, session: Session, kind: SuggestionKind, row_ids: Optional[Sequence[int]] = None):
+        if kind == SuggestionKind.author:
+            return session.exec(self._rollup_rows(Author, Author.author_name, Book.author_id, row_ids)).all()
+        return session.exec(self._rollup_rows(Category, Category.category_name, Book.category_id, row_ids)).all()
+
+    def _check_version(self, session: Session) -> None:
+        if self._version is None or self.check_seconds is None:
+            return
+        if time.monotonic() - self._checked_at < self.check_seconds:
+            return
+        self._checked_at = time.monotonic()
+        # Local writes move the version too, so this also folds their weights into the memo.
+        if catalog_version(session) != self._version:
+            self._stale = True
+
+    def _load(self, session: Session) -> None:
+        # Read before the rows, so a write landing in between shows up as a newer version.
+        self._version, self._checked_at = catalog_version(session), time.monotonic()
+        self._memo.clear()
+        titles = session.exec(self._title_rows()).all()
+        self.indexes[SuggestionKind.title].load([(book_id, title, weight) for book_id, title, weight, _, _ in titles])
+        self._book_parents = {book_id: (author_id, category_id) for book_id, _, _, author_id, category_id in titles}
+        for kind in (SuggestionKind.author, SuggestionKind.category):
+            self.indexes[kind].load(self._rollups(session, kind))
+
+    def _refresh_rows(self, session: Session) -> None:
+        book_ids = sorted(self._dirty[SuggestionKind.title])
+        author_ids = set(self._dirty[SuggestionKind.author])
+        category_ids = set(self._dirty[SuggestionKind.category])
+        relabelled = False
+
+        if book_ids:
+            titles = self.indexes[SuggestionKind.title]
+            found: Set[int] = set()
+            for book_id in book_ids:
+                author_id, category_id = self._book_parents.pop(book_id, (None, None))
+                author_ids.add(author_id)
+                category_ids.add(category_id)
+            for book_id, title, weight, author_id, category_id in session.exec(self._title_rows(book_ids)).all():
+                relabelled |= titles.upsert(book_id, title, weight)
+                found.add(book_id)
+                self._book_parents[book_id] = (author_id, category_id)
+                author_ids.add(author_id)
+                category_ids.add(category_id)
+            for book_id in set(book_ids) - found:
+                relabelled |= titles.remove(book_id)
+
+        for kind, row_ids in ((SuggestionKind.author, author_ids), (SuggestionKind.category, category_ids)):
+            row_ids.discard(None)
+            if not row_ids:
+                continue
+            index = self.indexes[kind]
+            for row_id, label, weight in self._rollups(session, kind, sorted(row_ids)):
+                relabelled |= index.upsert(row_id, label, weight)
+                row_ids.discard(row_id)
+            for row_id in row_ids:
+                relabelled |= index.remove(row_id)
+
+        # Weight-only changes (review writes) keep the memo; the version check reloads it.
+        if relabelled:
+            self._memo.clear()
+        for dirty_ids in self._dirty.values():
+            dirty_ids.clear()
+
+    def suggest(
+        self,
+        session: Session,
+        prefix: str,
+        kind: Optional[SuggestionKind] = None,
+        limit: int = 10
+    ) -> List[Suggestion]:
+        prefix = normalize(prefix)
+        with self._lock, primary_session(session) as reader:
+            self._check_version(reader)
+            if self._stale:
+                self._load(reader)
+                self._stale = False
+                for dirty_ids in self._dirty.values():
+                    dirty_ids.clear()
+            elif any(self._dirty.values()):
+                self._refresh_rows(reader)
+
+            memo_key = (prefix, kind, limit)
+            if memo_key in self._memo:
+                return self._memo[memo_key]
+
+            kinds = [kind] if kind is not None else list(SuggestionKind)
+            matches = [
+                Suggestion(kind=match_kind, id=row_id, label=entry.label, weight=entry.weight)
+                for match_kind in kinds
+                for row_id, entry in self.indexes[match_kind].search(prefix, limit)
+            ]
+            if len(kinds) > 1:
+                matches = heapq.nsmallest(limit, matches, key=lambda match: (-match.weight, match.label, match.id))
+
+            if len(prefix) <= MEMO_PREFIX_LENGTH:
+                self._memo[memo_key] = matches
+            return matches
+
+
+suggestion_index = SuggestionIndex(settings.SUGGESTION_INDEX_CHECK_SECONDS)
+
+
+def warm_suggestions(session: Session) -> None:
+    suggestion_index.suggest(session, "")
+
+
+@on_commit(Book, Review)
+def _refresh_titles(writes: Dict[type, Optional[Set[int]]]) -> None:
+    if any(book_ids is None for book_ids in writes.values()):
+        suggestion_index.mark_dirty(SuggestionKind.title, None)
+    else:
+        suggestion_index.mark_dirty(SuggestionKind.title, set().union(*writes.values()))
+
+
+@on_commit(Author)
+def _refresh_authors(writes: Dict[type, Optional[Set[int]]]) -> None:
+    suggestion_index.mark_dirty(SuggestionKind.author, writes[Author])
+
+
+@on_commit(Category)
+def _refresh_categories(writes: Dict[type, Optional[Set[int]]]) -> None:
+    suggestion_index.mark_dirty(SuggestionKind.category, writes[Category])
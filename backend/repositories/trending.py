@@ -0,0 +1,237 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, update
+from sqlmodel import Session, select
+from models import Book, Order, OrderItem, Review, TrendingState
+from repositories.events import publish_writes
+from repositories.versions import bump_catalog_version
+
+TRENDING_SCOPE = "trending"
+
+# An event's weight halves every HALF_LIFE_DAYS; an ordered copy counts for
+# more than a review because it is a stronger signal of current demand.
+HALF_LIFE_DAYS = 7.0
+REVIEW_WEIGHT = 1.0
+ORDER_ITEM_WEIGHT = 2.0
+BATCH_SIZE = 1000
+# A rebuild ignores events older than this; they would add less than 2^-10 each.
+HORIZON_DAYS = 10 * HALF_LIFE_DAYS
+# Scores are forward-decayed: each event adds weight * 2^((t - epoch) / half-life),
+# so only books with new events are written and every score shares the same
+# implicit 2^-((now - epoch) / half-life) factor, which preserves ordering.
+# Moving the epoch forward before that factor nears float range keeps them finite.
+RESCALE_AFTER_DAYS = 64 * HALF_LIFE_DAYS
+# Ids are handed out when a transaction inserts, not when it commits, so a
+# watermark can pass an id whose transaction is still open. The ids it skips
+# (at most GAP_SPAN below each folded id) are kept as gaps and rechecked on
+# every run; after GAP_GRACE_SECONDS they are taken to be rolled back or deleted.
+GAP_SPAN = 1000
+GAP_GRACE_SECONDS = 3600
+
+_DECAY_PER_DAY = math.log(2) / HALF_LIFE_DAYS
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back naive; they were written in UTC.
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+def _forward_weight(moment: datetime, epoch: datetime) -> float:
+    return math.exp(_DECAY_PER_DAY * (_as_utc(moment) - _as_utc(epoch)).total_seconds() / 86400)
+
+
+class _EventSource(NamedTuple):
+    watermark: str
+    gaps: str
+    events: Callable[[], Any]
+    id_column: Any
+    moment_column: Any
+    weight: Callable[[Any], float]
+
+    def batch(self, after_id: int, since: Optional[datetime], limit: int):
+        query = self.events().where(self.id_column > after_id)
+        if since is not None:
+            query = query.where(self.moment_column >= since)
+        return query.order_by(self.id_column).limit(limit)
+
+
+def _review_events():
+    return select(Review.id, Review.book_id, Review.review_date)
+
+
+def _order_item_events():
+    return (
+        select(OrderItem.id, OrderItem.book_id, Order.order_date, OrderItem.quantity)
+        .join(Order, Order.id == OrderItem.order_id)
+    )
+
+
+_SOURCES = (
+    _EventSource(
+        "last_review_id", "review_id_gaps", _review_events, Review.id, Review.review_date,
+        lambda row: REVIEW_WEIGHT
+    ),
+    _EventSource(
+        "last_order_item_id", "order_item_id_gaps", _order_item_events, OrderItem.id, Order.order_date,
+        lambda row: ORDER_ITEM_WEIGHT * max(row[3], 0)
+    ),
+)
+
+_add_score = (
+    update(Book)
+    .where(Book.id == bindparam("scored_book_id"))
+    .values(trending_score=Book.trending_score + bindparam("score_delta"))
+)
+
+
+def _load_state(session: Session, now: datetime) -> TrendingState:
+    state = session.get(TrendingState, TRENDING_SCOPE)
+    if state is None:
+        state = TrendingState(scope=TRENDING_SCOPE, epoch=now)
+        session.add(state)
+    return state
+
+
+def _fold_rows(session: Session, state: TrendingState, source: _EventSource, rows: List[Any], now: datetime) -> Set[int]:
+    deltas: Dict[int, float] = defaultdict(float)
+    for row in rows:
+        book_id, moment = row[1], row[2]
+        if moment is not None:
+            # Clients may date a review ahead; weighting it at face value would pin the book to the top.
+            moment = min(_as_utc(moment), _as_utc(now))
+            deltas[book_id] += source.weight(row) * _forward_weight(moment, state.epoch)
+    if deltas:
+        session.connection().execute(
+            _add_score, [{"scored_book_id": book_id, "score_delta": delta} for book_id, delta in deltas.items()]
+        )
+    return set(deltas)
+
+
+def _fold_batch(
+    session: Session,
+    state: TrendingState,
+    source: _EventSource,
+    since: Optional[datetime],
+    batch_size: int,
+    now: datetime,
+    track_gaps: bool = False
+) -> Tuple[int, Set[int]]:
+    """Add one batch of `source` events past its watermark to the scores. Returns (events, touched book ids).
+
+    With `track_gaps`, ids the batch skips over are recorded as gaps.
+    """
+    previous_id = getattr(state, source.watermark)
+    rows: List[Any] = session.exec(source.batch(previous_id, since, batch_size)).all()
+    if not rows:
+        return 0, set()
+
+    book_ids = _fold_rows(session, state, source, rows, now)
+    if track_gaps:
+        gaps = dict(getattr(state, source.gaps))
+        for row in rows:
+            for missing_id in range(max(previous_id + 1, row[0] - GAP_SPAN), row[0]):
+                gaps.setdefault(str(missing_id), now.timestamp())
+            previous_id = row[0]
+        setattr(state, source.gaps, gaps)
+    setattr(state, source.watermark, rows[-1][0])
+    session.add(state)
+    return len(rows), book_ids
+
+
+def _trailing_gaps(session: Session, source: _EventSource, watermark: int, noticed_at: float) -> Dict[str, float]:
+    low = max(watermark - GAP_SPAN, 0)
+    present = set(session.exec(
+        select(source.id_column).where(source.id_column > low, source.id_column <= watermark)
+    ).all())
+    return {str(missing_id): noticed_at for missing_id in range(low + 1, watermark + 1) if missing_id not in present}
+
+
+def _fold_gaps(session: Session, state: TrendingState, source: _EventSource, now: datetime) -> Tuple[int, Set[int]]:
+    """Fold events that committed into a gap since the last run and forget gaps past their grace period."""
+    gaps: Dict[str, float] = getattr(state, source.gaps)
+    if not gaps:
+        return 0, set()
+    rows: List[Any] = session.exec(source.events().where(source.id_column.in_(sorted(int(gap) for gap in gaps)))).all()
+    book_ids = _fold_rows(session, state, source, rows, now)
+
+    found = {str(row[0]) for row in rows}
+    expire_before = now.timestamp() - GAP_GRACE_SECONDS
+    setattr(state, source.gaps, {gap: noticed for gap, noticed in gaps.items() if gap not in found and noticed >= expire_before})
+    session.add(state)
+    return len(rows), book_ids
+
+
+def _rescale_if_needed(session: Session, state: TrendingState, now: datetime) -> bool:
+    age_days = (_as_utc(now) - _as_utc(state.epoch)).total_seconds() / 86400
+    if age_days < RESCALE_AFTER_DAYS:
+        return False
+    session.connection().execute(
+        update(Book).values(trending_score=Book.trending_score * math.exp(-_DECAY_PER_DAY * age_days))
+    )
+    state.epoch = now
+    session.add(state)
+    return True
+
+
+def score_trending(session: Session, batch_size: int = BATCH_SIZE, now: Optional[datetime] = None) -> int:
+    """Fold reviews and order items recorded since the last run into trending scores.
+
+    Each batch commits on its own, so a long backlog neither holds one big
+    transaction nor loses progress if the job stops. Returns the events folded in.
+    """
+    now = now or datetime.now(timezone.utc)
+    state = _load_state(session, now)
+    if _rescale_if_needed(session, state, now):
+        bump_catalog_version(session)
+        session.commit()
+        publish_writes({Book: None})
+
+    folded = 0
+    for source in _SOURCES:
+        count, book_ids = _fold_gaps(session, state, source, now)
+        folded += count
+        if count:
+            bump_catalog_version(session)
+        session.commit()
+        if book_ids:
+            publish_writes({Book: book_ids})
+
+        while True:
+            count, book_ids = _fold_batch(session, state, source, None, batch_size, now, track_gaps=True)
+            if not count:
+                break
+            bump_catalog_version(session)
+            session.commit()
+            publish_writes({Book: book_ids})
+            folded += count
+            if count < batch_size:
+                break
+    return folded
+
+
+def rebuild_trending_scores(session: Session, batch_size: int = BATCH_SIZE, now: Optional[datetime] = None) -> int:
+    """Recompute every score from the events inside the horizon, in one transaction. Returns the events folded in."""
+    now = now or datetime.now(timezone.utc)
+    state = _load_state(session, now)
+    state.epoch = now
+    for source in _SOURCES:
+        setattr(state, source.watermark, 0)
+    session.connection().execute(update(Book).values(trending_score=0.0))
+
+    folded = 0
+    since = now - timedelta(days=HORIZON_DAYS)
+    for source in _SOURCES:
+        while True:
+            count, _ = _fold_batch(session, state, source, since, batch_size, now)
+            folded += count
+            if count < batch_size:
+                break
+        # Batches skip events older than `since`, so gaps come from the ids that are missing outright.
+        setattr(state, source.gaps, _trailing_gaps(session, source, getattr(state, source.watermark), now.timestamp()))
+    bump_catalog_version(session)
+    session.commit()
+    publish_writes({Book: None})
+    return folded
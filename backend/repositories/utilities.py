@@ -1,4 +1,10 @@
-from sqlmodel import Session, SQLModel, select
+import base64
+import json
+from decimal import Decimal
+from typing import Any, Callable, List, Sequence, Tuple
+
+from sqlmodel import Session, SQLModel, select, and_, or_
+from core.money import Money
 from sqlalchemy import distinct
 
 def get_unique_values(
@@ -8,7 +14,43 @@ def get_unique_values(
 ):
     field = getattr(className, fieldName)
     query = select(distinct(field)).order_by(field)
-    
+
     results = session.exec(query).all()
-    
+
     return results
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(sort_key: str, values: Sequence[Any]) -> str:
+    payload = {
+        "s": sort_key,
+        "v": [str(value) if isinstance(value, (Decimal, Money)) else value for value in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, value_types: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_key or len(payload["v"]) != len(value_types):
+            raise InvalidCursorError(f"Cursor does not belong to sort '{sort_key}'")
+        return [value_type(value) for value_type, value in zip(value_types, payload["v"])]
+    except InvalidCursorError:
+        raise
+    except Exception as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}") from e
+
+
+def keyset_predicate(sort_keys: Sequence[Tuple[Any, bool]], values: Sequence[Any]):
+    """Build the "strictly after this row" predicate for `(column, descending)` sort keys."""
+    clauses = []
+    for position, (column, descending) in enumerate(sort_keys):
+        equal_prefix = [sort_keys[i][0] == values[i] for i in range(position)]
+        beyond = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equal_prefix, beyond))
+    return or_(*clauses)
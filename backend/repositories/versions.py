@@ -0,0 +1,105 @@
+import random
+from typing import Dict, Optional, Set
+
+from sqlalchemy import bindparam, inspect, insert, update, or_
+from sqlmodel import Session, select, func
+from models import Author, Book, Category, CatalogVersion, Discount, Review
+from repositories.events import RowChanges, on_flush
+
+# Every write that can change a catalog listing bumps one of these counter rows,
+# chosen by the first book it touches, and the catalog version is their sum.
+# A single shared row would serialize every catalog and review write across
+# all workers on its row lock; with shards, writes to different books rarely meet.
+CATALOG_VERSION_SHARDS = 16
+CATALOG_SHARD_SCOPES = [f"catalog:{shard}" for shard in range(CATALOG_VERSION_SHARDS)]
+_BUMPED_IN_KEY = "catalog_version_bumped_in"
+
+
+# Run on every conditional GET, so they are built once and only the book id is bound per call.
+_catalog_version_query = select(func.coalesce(func.sum(CatalogVersion.version), 0)).where(
+    CatalogVersion.scope.in_(CATALOG_SHARD_SCOPES)
+)
+_book_version_query = select(Book.content_version).where(Book.id == bindparam("book_id"))
+
+
+def catalog_version(session: Session) -> int:
+    return int(session.exec(_catalog_version_query).one())
+
+
+def book_version(session: Session, book_id: int) -> Optional[int]:
+    """The book's content version, or None when the book does not exist."""
+    return session.exec(_book_version_query, params={"book_id": book_id}).first()
+
+
+def bump_catalog_version(session: Session, book_id: Optional[int] = None) -> None:
+    """Bump the catalog version once per transaction, on the shard for `book_id` (any shard when None).
+
+    Later flushes of the same transaction skip the bump: one change to the sum
+    is enough, and locking a second shard could deadlock against a writer
+    that took the two in the other order.
+    """
+    connection = session.connection()
+    # A bump inside a savepoint is undone with it, so key on the innermost transaction.
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    if session.info.get(_BUMPED_IN_KEY) is transaction:
+        return
+    shard = book_id % CATALOG_VERSION_SHARDS if book_id is not None else random.randrange(CATALOG_VERSION_SHARDS)
+    scope = CATALOG_SHARD_SCOPES[shard]
+
+    bumped = connection.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.scope == scope)
+        .values(version=CatalogVersion.version + 1)
+    )
+    if bumped.rowcount == 0:
+        connection.execute(insert(CatalogVersion).values(scope=scope, version=1))
+    session.info[_BUMPED_IN_KEY] = transaction
+
+
+def _bump_book_versions(
+    session: Session,
+    book_ids: Optional[Set[int]] = None,
+    category_ids: Optional[Set[int]] = None,
+    author_ids: Optional[Set[int]] = None
+) -> None:
+    """Bump the content version of the given books (every book when all arguments are None)."""
+    statement = update(Book).values(content_version=Book.content_version + 1)
+    if book_ids is not None or category_ids is not None or author_ids is not None:
+        conditions = []
+        if book_ids:
+            conditions.append(Book.id.in_(sorted(book_ids)))
+        if category_ids:
+            conditions.append(Book.category_id.in_(sorted(category_ids)))
+        if author_ids:
+            conditions.append(Book.author_id.in_(sorted(author_ids)))
+        if not conditions:
+            return
+        statement = statement.where(or_(*conditions))
+    session.connection().execute(statement)
+
+
+def _touched_ids(changes: Dict[type, RowChanges]) -> Dict[type, Set[int]]:
+    empty = RowChanges([], [], [])
+    book_ids = {book.id for book in changes.get(Book, empty).all()}
+    for model in (Discount, Review):
+        for row in changes.get(model, empty).all():
+            book_ids.update(inspect(row).attrs.book_id.history.deleted or ())
+            book_ids.add(row.book_id)
+    book_ids.discard(None)
+    return {
+        Book: book_ids,
+        Category: {category.id for category in changes.get(Category, empty).dirty},
+        Author: {author.id for author in changes.get(Author, empty).dirty},
+    }
+
+
+@on_flush(Book, Discount, Review, Category, Author)
+def _bump_versions(session: Session, changes: Optional[Dict[type, RowChanges]]) -> None:
+    if changes is None:
+        bump_catalog_version(session)
+        _bump_book_versions(session)
+    else:
+        touched = _touched_ids(changes)
+        shard_keys = touched[Book] or touched[Category] or touched[Author]
+        bump_catalog_version(session, min(shard_keys) if shard_keys else None)
+        _bump_book_versions(session, touched[Book], touched[Category], touched[Author])
@@ -13,6 +13,9 @@ from models.books import Book, BookCreate
 from repositories.users import create_user
 from models.discounts import Discount, DiscountCreate
 from models.reviews import Review, ReviewCreate  # Import the new models
+from repositories.pricing import refresh_book_pricing
+from repositories.ratings import rebuild_rating_aggregates
+from repositories.search import refresh_search_vectors
 random.seed("2112")
 fake = Faker()
 
@@ -173,7 +176,7 @@ def generate_fake_data(
     # Create and persist discounts - directly create Discount objects
     for _ in range(min(num_discounts, len(books))):
         book = random.choice(books)
-        discount = gen_discount(book.id, book.book_price)
+        discount = gen_discount(book.id, book.book_price.to_decimal())
         session.add(discount)
     
     session.commit()
@@ -187,6 +190,18 @@ def generate_fake_data(
         session.add(review)
     
     session.commit()
+
+    print("Refreshing book pricing projection...")
+    refresh_book_pricing(session)
+    session.commit()
+
+    print("Rebuilding book rating aggregates...")
+    rebuild_rating_aggregates(session)
+    session.commit()
+
+    print("Rebuilding book search vectors...")
+    refresh_search_vectors(session)
+    session.commit()
     
     print("Data generation completed successfully!")
 
@@ -6,6 +6,10 @@ class SuccessMessages:
 class ErrorMessages:
   failed_to_create_review ="Failed to create review"
   invalid_request ="Invalid Request"
+  invalid_cursor = "Invalid or expired paging cursor"
+  blank_search_query = "q must contain at least one non-blank character"
+  invalid_book_ids = "ids must be a comma-separated list of positive book ids"
+  too_many_book_ids = "Too many book ids requested"
   invalid_order = "Invalid order"
   invalid_refresh_token = "invalid_refresh_token"
   incorrect_email_or_password= "Incorrect email or password" 
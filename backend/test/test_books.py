@@ -1,8 +1,10 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import SQLModel, create_engine, Session, delete
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel, create_engine, Session, delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from decimal import Decimal
-from datetime import date, timedelta, datetime
+from datetime import date, timedelta, datetime, timezone
 
 from models.users import User
 from models.books import Book, SortByOptions, FeaturedSortOptions
@@ -11,7 +13,9 @@ from models.authors import Author
 from models.reviews import Review
 from models.discounts import Discount
 from core.config import settings
-from controllers.deps import get_db
+from core.money import Money
+from shared.const_var import ErrorMessages
+from controllers.deps import get_db, get_async_db
 from main import app
 
 TEST_DATABASE_URL = "sqlite:///./test.db"
@@ -26,10 +30,16 @@ except Exception:
     TEST_DATABASE_URL = "sqlite:///./test.db"
     engine = create_engine(TEST_DATABASE_URL, echo=False, connect_args={"check_same_thread": False})
 
+async_engine = create_async_engine(TEST_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://"), echo=False)
+
 def get_session_override():
     with Session(engine) as session:
         yield session
 
+async def get_async_session_override():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
 @pytest.fixture(scope="session", autouse=True)
 def db_setup_and_teardown():
     SQLModel.metadata.create_all(engine)
@@ -112,6 +122,7 @@ def create_test_data():
 def client():
     with TestClient(app) as c:
         c.app.dependency_overrides[get_db] = get_session_override
+        c.app.dependency_overrides[get_async_db] = get_async_session_override
         yield c
 
 def test_get_book(client):
@@ -163,7 +174,8 @@ def test_list_most_discounted_books(client):
 def test_list_recommended_books(client):
     res_rec = client.get("/books/recommended")
     assert res_rec.status_code == 200
-    expected_recommended = [3, 5, 1, 6, 7, 11, 2, 12]
+    # Bayesian scores: two 5-star reviews outrank a single one, and 3-star ties fall back to price.
+    expected_recommended = [3, 1, 5, 7, 6, 11, 2, 12]
     assert [b["id"] for b in res_rec.json()] == expected_recommended
 
     
@@ -210,3 +222,843 @@ def test_list_books_popular_invalid_top_k(client):
     res = client.get("/books/popular?top_k=-1")
     assert res.status_code == 422
 
+
+def test_discount_write_refreshes_pricing(client):
+    with Session(engine) as session:
+        session.add(Discount(book_id=9, discount_price=Decimal("5.00"), discount_start_date=date.today(), discount_end_date=None))
+        session.commit()
+
+    res = client.get("/book/9")
+    assert res.status_code == 200
+    assert Decimal(str(res.json()["discount_price"])) == Decimal("5.00")
+
+    res = client.get("/books/top-discounted?top_k=1")
+    assert [b["id"] for b in res.json()] == [5]
+    res = client.get("/books?sort_by=price_asc&page_size=5")
+    assert [b["id"] for b in res.json()["data"]][0] == 9
+
+def test_discount_schedule_reprices_only_books_in_transition(client, monkeypatch):
+    import repositories.pricing
+    from sqlalchemy import event
+    from models import BookPricing
+    from repositories.pricing import ensure_pricing_current
+
+    today = date.today()
+    published = []
+    monkeypatch.setattr(repositories.pricing, "publish_writes", published.append)
+    with Session(engine) as session:
+        session.add(Discount(book_id=9, discount_price=Decimal("5.00"), discount_start_date=today + timedelta(days=2), discount_end_date=None))
+        session.commit()
+        ensure_pricing_current(session, today)
+
+        def pricing_on(day):
+            ensure_pricing_current(session, day)
+            session.expire_all()
+            rows = session.exec(select(BookPricing)).all()
+            repriced = {row.book_id for row in rows if row.priced_on == day}
+            return {row.book_id: row.effective_price for row in rows}, repriced
+
+        prices, repriced = pricing_on(today + timedelta(days=1))
+        assert published.pop() == {BookPricing: {2}} and repriced == {2}
+        assert prices[2] == Money.of("40.00")
+
+        prices, repriced = pricing_on(today + timedelta(days=2))
+        assert published.pop() == {BookPricing: {1, 5, 9, 10}} and repriced == {1, 5, 9, 10}
+        assert (prices[1], prices[9], prices[10]) == (Money.of("20.00"), Money.of("5.00"), Money.of("70.00"))
+
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            ensure_pricing_current(session, today + timedelta(days=2))
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert statements == [] and published == []
+
+def test_rollover_picks_up_discounts_written_by_other_processes(client):
+    from sqlalchemy import insert
+    from models import BookPricing
+    from repositories.pricing import ensure_pricing_current
+
+    today = date.today()
+    with Session(engine) as session:
+        ensure_pricing_current(session, today)
+        # Written on a bare connection, as another worker would: no commit hook reaches this process.
+        with engine.begin() as connection:
+            connection.execute(insert(Discount).values(
+                book_id=9, discount_price=Decimal("5.00"), discount_start_date=today + timedelta(days=1), discount_end_date=None
+            ))
+
+        ensure_pricing_current(session, today + timedelta(days=1))
+        pricing = session.get(BookPricing, 9)
+        assert (pricing.effective_price, pricing.priced_on) == (Money.of("5.00"), today + timedelta(days=1))
+        # Book 4 has no discounts and was not re-evaluated.
+        assert session.get(BookPricing, 4).priced_on == today
+
+def test_reads_leave_the_price_rollover_to_the_midnight_task(client):
+    from sqlalchemy import update
+    from core.replicas import PIN_COOKIE
+    from models import BookPricing
+    from repositories.discount_schedule import discount_schedule
+
+    yesterday = date.today() - timedelta(days=1)
+    # As the projection stands between midnight and the rollover task.
+    with engine.begin() as connection:
+        connection.execute(update(BookPricing).values(priced_on=yesterday))
+    discount_schedule.mark_dirty(None)
+
+    res = client.get("/books?page_size=20")
+    assert res.status_code == 200
+    assert PIN_COOKIE not in res.cookies
+    with Session(engine) as session:
+        assert set(session.exec(select(BookPricing.priced_on)).all()) == {yesterday}
+
+def test_trending_scores_decay_and_fold_in_new_events(client):
+    from models import Order, OrderItem
+    from repositories.trending import rebuild_trending_scores, score_trending
+
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        session.add(User(id=1, first_name="Trend", last_name="Setter", email="trend@test.com", password="x"))
+        session.add(Order(id=1, user_id=1, order_date=now, order_amount=Decimal("15.00")))
+        session.add(Order(id=2, user_id=1, order_date=now - timedelta(days=14), order_amount=Decimal("70.00")))
+        session.add_all([
+            OrderItem(id=1, order_id=1, book_id=9, quantity=1, price=Decimal("15.00")),
+            OrderItem(id=2, order_id=2, book_id=12, quantity=2, price=Decimal("35.00")),
+        ])
+        session.commit()
+        try:
+            assert rebuild_trending_scores(session, batch_size=4) == 13
+            # A fresh copy ordered today outweighs two copies ordered two half-lives ago.
+            expected = [9, 7, 12, 3, 1, 5, 6, 11, 2, 4, 8, 10]
+            res = client.get("/books?sort_by=trending&page_size=20").json()
+            assert [b["id"] for b in res["data"]] == expected
+            assert [b["id"] for b in client.get("/books/trending?top_k=5").json()] == expected[:5]
+
+            session.add(Order(id=3, user_id=1, order_date=now, order_amount=Decimal("35.00")))
+            session.add(OrderItem(id=3, order_id=3, book_id=11, quantity=1, price=Decimal("35.00")))
+            session.commit()
+            assert score_trending(session) == 1
+            assert score_trending(session) == 0
+            assert [b["id"] for b in client.get("/books/trending?top_k=3").json()] == [11, 9, 7]
+        finally:
+            session.exec(delete(OrderItem))
+            session.exec(delete(Order))
+            session.exec(delete(User))
+            session.commit()
+
+def test_trending_folds_events_that_commit_behind_the_watermark(client):
+    from models import Order, OrderItem, TrendingState
+    from repositories.trending import GAP_GRACE_SECONDS, rebuild_trending_scores, score_trending
+
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        session.add(User(id=1, first_name="Trend", last_name="Setter", email="trend@test.com", password="x"))
+        session.add(Order(id=1, user_id=1, order_date=now, order_amount=Decimal("50.00")))
+        session.commit()
+        try:
+            rebuild_trending_scores(session, now=now)
+            # Item 4 is inserted by a transaction that commits after item 5's, so the watermark passes it first.
+            session.add(OrderItem(id=5, order_id=1, book_id=9, quantity=1, price=Decimal("15.00")))
+            session.commit()
+            assert score_trending(session, now=now) == 1
+            state = session.get(TrendingState, "trending")
+            assert (state.last_order_item_id, set(state.order_item_id_gaps)) == (5, {"1", "2", "3", "4"})
+
+            score_before = session.get(Book, 11).trending_score
+            session.add(OrderItem(id=4, order_id=1, book_id=11, quantity=1, price=Decimal("35.00")))
+            session.commit()
+            assert score_trending(session, now=now) == 1
+            assert session.get(Book, 11).trending_score > score_before
+            assert set(session.get(TrendingState, "trending").order_item_id_gaps) == {"1", "2", "3"}
+
+            # The other ids never commit; they are dropped once the grace period runs out.
+            assert score_trending(session, now=now + timedelta(seconds=GAP_GRACE_SECONDS + 1)) == 0
+            assert session.get(TrendingState, "trending").order_item_id_gaps == {}
+        finally:
+            session.exec(delete(OrderItem))
+            session.exec(delete(Order))
+            session.exec(delete(User))
+            session.commit()
+
+def test_trending_weighs_future_dated_reviews_as_of_now():
+    from repositories.trending import rebuild_trending_scores, score_trending
+
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        rebuild_trending_scores(session, now=now)
+        session.add_all([
+            Review(book_id=4, rating_start=5, review_title="Today", review_date=now),
+            Review(book_id=8, rating_start=5, review_title="From the future", review_date=now + timedelta(days=365 * 50)),
+        ])
+        session.commit()
+        # Unclamped, the far-future review overflows math.exp and the batch never commits.
+        assert score_trending(session, now=now) == 2
+        assert session.get(Book, 8).trending_score == pytest.approx(session.get(Book, 4).trending_score)
+
+@pytest.mark.parametrize("catalog_engine", ["sql", "snapshot"])
+@pytest.mark.parametrize("sort_by", ["on_sale", "popularity", "price_asc", "price_desc", "trending", "top_rated"])
+def test_list_books_cursor_matches_offset(client, monkeypatch, sort_by, catalog_engine):
+    monkeypatch.setattr(settings, "CATALOG_ENGINE", catalog_engine)
+    full = client.get(f"/books?sort_by={sort_by}&page_size=20").json()
+    expected_ids = [b["id"] for b in full["data"]]
+
+    seen_ids = []
+    res = client.get(f"/books?sort_by={sort_by}&page_size=5").json()
+    seen_ids.extend(b["id"] for b in res["data"])
+    while res["paging"]["next_cursor"]:
+        res = client.get(f"/books?sort_by={sort_by}&page_size=5&cursor={res['paging']['next_cursor']}").json()
+        seen_ids.extend(b["id"] for b in res["data"])
+
+    assert seen_ids == expected_ids
+    assert res["paging"]["has_next"] is False
+
+def test_list_books_invalid_cursor(client):
+    res = client.get("/books?cursor=not-a-cursor")
+    assert res.status_code == 400
+
+    first_page = client.get("/books?sort_by=price_asc&page_size=5").json()
+    res = client.get(f"/books?sort_by=price_desc&cursor={first_page['paging']['next_cursor']}")
+    assert res.status_code == 400
+
+def test_list_books_count_modes(client):
+    res = client.get("/books?category=Test Fiction&count_mode=none&page_size=5").json()
+    assert res["paging"]["total_items"] is None
+    assert res["paging"]["total_pages"] is None
+    assert res["paging"]["has_next"] is True
+
+    res = client.get("/books?category=Test Fiction&count_mode=estimate&page_size=5").json()
+    assert res["paging"]["total_items"] == 6
+
+def test_list_books_count_cache_invalidated_by_writes(client):
+    assert client.get("/books?category=Test Sci-Fi").json()["paging"]["total_items"] == 2
+
+    with Session(engine) as session:
+        session.add(Book(id=13, book_title="Nu Book", book_price=Decimal("12.00"), category_id=3, author_id=3))
+        session.commit()
+
+    assert client.get("/books?category=Test Sci-Fi").json()["paging"]["total_items"] == 3
+
+@pytest.mark.parametrize("params", [
+    "sort_by=on_sale",
+    "sort_by=popularity",
+    "sort_by=price_asc",
+    "sort_by=price_desc&min_rating=4",
+    "sort_by=top_rated",
+    "category=Test Fiction&sort_by=price_asc",
+    "author=Alice Test&page=2&page_size=5",
+])
+def test_snapshot_engine_matches_sql(client, monkeypatch, params):
+    expected = client.get(f"/books?{params}").json()
+
+    monkeypatch.setattr(settings, "CATALOG_ENGINE", "snapshot")
+    actual = client.get(f"/books?{params}").json()
+
+    assert [b["id"] for b in actual["data"]] == [b["id"] for b in expected["data"]]
+    assert actual["paging"] == expected["paging"]
+
+def test_snapshot_engine_sees_new_reviews(client, monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_ENGINE", "snapshot")
+    assert client.get("/books?sort_by=popularity&page_size=5").json()["data"][0]["id"] == 1
+
+    with Session(engine) as session:
+        session.add_all([
+            Review(book_id=10, rating_start=5, review_title=f"Fan {i}", review_date=datetime.now())
+            for i in range(3)
+        ])
+        session.commit()
+
+    assert client.get("/books?sort_by=popularity&page_size=5").json()["data"][0]["id"] == 10
+
+def test_snapshot_engine_reloads_after_writes_from_other_processes(client, monkeypatch):
+    from sqlalchemy import update
+    from repositories.catalog_snapshot import snapshot
+    from repositories.versions import bump_catalog_version
+
+    monkeypatch.setattr(settings, "CATALOG_ENGINE", "snapshot")
+    monkeypatch.setattr(snapshot, "check_seconds", 0)
+    assert client.get("/books?sort_by=popularity&page_size=5").json()["data"][0]["id"] == 1
+
+    # What a job or another worker does: the rows and the version change, but no commit hook runs here.
+    with Session(engine) as other_process:
+        other_process.connection().execute(update(Book).where(Book.id == 10).values(review_count=50))
+        bump_catalog_version(other_process, 10)
+        other_process.commit()
+
+    assert client.get("/books?sort_by=popularity&page_size=5").json()["data"][0]["id"] == 10
+
+def test_leaderboards_follow_review_and_discount_writes(client):
+    assert client.get("/books/popular?top_k=1").json()[0]["id"] == 1
+    assert client.get("/books/top-discounted?top_k=1").json()[0]["id"] == 5
+
+    with Session(engine) as session:
+        session.add_all([
+            Review(book_id=12, rating_start=5, review_title=f"Redeemed {i}", review_date=datetime.now())
+            for i in range(3)
+        ])
+        session.add(Discount(book_id=2, discount_price=Decimal("10.00"), discount_start_date=date.today(), discount_end_date=None))
+        session.commit()
+
+    assert client.get("/books/popular?top_k=1").json()[0]["id"] == 12
+    assert [b["id"] for b in client.get("/books/top-discounted?top_k=2").json()] == [2, 5]
+
+def test_pending_refresh_remarks_writes_that_land_mid_query():
+    from repositories.refresh import PendingRefresh
+
+    pending = PendingRefresh()
+    reload = pending.claim(reload=True)
+    pending.mark({4})
+    assert pending.settle(reload, loaded=True)
+    assert not pending.stale and pending.dirty_ids == {4}
+
+    first = pending.claim()
+    pending.mark({4, 5})
+    second = pending.claim()
+    assert pending.settle(second, loaded=True)
+    # The first reader's rows for 4 may be older than the second's, so 4 and 5 are read again.
+    assert pending.settle(first, loaded=True)
+    assert pending.dirty_ids == {4, 5}
+
+    voided = pending.claim()
+    pending.mark(None)
+    assert not pending.settle(voided, loaded=True)
+    assert pending.stale and not pending.dirty_ids
+
+def test_concurrent_async_reads_refill_cold_caches(client, monkeypatch):
+    import asyncio
+    import threading
+    from repositories import aio
+    from repositories.catalog_snapshot import snapshot
+    from repositories.discount_schedule import discount_schedule
+    from repositories.leaderboards import leaderboards
+
+    monkeypatch.setattr(settings, "CATALOG_ENGINE", "snapshot")
+    for cache in (leaderboards, snapshot, discount_schedule):
+        cache.mark_dirty(None)
+
+    # Both requests run on one event loop; a cache holding a thread lock across a query would hang it.
+    async def read_concurrently():
+        loop_engine = create_async_engine(async_engine.url)
+        try:
+            async with AsyncSession(loop_engine) as first, AsyncSession(loop_engine) as second, \
+                    AsyncSession(loop_engine) as third, AsyncSession(loop_engine) as fourth:
+                return await asyncio.gather(
+                    aio.get_top_k_featured(first, sort_by=FeaturedSortOptions.POPULAR, k=3),
+                    aio.get_top_k_featured(second, sort_by=FeaturedSortOptions.POPULAR, k=3),
+                    aio.get_books(third, page_size=5, sort_by=SortByOptions.popularity),
+                    aio.get_books(fourth, page_size=5, sort_by=SortByOptions.popularity),
+                )
+        finally:
+            await loop_engine.dispose()
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(asyncio.run(read_concurrently())), daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive(), "concurrent reads of cold caches never returned"
+
+    popular_a, popular_b, page_a, page_b = results[0]
+    assert [b.id for b in popular_a] == [b.id for b in popular_b] == [1, 3, 7]
+    assert [b.id for b in page_a.data] == [b.id for b in page_b.data] == [1, 3, 7, 6, 5]
+
+@pytest.mark.parametrize("params,expected_ids", [
+    ("category_id=1", [5, 1, 7, 9, 11, 2]),
+    ("author_id=1&sort_by=price_asc", [1, 9, 5, 11, 2]),
+    ("category_id=1&category=Test Fiction", [5, 1, 7, 9, 11, 2]),
+    ("category_id=2&category=Test Fiction", []),
+])
+def test_list_books_id_filters(client, params, expected_ids):
+    res = client.get(f"/books?{params}&page_size=20")
+    assert res.status_code == 200
+    assert [b["id"] for b in res.json()["data"]] == expected_ids
+
+def test_renamed_category_filter_is_refreshed(client):
+    with Session(engine) as session:
+        category = session.get(Category, 3)
+        category.category_name = "Test Space Opera"
+        session.add(category)
+        session.commit()
+
+    assert [b["id"] for b in client.get("/books?category=Test Space Opera&sort_by=price_asc").json()["data"]] == [8, 10]
+    assert client.get("/books?category=Test Sci-Fi").json()["data"] == []
+    assert client.get("/book/8").json()["category_name"] == "Test Space Opera"
+
+@pytest.mark.parametrize("q,expected_ids", [
+    ("alpha", [1]),
+    ("ALPHA alice", [1]),
+    ("charlie", [7, 10, 8]),
+    ("alpha charlie", []),
+    ("100%", []),
+])
+def test_search_books(client, q, expected_ids):
+    res = client.get("/books/search", params={"q": q, "page_size": 20})
+    assert res.status_code == 200
+    data = res.json()
+    assert [b["id"] for b in data["data"]] == expected_ids
+    assert data["paging"]["total_items"] == len(expected_ids)
+
+def test_search_books_paging_and_validation(client):
+    first = client.get("/books/search?q=book&page_size=5").json()
+    second = client.get("/books/search?q=book&page_size=5&page=2").json()
+    assert first["paging"]["total_items"] == 12
+    assert first["paging"]["has_next"] is True
+    assert not {b["id"] for b in first["data"]} & {b["id"] for b in second["data"]}
+    # Equal relevance: popularity and discount decide, reviewed, deeply discounted books first.
+    assert [b["id"] for b in first["data"]][:2] == [1, 5]
+
+    assert client.get("/books/search").status_code == 422
+    assert client.get("/books/search?q=").status_code == 422
+    blank = client.get("/books/search?q=%20%20")
+    assert blank.status_code == 400
+    assert blank.json()["detail"] == ErrorMessages.blank_search_query
+
+@pytest.mark.parametrize("params,expected", [
+    ("prefix=test&kind=author", [("author", "Alice Test", 5), ("author", "Bob Test", 4), ("author", "Charlie Test", 2)]),
+    ("prefix=TEST&limit=3", [("category", "Test Fiction", 7), ("author", "Alice Test", 5), ("author", "Bob Test", 4)]),
+    ("prefix=alp&kind=title", [("title", "Alpha Book", 2)]),
+    ("prefix=b&kind=title&limit=3", [("title", "Alpha Book", 2), ("title", "Eta Book", 2), ("title", "Gamma Book", 2)]),
+    ("prefix=sci&kind=category", [("category", "Test Sci-Fi", 0)]),
+    ("prefix=nothing", []),
+])
+def test_suggest(client, params, expected):
+    res = client.get(f"/suggest?{params}")
+    assert res.status_code == 200
+    assert [(s["kind"], s["label"], s["weight"]) for s in res.json()] == expected
+
+def test_suggest_follows_writes(client):
+    assert client.get("/suggest?prefix=te&kind=author&limit=1").json()[0]["label"] == "Alice Test"
+
+    with Session(engine) as session:
+        session.add_all([
+            Review(book_id=12, rating_start=5, review_title=f"Redeemed {i}", review_date=datetime.now())
+            for i in range(3)
+        ])
+        author = session.get(Author, 3)
+        author.author_name = "Chuck Test"
+        session.add(author)
+        session.commit()
+
+    assert client.get("/suggest?prefix=te&kind=author&limit=1").json()[0]["label"] == "Bob Test"
+    assert client.get("/suggest?prefix=mu&kind=title").json()[0]["weight"] == 4
+    assert [s["label"] for s in client.get("/suggest?prefix=chu").json()] == ["Chuck Test"]
+    assert client.get("/suggest?prefix=charlie").json() == []
+    assert client.get("/suggest?prefix=").status_code == 422
+
+def test_suggest_reloads_after_writes_from_other_processes(client, monkeypatch):
+    from sqlalchemy import update
+    from repositories.suggestions import suggestion_index
+    from repositories.versions import bump_catalog_version
+
+    monkeypatch.setattr(suggestion_index, "check_seconds", None)
+    assert client.get("/suggest?prefix=mu").json()[0]["weight"] == 1
+
+    # Review writes only move weights, so the short-prefix memo survives them until the version check.
+    with Session(engine) as session:
+        session.add(Review(book_id=12, rating_start=5, review_title="Redeemed", review_date=datetime.now()))
+        session.commit()
+    assert client.get("/suggest?prefix=mu").json()[0]["weight"] == 1
+    assert client.get("/suggest?prefix=mu b").json()[0]["weight"] == 2
+
+    # What a job or another worker does: the rows and the version change, but no commit hook runs here.
+    with Session(engine) as other_process:
+        other_process.connection().execute(update(Book).where(Book.id == 12).values(book_title="Nu Book"))
+        bump_catalog_version(other_process, 12)
+        other_process.commit()
+    assert client.get("/suggest?prefix=nu").json() == []
+
+    monkeypatch.setattr(suggestion_index, "check_seconds", 0)
+    assert [(s["label"], s["weight"]) for s in client.get("/suggest?prefix=nu").json()] == [("Nu Book", 2)]
+    assert client.get("/suggest?prefix=mu").json() == []
+
+def _facet_summary(facets):
+    return (
+        facets["total_items"],
+        [(f["name"], f["count"]) for f in facets["categories"]],
+        [(f["name"], f["count"]) for f in facets["authors"]],
+        [f["count"] for f in facets["ratings"]],
+    )
+
+@pytest.mark.parametrize("params,expected", [
+    ("", (12, [("Test Fiction", 6), ("Test Non-Fiction", 4), ("Test Sci-Fi", 2)],
+          [("Alice Test", 5), ("Bob Test", 4), ("Charlie Test", 3)], [8, 7, 7, 5, 2])),
+    ("category_id=1", (6, [("Test Fiction", 6)], [("Alice Test", 5), ("Charlie Test", 1)], [5, 5, 5, 3, 1])),
+    ("min_rating=4", (5, [("Test Fiction", 3), ("Test Non-Fiction", 2)],
+                      [("Alice Test", 2), ("Bob Test", 2), ("Charlie Test", 1)], [5, 5, 5, 5, 2])),
+    ("author=Nobody", (0, [], [], [0, 0, 0, 0, 0])),
+])
+def test_list_book_facets(client, params, expected):
+    res = client.get(f"/books/facets?{params}")
+    assert res.status_code == 200
+    assert _facet_summary(res.json()) == expected
+
+def test_book_facets_follow_writes(client):
+    assert client.get("/books/facets?min_rating=5").json()["total_items"] == 2
+
+    with Session(engine) as session:
+        session.add(Review(book_id=9, rating_start=5, review_title="Great B9", review_date=datetime.now()))
+        session.commit()
+
+    facets = client.get("/books/facets?min_rating=5").json()
+    assert facets["total_items"] == 3
+    assert client.get("/books?min_rating=5").json()["paging"]["total_items"] == 3
+
+def test_search_counts_do_not_evict_listing_totals(client, monkeypatch):
+    from repositories import books as book_repository
+    from repositories.books import listing_filter_key
+
+    monkeypatch.setattr(book_repository._count_cache, "max_entries", 1)
+    assert client.get("/books?page_size=5").json()["paging"]["total_items"] == 12
+    for q in ("alpha", "beta", "gamma"):
+        assert client.get(f"/books/search?q={q}").status_code == 200
+    assert book_repository._count_cache.get(listing_filter_key(None, None, None)) == 12
+
+def test_book_facet_totals_match_the_listing(client):
+    from sqlalchemy import insert
+
+    # A book with no pricing row yet (written on a bare connection, so no flush hook prices it) is not listed.
+    with engine.begin() as connection:
+        connection.execute(insert(Book).values(
+            id=13, book_title="Nu Book", book_price=Decimal("10.00"), category_id=3, author_id=1
+        ))
+
+    facets = client.get("/books/facets").json()
+    listing = client.get("/books?page_size=20").json()
+    assert facets["total_items"] == listing["paging"]["total_items"] == len(listing["data"]) == 12
+
+def test_get_book_batch(client):
+    res = client.get("/books/batch?ids=5,999,1,5,3")
+    assert res.status_code == 200
+    data = res.json()
+    assert [b["id"] for b in data["data"]] == [5, 1, 3]
+    assert data["missing_ids"] == [999]
+    assert [b["discount_price"] for b in data["data"]] == ["30.00", "10.00", "25.00"]
+    assert data["data"][1]["category_name"] == "Test Fiction"
+    assert data["data"][2]["author_name"] == "Bob Test"
+    assert all(b["localize_price"] is not None for b in data["data"])
+
+    res = client.post("/books/batch", json={"ids": [12, 2]})
+    assert res.status_code == 200
+    assert [b["id"] for b in res.json()["data"]] == [12, 2]
+
+    assert client.get("/books/batch?ids=1,abc").status_code == 400
+    assert client.get("/books/batch?ids=0").status_code == 400
+    assert client.post("/books/batch", json={"ids": []}).status_code == 400
+    assert client.post("/books/batch", json={"ids": list(range(1, settings.BOOK_BATCH_MAX_IDS + 2))}).status_code == 400
+
+@pytest.mark.parametrize("country_code", ["VN", "th", "ZZ", None])
+def test_localized_prices_match_per_price_conversion(client, country_code):
+    from core.geoip import get_country_code
+    from core.localization import convert_price, resolve_currency
+    from controllers.books import get_price_localizer
+
+    client.app.dependency_overrides[get_country_code] = lambda: country_code
+    try:
+        first = client.get("/books?page_size=25").json()["data"]
+        misses = get_price_localizer().memo_info().misses
+        second = client.get("/books?page_size=25").json()["data"]
+    finally:
+        del client.app.dependency_overrides[get_country_code]
+
+    rate, symbol = resolve_currency(country_code, settings.CURRENCY_RATES_DICT)
+    for book in first:
+        assert book["price_symbol"] == symbol
+        assert Decimal(book["localize_price"]) == convert_price(Decimal(book["book_price"]), rate)
+        assert Decimal(book["localize_discount_price"]) == convert_price(Decimal(book["discount_price"]), rate)
+    assert second == first
+    assert get_price_localizer().memo_info().misses == misses
+
+@pytest.mark.parametrize("rate", ["1.0", "25985", "33.6", "1.315", "0.0371"])
+def test_money_conversion_matches_decimal_rounding(rate):
+    from core.localization import convert_price
+    from core.money import ExchangeRate
+
+    exchange = ExchangeRate.of(Decimal(rate))
+    for text in ["0.00", "0.01", "0.05", "9.99", "12.35", "15.00", "999.99", "-3.45"]:
+        assert str(Money.of(text).convert(exchange)) == str(convert_price(Decimal(text), Decimal(rate)))
+
+def test_money_parses_and_formats_amounts():
+    assert Money.of("12.345").cents == 1235
+    assert Money.of(12.5) == Money.of(Decimal("12.50")) == Money(1250)
+    assert Money.of(3) * 2 + Money.of("0.10") == Money.of("6.10")
+    assert str(Money(-5)) == "-0.05" and str(Money(700)) == "7.00"
+    assert sum([Money(1), Money(2)], Money.zero()) == Money(3)
+    with pytest.raises(ValueError):
+        Money.of("twelve")
+
+def test_create_order_totals_lines_in_cents(client):
+    from models import Order, OrderItem
+
+    with Session(engine) as session:
+        session.add(User(id=1, first_name="Order", last_name="Placer", email="order@test.com", password="x"))
+        session.commit()
+    try:
+        items = [
+            {"book_id": 1, "quantity": 3, "price": "10.00"},
+            {"book_id": 9, "quantity": 2, "price": 15.0},
+            {"book_id": 11, "quantity": 1, "price": "35.00"},
+        ]
+        res = client.post("/order", json={"user_id": 1, "items": items})
+        assert res.status_code == 201
+
+        res = client.post("/order", json={"user_id": 1, "items": [{"book_id": 2, "quantity": 1, "price": "49.99"}]})
+        assert res.status_code == 400
+        assert res.json()["detail"]["errors"][0]["error"] == "Invalid price: expected 50.00 or 50.00, got 49.99"
+
+        with Session(engine) as session:
+            orders = session.exec(select(Order)).all()
+            assert [order.order_amount for order in orders] == [Money.of("95.00")]
+            assert sorted(item.price for item in session.exec(select(OrderItem)).all()) == [
+                Money.of("10.00"), Money.of("15.00"), Money.of("35.00")
+            ]
+    finally:
+        with Session(engine) as session:
+            session.exec(delete(OrderItem))
+            session.exec(delete(Order))
+            session.exec(delete(User))
+            session.commit()
+
+@pytest.mark.parametrize("url", [
+    "/books?page_size=20&sort_by=popularity",
+    "/books/top-discounted?top_k=5",
+    "/books/recommended?top_k=5",
+    "/books/trending?top_k=5",
+    "/books/search?q=book&page_size=5",
+    "/books/batch?ids=3,1,999",
+])
+def test_fast_serialization_matches_standard(client, monkeypatch, url):
+    fast = client.get(url)
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION_ROUTES", [])
+    standard = client.get(url)
+    assert fast.status_code == standard.status_code == 200
+    assert fast.headers["content-type"] == standard.headers["content-type"]
+    assert fast.json() == standard.json()
+
+def test_fast_serialization_applies_response_model_field_settings():
+    from fastapi import FastAPI
+    from pydantic import BaseModel, Field
+    from core.serialization import FastJSONResponse
+
+    class Line(BaseModel):
+        price: Money
+        cost: Money = Field(exclude=True)
+
+    class Page(BaseModel):
+        total_items: int = Field(serialization_alias="totalItems")
+        lines: list[Line]
+        internal_note: str = Field(default="", exclude=True)
+
+    content = Page(total_items=1, lines=[Line(price=Money.of("9.99"), cost=Money.of("4.00"))], internal_note="secret")
+    app = FastAPI()
+
+    @app.get("/standard", response_model=Page)
+    def standard():
+        return content
+
+    @app.get("/fast", response_model=Page)
+    def fast():
+        return FastJSONResponse(content)
+
+    with TestClient(app) as c:
+        fast_body, standard_body = c.get("/fast").json(), c.get("/standard").json()
+    assert fast_body == standard_body == {"totalItems": 1, "lines": [{"price": "9.99"}]}
+
+def test_list_books_returns_304_before_querying(client, monkeypatch):
+    from repositories import aio
+
+    etag = client.get("/books?page_size=5").headers["etag"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("listing query ran on a revalidation")
+    monkeypatch.setattr(aio, "get_books", fail)
+    res = client.get("/books?page_size=5", headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert res.status_code == 304
+    assert res.headers["etag"] == etag
+
+def test_list_books_etag_tracks_writes_and_country(client):
+    from core.geoip import get_country_code
+
+    etag = client.get("/books?page_size=5").headers["etag"]
+    assert client.get("/books?page_size=15").headers["etag"] != etag
+
+    client.app.dependency_overrides[get_country_code] = lambda: "GB"
+    try:
+        assert client.get("/books?page_size=5", headers={"If-None-Match": etag}).status_code == 200
+    finally:
+        del client.app.dependency_overrides[get_country_code]
+
+    with Session(engine) as session:
+        session.add(Discount(book_id=9, discount_price=Decimal("5.00"), discount_start_date=date.today(), discount_end_date=None))
+        session.commit()
+    assert client.get("/books?page_size=5", headers={"If-None-Match": etag}).status_code == 200
+
+def test_catalog_version_spreads_writes_over_shards(client):
+    from models import CatalogVersion
+    from repositories.versions import CATALOG_VERSION_SHARDS, catalog_version
+
+    with Session(engine) as session:
+        before = catalog_version(session)
+        for book_id in (1, 2):
+            book = session.get(Book, book_id)
+            book.book_summary = "Revised"
+            session.add(book)
+            session.flush()
+            session.add(Review(book_id=book_id, rating_start=3, review_title="Second flush", review_date=datetime.now()))
+            session.flush()
+            session.commit()
+        # One bump per transaction, each on its first book's shard.
+        assert catalog_version(session) == before + 2
+        versions = {row.scope: row.version for row in session.exec(select(CatalogVersion)).all()}
+        assert f"catalog:{1 % CATALOG_VERSION_SHARDS}" in versions and f"catalog:{2 % CATALOG_VERSION_SHARDS}" in versions
+        assert "catalog" not in versions
+
+def test_get_book_etag_is_per_book(client):
+    etag = client.get("/book/1").headers["etag"]
+    assert client.get("/book/1", headers={"If-None-Match": etag}).status_code == 304
+
+    with Session(engine) as session:
+        session.add(Review(book_id=2, rating_start=5, review_title="Other book", review_date=datetime.now()))
+        session.commit()
+    assert client.get("/book/1", headers={"If-None-Match": etag}).status_code == 304
+
+    with Session(engine) as session:
+        author = session.get(Author, 1)
+        author.author_name = "Alice Renamed"
+        session.add(author)
+        session.commit()
+    res = client.get("/book/1", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json()["author_name"] == "Alice Renamed"
+    assert client.get("/book/9999", headers={"If-None-Match": etag}).status_code == 404
+
+def test_get_book_embeds_newest_reviews_and_histogram(client):
+    from sqlalchemy import event
+
+    with Session(engine) as session:
+        session.add_all([
+            Review(book_id=1, rating_start=2, review_title=f"Later {i}", review_date=datetime.now() - timedelta(hours=i))
+            for i in range(1, 5)
+        ])
+        session.commit()
+
+    review_statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "review" in statement:
+            review_statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        data = client.get("/book/1").json()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    assert [r["review_title"] for r in data["recent_reviews"]] == ["Later 1", "Later 2", "Later 3"]
+    assert data["review_metadata"]["star_counts"] == {"1": 0, "2": 4, "3": 0, "4": 1, "5": 1}
+    assert data["review_metadata"]["total_reviews"] == 6
+    assert data["review_metadata"]["average_rating"] == 2.83
+    assert len(review_statements) == 1 and "book_pricing" in review_statements[0]
+
+    empty = client.get("/book/4").json()
+    assert empty["recent_reviews"] == []
+    assert empty["review_metadata"]["total_reviews"] == 0
+
+@pytest.mark.parametrize("params,expected_total", [
+    ("page_size=5", 12),
+    ("page_size=5&page=3", 12),
+    ("page_size=5&page=9", 12),
+    ("page_size=5&category_id=3", 2),
+    ("page_size=5&author=Nobody", 0),
+])
+def test_list_books_window_totals(client, monkeypatch, params, expected_total):
+    from sqlalchemy import event
+    import repositories.books
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM book" in statement:
+            statements.append(statement)
+
+    results = {}
+    for strategy in ("query", "window"):
+        monkeypatch.setattr(settings, "LISTING_TOTALS", strategy)
+        repositories.books._count_cache.clear()
+        statements.clear()
+        event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+        try:
+            results[strategy] = client.get(f"/books?{params}").json()
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+        listing_statements = [s for s in statements if "book_pricing" in s]
+        if strategy == "window" and "page=9" not in params:
+            assert len(listing_statements) == 1
+            assert "OVER ()" in listing_statements[0]
+
+    assert results["query"] == results["window"]
+    assert results["window"]["paging"]["total_items"] == expected_total
+
+def test_instrumented_pool_tracks_checkouts_and_overflow():
+    from sqlalchemy import exc
+    from core.pool import InstrumentedQueuePool, pool_status, request_timing
+
+    pool_engine = create_engine(
+        TEST_DATABASE_URL, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1, pool_timeout=0.05
+    )
+    try:
+        with request_timing() as timing:
+            first = pool_engine.connect()
+            second = pool_engine.connect()
+            status = pool_status(pool_engine)
+            assert (status["in_use"], status["overflow"], status["overflow_checkouts"]) == (2, 1, 1)
+
+            with pytest.raises(exc.TimeoutError):
+                pool_engine.connect()
+            first.close()
+            second.close()
+        assert timing.checkouts == 3
+
+        status = pool_status(pool_engine)
+        assert (status["checkouts"], status["timeouts"], status["in_use"]) == (3, 1, 0)
+        assert status["max_wait_ms"] >= 50
+
+        pool_engine.dispose()
+        assert pool_status(pool_engine)["checkouts"] == 3
+    finally:
+        pool_engine.dispose()
+
+def test_pool_stats_endpoint_requires_admin(client):
+    from controllers.deps import get_current_user_through_header
+
+    res = client.get("/books?page_size=5")
+    assert res.headers["server-timing"].startswith("app;dur=")
+
+    for admin, expected_status in ((False, 403), (True, 200)):
+        user = User(id=1, first_name="Pool", last_name="Watcher", email="pool@test.com", password="x", admin=admin)
+        client.app.dependency_overrides[get_current_user_through_header] = lambda: user
+        try:
+            res = client.get("/internal/pool-stats")
+        finally:
+            del client.app.dependency_overrides[get_current_user_through_header]
+        assert res.status_code == expected_status
+
+    stats = res.json()
+    assert set(stats) == {"sync", "async", "replicas"}
+    assert {"in_use", "overflow", "checkouts", "avg_wait_ms", "timeouts"} <= set(stats["async"])
+
+def test_listing_statements_are_reused_across_values(client):
+    from sqlalchemy import event
+    from repositories.books import _listing_page_statement
+
+    _listing_page_statement.cache_clear()
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        for page, category_id in ((1, 1), (2, 2)):
+            res = client.get(f"/books?page={page}&page_size=5&category_id={category_id}&count_mode=none")
+            assert res.status_code == 200
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+    page_queries = [statement for statement in statements if "LIMIT" in statement and "book_pricing" in statement]
+    assert len(page_queries) == 2
+    assert page_queries[0] == page_queries[1]
+    cache_info = _listing_page_statement.cache_info()
+    assert (cache_info.misses, cache_info.hits) == (1, 1)
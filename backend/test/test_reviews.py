@@ -1,11 +1,13 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel, create_engine, Session, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 from main import app
-from controllers.deps import get_db
+from controllers.deps import get_db, get_async_db
 from models.reviews import Review
 from models.books import Book
 from models.authors import Author
@@ -21,14 +23,21 @@ except Exception:
   TEST_DATABASE_URL = "sqlite:///./test.db"
   engine = create_engine(TEST_DATABASE_URL, echo=False, connect_args={"check_same_thread": False})
 
+async_engine = create_async_engine(TEST_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://"), echo=False)
+
 def get_session_override():
   with Session(engine) as session:
     yield session
 
+async def get_async_session_override():
+  async with AsyncSession(async_engine, expire_on_commit=False) as session:
+    yield session
+
 @pytest.fixture(scope="module")
 def client():
   with TestClient(app) as c:
     c.app.dependency_overrides[get_db] = get_session_override
+    c.app.dependency_overrides[get_async_db] = get_async_session_override
     yield c
 
 @pytest.fixture(autouse=True)
@@ -92,3 +101,175 @@ def test_reviews_pagination(client):
   assert data["paging"]["page"] == 1
   assert data["paging"]["page_size"] == 15
   assert len(data["data"]) == 3
+
+def test_create_review_updates_book_aggregates(client):
+  res = client.post("/review", json={"book_id": 2, "review_title": "Better", "review_details": "Grew on me", "rating_start": 4})
+  assert res.status_code == 201
+
+  with Session(engine) as session:
+    book = session.get(Book, 2)
+    assert book.review_count == 2
+    assert book.rating_sum == 6
+    assert book.avg_rating == 3.0
+    assert book.rating_score == (6 + 5 * 3.0) / (2 + 5)
+    assert (book.rating_2_count, book.rating_4_count) == (1, 1)
+
+def test_rebuild_rating_aggregates_reconciles_drift(client):
+  from repositories.ratings import rebuild_rating_aggregates
+
+  with Session(engine) as session:
+    book = session.get(Book, 1)
+    book.review_count = 42
+    book.avg_rating = 1.0
+    session.add(book)
+    session.commit()
+
+    rebuild_rating_aggregates(session)
+    session.commit()
+    session.refresh(book)
+    assert book.review_count == 3
+    assert book.avg_rating == 4.0
+    assert book.rating_score == (12 + 5 * 3.0) / (3 + 5)
+    assert [book.rating_3_count, book.rating_4_count, book.rating_5_count] == [1, 1, 1]
+
+def test_rescore_ratings_recomputes_scores_in_batches(client):
+  from sqlmodel import func, select
+  from repositories.ratings import rescore_ratings
+
+  with Session(engine) as session:
+    book = session.get(Book, 1)
+    book.rating_score = 0.5
+    session.add(book)
+    session.commit()
+
+    assert rescore_ratings(session, batch_size=1) == session.exec(select(func.count(Book.id))).one()
+    session.refresh(book)
+    assert book.rating_score == (12 + 5 * 3.0) / (3 + 5)
+
+@pytest.mark.parametrize("url", ["/reviews?book_id=1", "/reviews/metadata?book_id=1"])
+def test_review_endpoints_revalidate_with_etag(client, url):
+  first = client.get(url)
+  etag = first.headers["etag"]
+  cached = client.get(url, headers={"If-None-Match": etag})
+  assert cached.status_code == 304
+  assert cached.content == b""
+
+  client.post("/review", json={"book_id": 2, "review_title": "Other", "review_details": "x", "rating_start": 1})
+  assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+  client.post("/review", json={"book_id": 1, "review_title": "New", "review_details": "x", "rating_start": 1})
+  refreshed = client.get(url, headers={"If-None-Match": etag})
+  assert refreshed.status_code == 200
+  assert refreshed.headers["etag"] != etag
+
+def test_reads_use_healthy_replicas_until_the_client_writes(client, monkeypatch):
+  from sqlalchemy import event
+  import controllers.deps as deps
+  from core.replicas import PIN_COOKIE, ReplicaSet
+
+  replica_engine = create_async_engine(TEST_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://"))
+  dead_engine = create_async_engine("sqlite+aiosqlite:////nonexistent/replica.db")
+  replicas = ReplicaSet([dead_engine, replica_engine], check_timeout=1)
+  client.portal.call(replicas.check)
+  assert [status["healthy"] for status in replicas.status()] == [False, True]
+
+  monkeypatch.setattr(deps, "async_engine", async_engine)
+  monkeypatch.setattr(deps, "replica_set", replicas)
+  monkeypatch.delitem(client.app.dependency_overrides, get_async_db)
+  replica_statements = []
+  record = lambda conn, cursor, statement, *args: replica_statements.append(statement)
+  event.listen(replica_engine.sync_engine, "before_cursor_execute", record)
+  client.cookies.clear()
+  try:
+    assert client.get("/reviews?book_id=1").status_code == 200
+    assert replica_statements
+
+    replica_statements.clear()
+    res = client.post("/review", json={"book_id": 1, "review_title": "Pinned", "review_details": "x", "rating_start": 2})
+    assert res.status_code == 201
+    assert PIN_COOKIE in res.cookies
+    titles = [review["review_title"] for review in client.get("/reviews?book_id=1&sort_order=newest").json()["data"]]
+    assert "Pinned" in titles
+    assert not replica_statements
+
+    client.cookies.clear()
+    replicas.replicas[1].healthy = False
+    assert client.get("/reviews?book_id=1").status_code == 200
+    assert not replica_statements
+  finally:
+    client.cookies.clear()
+    event.remove(replica_engine.sync_engine, "before_cursor_execute", record)
+    client.portal.call(replica_engine.dispose)
+    client.portal.call(dead_engine.dispose)
+
+def test_cache_refreshes_read_the_primary_behind_a_replica(client, monkeypatch):
+  from sqlalchemy import event
+  import controllers.deps as deps
+  from core.replicas import ReplicaSet
+  from repositories.leaderboards import leaderboards
+
+  replica_engine = create_async_engine(TEST_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://"))
+  replicas = ReplicaSet([replica_engine], check_timeout=1)
+  client.portal.call(replicas.check)
+
+  monkeypatch.setattr(deps, "async_engine", async_engine)
+  monkeypatch.setattr(deps, "replica_set", replicas)
+  monkeypatch.delitem(client.app.dependency_overrides, get_async_db)
+  statements = {"primary": [], "replica": []}
+  record_primary = lambda conn, cursor, statement, *args: statements["primary"].append(statement)
+  record_replica = lambda conn, cursor, statement, *args: statements["replica"].append(statement)
+  event.listen(async_engine.sync_engine, "before_cursor_execute", record_primary)
+  event.listen(replica_engine.sync_engine, "before_cursor_execute", record_replica)
+  client.cookies.clear()
+  try:
+    leaderboards.mark_dirty(None)
+    assert [book["id"] for book in client.get("/books/popular?top_k=2").json()] == [1, 2]
+    assert client.get("/categories/range").json()["data"] == ["Test Category"]
+    assert client.get("/authors/range").json()["data"] == ["Test Author"]
+
+    is_rank_query = lambda statement: "ORDER BY book.review_count DESC" in statement
+    assert any(is_rank_query(statement) for statement in statements["primary"])
+    assert not any(is_rank_query(statement) for statement in statements["replica"])
+    assert any("category_name" in statement for statement in statements["replica"])
+    assert not any("category_name" in statement for statement in statements["primary"])
+  finally:
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record_primary)
+    event.remove(replica_engine.sync_engine, "before_cursor_execute", record_replica)
+    client.portal.call(replica_engine.dispose)
+
+def _query_plan(session, statement, params):
+  bind = session.get_bind()
+  compiled = statement.params(params).compile(
+    dialect=bind.dialect, compile_kwargs={"literal_binds": True, "render_postcompile": True}
+  )
+  if bind.dialect.name == "postgresql":
+    # Tiny test tables would otherwise be scanned sequentially regardless of indexes.
+    session.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+    return str(session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}").scalar())
+  return " ".join(row[-1] for row in session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+
+@pytest.mark.parametrize("query_name, expected_index", [
+  ("reviews_newest", "ix_review_book_id_review_date_id"),
+  ("reviews_oldest", "ix_review_book_id_review_date_id"),
+  ("reviews_by_rating", "ix_review_book_id_rating_start_review_date"),
+  ("review_metadata", "ix_review_book_id_rating_start_review_date"),
+  ("active_discounts", "ix_discount_book_id_active_price"),
+])
+def test_hot_queries_use_covering_indexes(query_name, expected_index):
+  from models.reviews import ReviewSortByOptions
+  from repositories.pricing import build_pricing_select
+  from repositories.reviews import _review_page_statements, _rating_counts_query
+
+  page = {"book_id": 1, "offset": 0, "limit": 20}
+  queries = {
+    "reviews_newest": (_review_page_statements(True, False, ReviewSortByOptions.newest_to_oldest)[1], page),
+    "reviews_oldest": (_review_page_statements(True, False, ReviewSortByOptions.oldest_to_newest)[1], page),
+    "reviews_by_rating": (
+      _review_page_statements(True, True, ReviewSortByOptions.newest_to_oldest)[1], {**page, "filter_rating": 5}
+    ),
+    "review_metadata": (_rating_counts_query, {"book_id": 1}),
+    "active_discounts": (build_pricing_select(datetime.now().date(), [1]), {}),
+  }
+  statement, params = queries[query_name]
+  with Session(engine) as session:
+    assert expected_index in _query_plan(session, statement, params)